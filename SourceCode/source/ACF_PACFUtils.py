@@ -3,7 +3,6 @@ Provides functions for estimating ARIMA parameters based on the Tran and Reed ap
 """
 
 
-from statsmodels.graphics.tsaplots import acf, pacf
 import numpy as np
 import pandas as pd
 import math
@@ -14,7 +13,7 @@ def getARIMA_Params (df_data_series, n_lags, n_alpha, dict_stat, dict_results, d
     Returns the estimated parameters needed for ARIMA modelling based on stationary type.
     This function performs the following operations:
         1. Decides based on the provided stationary type how to estimate the parameters
-        2. Gets the acf and pacf values as well as the confidence intervalls based on Barlett's formula
+        2. Gets the acf and pacf values as well as the confidence intervalls based on Barlett's formula once per differencing level via getCorrelations()
         3. Obtains the differencing parameter based on the computed decay rate of the acf and pacf
         4. Gets the p and q params by applying Tran and Reeds approach
         5. Returns ARIMA(p,d,q) parameters
@@ -31,41 +30,34 @@ def getARIMA_Params (df_data_series, n_lags, n_alpha, dict_stat, dict_results, d
             d (int): Differencing parameter;
             q (int): MA(q) parameter;
     """
-
     if dict_stat["b_Difference"]:  
         #init check
         df_data_series_diffed = df_data_series.diff().dropna()
-        t_corr_val_acf, t_conf_int_acf = acf(df_data_series_diffed, nlags=n_lags, alpha=n_alpha)
-        t_corr_val_pacf, t_conf_int_pacf = pacf(df_data_series_diffed, nlags=n_lags, alpha=n_alpha)
-        n_param_d = getDiffParam(getDecayRate(t_corr_val_acf, t_conf_int_acf), getDecayRate(t_corr_val_pacf, t_conf_int_pacf))
+        dict_corr = getCorrelations(df_data_series_diffed, n_lags, n_alpha)
+        n_param_d = getDiffParam(dict_corr["decay_rate_acf"], dict_corr["decay_rate_pacf"])
         
         #====== 2 is the limit to avoid overdifferencing====
         if n_param_d == 2:
             df_data_series_diffed = df_data_series_diffed.diff().dropna()
-            t_corr_val_acf, t_conf_int_acf = acf(df_data_series_diffed, nlags=n_lags, alpha=n_alpha)
-            t_corr_val_pacf, t_conf_int_pacf = pacf(df_data_series_diffed, nlags=n_lags, alpha=n_alpha)
+            dict_corr = getCorrelations(df_data_series_diffed, n_lags, n_alpha)
         #============================================================
 
-        p, q = getARMA_Param(t_corr_val_acf, t_conf_int_acf, t_corr_val_pacf, t_conf_int_pacf, dict_results)
-
     elif dict_stat["b_Detrend"]:
         #get params only, decay rate not needed as detrending took care if it
         n_param_d = 0
         df_data_series_detrended = df_data_series.iloc[:,0] - df_trend_series
-        t_corr_val_acf, t_conf_int_acf = acf(df_data_series_detrended, nlags=n_lags, alpha=n_alpha)
-        t_corr_val_pacf, t_conf_int_pacf = pacf(df_data_series_detrended, nlags=n_lags, alpha=n_alpha)
-        p, q = getARMA_Param(t_corr_val_acf, t_conf_int_acf, t_corr_val_pacf, t_conf_int_pacf, dict_results)
+        dict_corr = getCorrelations(df_data_series_detrended, n_lags, n_alpha)
 
     elif dict_stat["b_Stationary"]:
         # well decay can be skipped as well due to it already being stationary
         n_param_d = 0
-        t_corr_val_acf, t_conf_int_acf = acf(df_data_series, nlags=n_lags, alpha=n_alpha)
-        t_corr_val_pacf, t_conf_int_pacf = pacf(df_data_series, nlags=n_lags, alpha=n_alpha)
-        p, q = getARMA_Param(t_corr_val_acf, t_conf_int_acf, t_corr_val_pacf, t_conf_int_pacf, dict_results)
+        dict_corr = getCorrelations(df_data_series, n_lags, n_alpha)
+
+    p, q = getARMA_Param(dict_corr["acf"], dict_corr["conf_int_acf"], dict_corr["pacf"], dict_corr["conf_int_pacf"], dict_results)
 
     # === Save Results =========================================================
-    dict_results["decay_rate_acf"] = getDecayRate(t_corr_val_acf, t_conf_int_acf)
-    dict_results["decay_rate_pacf"] = getDecayRate(t_corr_val_pacf, t_conf_int_pacf)
+    dict_results["decay_rate_acf"] = dict_corr["decay_rate_acf"]
+    dict_results["decay_rate_pacf"] = dict_corr["decay_rate_pacf"]
     dict_results["ARIMA_Params_estimated"] = {
         "p": p,
         "d": n_param_d,
@@ -75,6 +67,83 @@ def getARIMA_Params (df_data_series, n_lags, n_alpha, dict_stat, dict_results, d
     return p, n_param_d , q
 
 
+def getCorrelations(df_data_series, n_lags, n_alpha):
+
+    """
+    Computes ACF, PACF, their confidence intervals and decay rates of a series in one pass.
+    The results equal those of statsmodels' acf() with Bartlett's formula and pacf() with its default Yule-Walker method.
+    This function performs the following operations:
+        1. Computes the sums of lagged products of the demeaned series with a single FFT
+        2. Derives the ACF from them and the PACF via the Durbin-Levinson recursion on the sample size adjusted autocovariances
+        3. Computes the confidence intervals, Bartlett's formula for the ACF and 1/n variance for the PACF
+        4. Computes the decay rates of both as given by getDecayRate()
+    Args:
+        df_data_series (pandas.DataSeries): A series containing the values
+        n_lags (int): An integer dictating the number of lags for acf and pacf
+        n_alpha (float): A floating point number indicating the alpha value
+    Returns:
+        (dict): A dictionary containing the arrays acf, conf_int_acf, pacf, conf_int_pacf and the floats decay_rate_acf, decay_rate_pacf
+    """
+    from scipy.fft import next_fast_len
+    from scipy.stats import norm
+
+    a_values = np.asarray(df_data_series, dtype="float64").ravel()
+    n_obs = len(a_values)
+    if n_lags > n_obs // 2:
+        raise ValueError(f"Can only compute partial correlations for lags up to 50% of the sample size. The requested nlags {n_lags} must be < {n_obs // 2}.")
+
+    a_demeaned = a_values - a_values.mean()
+    n_fft = next_fast_len(2 * n_obs + 1)
+    a_spectrum = np.fft.rfft(a_demeaned, n=n_fft)
+    a_lag_sums = np.fft.irfft(a_spectrum * np.conjugate(a_spectrum), n=n_fft)[:n_lags + 1] # sum of x_t * x_t+k per lag k
+
+    a_acf = a_lag_sums / a_lag_sums[0]
+    a_pacf = getDurbinLevinsonPACF(a_lag_sums / (n_obs - np.arange(n_lags + 1)))
+
+    n_z = norm.ppf(1 - n_alpha / 2.0)
+    a_var_acf = np.ones_like(a_acf) / n_obs
+    a_var_acf[0] = 0
+    a_var_acf[2:] *= 1 + 2 * np.cumsum(a_acf[1:-1] ** 2) # Bartlett's formula
+    a_interval_acf = n_z * np.sqrt(a_var_acf)
+    a_conf_int_acf = np.column_stack((a_acf - a_interval_acf, a_acf + a_interval_acf))
+
+    n_interval_pacf = n_z * np.sqrt(1.0 / n_obs)
+    a_conf_int_pacf = np.column_stack((a_pacf - n_interval_pacf, a_pacf + n_interval_pacf))
+    a_conf_int_pacf[0] = a_pacf[0]
+
+    return {
+        "acf": a_acf,
+        "conf_int_acf": a_conf_int_acf,
+        "pacf": a_pacf,
+        "conf_int_pacf": a_conf_int_pacf,
+        "decay_rate_acf": getDecayRate(a_acf, a_conf_int_acf),
+        "decay_rate_pacf": getDecayRate(a_pacf, a_conf_int_pacf)
+    }
+
+def getDurbinLevinsonPACF(a_acov):
+
+    """
+    Computes the partial autocorrelations with the Durbin-Levinson recursion, which solves the Yule-Walker equations of every order at once.
+    Args:
+        a_acov (numpy.array): Array containing the autocovariances from lag zero on
+    Returns:
+        a_pacf (numpy.array): Array containing the partial autocorrelations from lag zero on
+    """
+    n_lags = len(a_acov) - 1
+    a_pacf = np.empty(n_lags + 1)
+    a_pacf[0] = 1.0
+    a_phi = np.zeros(n_lags + 1) # AR coefficients of the current order, index 0 unused
+    n_error_var = a_acov[0]
+
+    for k in range(1, n_lags + 1):
+        n_phi_kk = (a_acov[k] - a_phi[1:k] @ a_acov[k - 1:0:-1]) / n_error_var
+        a_phi[1:k] = a_phi[1:k] - n_phi_kk * a_phi[k - 1:0:-1]
+        a_phi[k] = n_phi_kk
+        n_error_var *= 1 - n_phi_kk ** 2
+        a_pacf[k] = n_phi_kk
+
+    return a_pacf
+
 def getDiffParam(n_decay_acf , n_decay_pacf):
 
     """
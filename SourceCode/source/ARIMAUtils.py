@@ -2,11 +2,16 @@
 """
 Provides functions for selecting the optimal model with a grid search based on estimated ARIMA parameters.
 """
-from statsmodels.tsa.arima.model import ARIMA, ARIMAResults
-from coreforecast.scalers import inv_boxcox
-from statsmodels.tsa.forecasting.stl import STLForecast
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+import weakref
+from . import Profiler as profUtil
 
-def getOptimalModel(df_series, p, d, q, dict_results):
+# Forecasts per fitted model and lambda, see getForecast(). Weak keys let the entries vanish together with the model.
+dict_forecast_cache = weakref.WeakKeyDictionary()
+
+def getOptimalModel(df_series, p, d, q, dict_results, n_workers=None, b_warm_start=False, profiler=None, b_lean=False, n_ljung_box_threshold=0.05, dict_fitted=None):
     """
     A Wrapper function for obtaining the optimal ARIMA model.
     This function performs the following operations:
@@ -16,199 +21,322 @@ def getOptimalModel(df_series, p, d, q, dict_results):
         p (int): An integer dictating the AR part of ARIMA
         d (int): An integer dictating the differencing part of ARIMA
         q (int): An integer dictating the MA part of ARIMA
+        dict_results (dict): A dictionary containing information of previous time series analysis steps
+        n_workers (int): The number of worker processes fitting the candidates concurrently, None or 1 fits them one after another
+        b_warm_start (bool): A boolean for starting the optimiser of each candidate from the parameters of an already fitted neighbouring order
+        profiler (Profiler.StageProfiler): A profiler recording each candidate fit, None switches the instrumentation off
+        b_lean (bool): A boolean for keeping compact CandidateRecords instead of every fitted candidate, see fitCandidates()
+        n_ljung_box_threshold (float): The Ljung-Box p-value a candidate needs to exceed to qualify
+        dict_fitted (dict): Already fitted candidates by order which are reused instead of refitted, see fitCandidates()
     Returns:
         fitted_model (statsmodels.tsa.arima.model.ARIMAResults): The fitted optimal model
     """
     if p > 0 and q == 0:
-        fitted_model = fitAR(df_series, p, d, dict_results)["model"]
+        fitted_model = fitAR(df_series, p, d, dict_results, n_workers, b_warm_start, profiler, b_lean, n_ljung_box_threshold, dict_fitted)["model"]
     elif p == 0 and q > 0:
-        fitted_model = fitMA(df_series,d, q, dict_results)["model"]
+        fitted_model = fitMA(df_series,d, q, dict_results, n_workers, b_warm_start, profiler, b_lean, n_ljung_box_threshold, dict_fitted)["model"]
     else:
-        fitted_model = fitARIMA(df_series, p, d, q, dict_results)["model"]
+        fitted_model = fitARIMA(df_series, p, d, q, dict_results, n_workers, b_warm_start, profiler, b_lean, n_ljung_box_threshold, dict_fitted)["model"]
     
     return fitted_model
 
 
-def fitAR(df_series, p, d, dict_results):
+def fitAR(df_series, p, d, dict_results, n_workers=None, b_warm_start=False, profiler=None, b_lean=False, n_ljung_box_threshold=0.05, dict_fitted=None):
     """
     Obtains the optimal model based on the given AR parameter and Ljung-Box test.
     This function performs the following operations:
         1. Builds a range based on the estimated parameters ranging from one below and two above the estimtation (range end is exclusive)
-        2. Qualifies a model based on its Ljung-Box p-value
-        3. Adds the model along order, aic and Ljung-Box p-value to a list if it qualifies 
-        4. Compares the AIC scores of the models within the list to determine the optimal one and return it
+        2. Hands the candidate orders over to fitCandidates() which qualifies them by their Ljung-Box p-value and returns the one with the lowest AIC
     Args:
         df_series (pandas.DataSeries): The data upon which the model is supposed to be fitted
         p (int): An integer dictating the AR part of ARIMA
         d (int): An integer dictating the differencing part of ARIMA
+        dict_results (dict): A dictionary containing information of previous time series analysis steps
+        n_workers (int): The number of worker processes fitting the candidates concurrently, None or 1 fits them one after another
     Returns:
-        best_model (statsmodels.tsa.arima.model.ARIMAResults): The fitted optimal AR model
+        best_model (dict): The order, AIC, Ljung-Box p-value and fitted optimal AR model
     """
     p_range = range(max(0, p - 1), p + 3)
-    good_models = [] 
-    dict_results["models"] = []
-    for i in p_range:
-        if i==0:
-            continue
-        try:
-            if dict_results['stationary_status']["stat_type"] == "trend":
-                fitted_model = ARIMA(df_series, order=(i , d, 0), trend="ct").fit()
-            else:
-                fitted_model = ARIMA(df_series, order=(i , d, 0)).fit()
-            
-            n_ljungBox_results = fitted_model.test_serial_correlation(method="ljungbox")
-            n_ljungBox_pValue = n_ljungBox_results[0,1,-1] #gets the p-value of the last lag, portmonteau cumulative test
+    l_orders = [(i, d, 0) for i in p_range if i != 0]
 
-            # === Save Results ========
-            dict_results["models"].append({
-                "order": (i, d, 0),
-                "aic": fitted_model.aic,
-                "model": fitted_model,
-                "ljung_box_pValue" : n_ljungBox_pValue 
-            })
-            # ==========================
-            if n_ljungBox_pValue > 0.05: 
-                good_models.append({
-                    "order": (i, d, 0),
-                    "aic": fitted_model.aic,
-                    "model": fitted_model,
-                    "ljung_box_pValue" : n_ljungBox_pValue, 
-                })
-            else:
-                print("one lag is not good enough")
-        except:
-            continue
-    if not good_models:
-        print("nothing found AR")
-    else:
-        best_model = min(good_models, key=lambda x: x["aic"]) #lowest AIC score
-        return best_model
+    return fitCandidates(df_series, [l_orders], dict_results, "AR", n_workers, b_warm_start, profiler, b_lean, n_ljung_box_threshold, dict_fitted)
     
-def fitMA(df_series,d, q, dict_results):
+def fitMA(df_series,d, q, dict_results, n_workers=None, b_warm_start=False, profiler=None, b_lean=False, n_ljung_box_threshold=0.05, dict_fitted=None):
 
     """
     Obtains the optimal model based on the given MA parameter and Ljung-Box test.
     This function performs the following operations:
         1. Builds a range based on the estimated parameters ranging from one below and two above the estimtation (range end is exclusive)
-        2. Qualifies a model based on its Ljung-Box p-value
-        3. Adds the model along order, aic and Ljung-Box p-value to a list if it qualifies 
-        4. Compares the AIC scores of the models within the list to determine the optimal one and return it
+        2. Hands the candidate orders over to fitCandidates() which qualifies them by their Ljung-Box p-value and returns the one with the lowest AIC
     Args:
         df_series (pandas.DataSeries): The data upon which the model is supposed to be fitted
         q (int): An integer dictating the MA part of ARIMA
         d (int): An integer dictating the differencing part of ARIMA
+        dict_results (dict): A dictionary containing information of previous time series analysis steps
+        n_workers (int): The number of worker processes fitting the candidates concurrently, None or 1 fits them one after another
     Returns:
-        best_model (statsmodels.tsa.arima.model.ARIMAResults): The fitted optimal MA model
+        best_model (dict): The order, AIC, Ljung-Box p-value and fitted optimal MA model
     """
     q_range = range(max(0, q - 1), q + 3)
-    good_models = [] 
-    dict_results["models"] = []
-    for i in q_range:
-        if i==0:
-            continue
-        try:
-            if dict_results['stationary_status']["stat_type"] == "trend":
-                fitted_model = ARIMA(df_series, order=(0 , d, i), trend="ct").fit()
-            else:
-                fitted_model = ARIMA(df_series, order=(0 , d, i)).fit()
+    l_orders = [(0, d, i) for i in q_range if i != 0]
 
-            n_ljungBox_results = fitted_model.test_serial_correlation(method="ljungbox")
-            n_ljungBox_pValue = n_ljungBox_results[0,1,-1] #gets the p-value of the last lag, portmonteau cumulative test
-
-            # === Save Results ========
-            dict_results["models"].append({
-                "order": (0 , d , i),
-                "aic": fitted_model.aic,
-                "model": fitted_model,
-                "ljung_box_pValue" : n_ljungBox_pValue  
-            })
-            # ==========================
-
-            if n_ljungBox_pValue > 0.05: 
-                good_models.append({
-                    "order": (0 , d , i),
-                    "aic": fitted_model.aic,
-                    "model": fitted_model,
-                    "ljung_box_pValue" : n_ljungBox_pValue   
-                })
-            else:
-                print("one lag is not good enough")
-        except Exception as e:
-            print(e)
-            continue
-    if not good_models:
-        print("nothing found MA")
-    else:
-        best_model = min(good_models, key=lambda x: x["aic"])# lowest AIC score wins
-        return best_model
+    return fitCandidates(df_series, [l_orders], dict_results, "MA", n_workers, b_warm_start, profiler, b_lean, n_ljung_box_threshold, dict_fitted)
     
-def fitARIMA(df_series,p, d, q, dict_results):
+def fitARIMA(df_series,p, d, q, dict_results, n_workers=None, b_warm_start=False, profiler=None, b_lean=False, n_ljung_box_threshold=0.05, dict_fitted=None):
 
     """
     Obtains the optimal model based on the given ARIMA parameters and Ljung-Box test.
     This function performs the following operations:
         1. Builds a range based on the estimated parameters ranging from one below and two above the estimtation (range end is exclusive)
-        2. Qualifies a model based on its Ljung-Box p-value
-        3. Adds the model along order, aic and Ljung-Box p-value to a list if it qualifies 
-        4. Compares the AIC scores of the models within the list to determine the optimal one and return it
+        2. Groups the candidate orders into one row per AR order
+        3. Hands the rows over to fitCandidates() which returns the lowest AIC model of the first row containing a qualified model
     Args:
         df_series (pandas.DataSeries): The data upon which the model is supposed to be fitted
         p (int): An integer dictating the AR part of ARIMA
         d (int): An integer dictating the differencing part of ARIMA
         q (int): An integer dictating the MA part of ARIMA
+        dict_results (dict): A dictionary containing information of previous time series analysis steps
+        n_workers (int): The number of worker processes fitting the candidates concurrently, None or 1 fits them one after another
     Returns:
-        best_model (statsmodels.tsa.arima.model.ARIMAResults): The fitted optimal ARIMA model
+        best_model (dict): The order, AIC, Ljung-Box p-value and fitted optimal ARIMA model
     """
     p_range = range(max(0, p - 1), p + 3) 
     q_range = range(max(0, q - 1), q + 3)
-    good_models = [] #models whose ljung box pvalue ar not below 0.05
+    l_order_rows = [[(i, d, j) for j in q_range if not (i == 0 and j == 0)] for i in p_range]
+
+    return fitCandidates(df_series, l_order_rows, dict_results, "ARIMA", n_workers, b_warm_start, profiler, b_lean, n_ljung_box_threshold, dict_fitted)
+
+def fitCandidates(df_series, l_order_rows, dict_results, str_model_type, n_workers=None, b_warm_start=False, profiler=None, b_lean=False, n_ljung_box_threshold=0.05, dict_fitted=None):
+
+    """
+    Fits the candidate orders and selects the optimal model based on the Ljung-Box test and AIC.
+    This function performs the following operations:
+        1. Fits every candidate order, either one after another, warm started one after another or concurrently on a process pool
+        2. Qualifies a model based on its Ljung-Box p-value
+        3. Adds every model along order, aic, Ljung-Box p-value and optimiser iterations to the results in the order of the candidates
+        4. Returns the model with the lowest AIC of the first row containing a qualified model
+    Args:
+        df_series (pandas.DataSeries): The data upon which the model is supposed to be fitted
+        l_order_rows (list): A list of rows, each row being a list of (p, d, q) tuples
+        dict_results (dict): A dictionary containing information of previous time series analysis steps
+        str_model_type (str): A string naming the model type for the console output
+        n_workers (int): The number of worker processes fitting the candidates concurrently, None or 1 fits them one after another
+        b_warm_start (bool): A boolean for starting the optimiser of each candidate from the parameters of an already fitted neighbouring order
+        profiler (Profiler.StageProfiler): A profiler recording each candidate fit, or all of them as one stage when fitting on a process pool. None switches the instrumentation off
+        b_lean (bool): A boolean for adding a compact CandidateRecord per candidate to the results and holding on to the best qualified model only,
+                       so that the other fitted candidates are released right after their evaluation
+        n_ljung_box_threshold (float): The Ljung-Box p-value a candidate needs to exceed to qualify
+        dict_fitted (dict): Already fitted candidates by order, e.g. loaded from a StageCache, which are reused instead of refitted.
+                            Newly fitted candidates are added to it. Warm started candidates depend on the fitting order and are never reused
+    Returns:
+        best_model (dict): The order, AIC, Ljung-Box p-value and fitted optimal model
+    """
+    if profiler is None:
+        profiler = profUtil.NULL_PROFILER
+    candidate_profiler = profiler
+
+    s_trend = "ct" if dict_results['stationary_status']["stat_type"] == "trend" else None
+    l_orders = [t_order for l_row in l_order_rows for t_order in l_row]
+    set_reused = set(dict_fitted).intersection(l_orders) if dict_fitted is not None and not b_warm_start else set()
+    l_orders = [t_order for t_order in l_orders if t_order not in set_reused] # only the missing candidates are fitted below
+    if b_warm_start:
+        if n_workers and n_workers > 1:
+            raise ValueError("warm starts depend on previously fitted candidates and are only available for sequential fitting")
+        it_fitted = iterWarmStartedCandidates(df_series, l_orders, s_trend)
+    elif n_workers and n_workers > 1:
+        with profiler.stage("parallel_fit"): # the candidates are fitted all at once in the worker processes
+            it_fitted = iterFittedCandidates(df_series, l_orders, s_trend, n_workers)
+        candidate_profiler = profUtil.NULL_PROFILER
+    else:
+        it_fitted = iterFittedCandidates(df_series, l_orders, s_trend, n_workers)
+
+    good_models = [] #models whose ljung box pvalue ar not below the threshold
     dict_results["models"] = []
-    for i in p_range:
-        for j in q_range:
-            if i==0 and j == 0:
+    for l_row in l_order_rows:
+        for t_order in l_row:
+            if t_order in set_reused:
+                t_fitted, t_start_order = dict_fitted[t_order], None
+            else:
+                with candidate_profiler.stage(f"ARIMA{t_order}"):
+                    t_fitted, t_start_order = next(it_fitted)
+                if dict_fitted is not None and not b_warm_start:
+                    dict_fitted[t_order] = t_fitted
+            if isinstance(t_fitted, Exception):
+                print(t_fitted)
                 continue
-            try:
-                if dict_results['stationary_status']["stat_type"] == "trend":
-                    fitted_model = ARIMA(df_series, order=(i , d, j), trend="ct").fit()
-                else:
-                    fitted_model = ARIMA(df_series, order=(i , d, j)).fit()
-                n_ljungBox_results = fitted_model.test_serial_correlation(method="ljungbox")
-                n_ljungBox_pValue = n_ljungBox_results[0,1,-1] #gets the p-value of the last lag, portmonteau cumulative test
+            fitted_model, n_ljungBox_pValue, b_cold_fallback = t_fitted
+            dict_mle_retvals = getattr(fitted_model, "mle_retvals", None) or {}
 
-                # === Save Results ========
+            # === Save Results ========
+            if b_lean:
+                dict_results["models"].append(CandidateRecord(t_order, fitted_model.aic, n_ljungBox_pValue, np.asarray(fitted_model.params),
+                                                              dict_mle_retvals.get("iterations"), t_start_order, b_cold_fallback))
+            else:
                 dict_results["models"].append({
-                    "order": (i , d , j),
+                    "order": t_order,
                     "aic": fitted_model.aic,
                     "model": fitted_model,
-                    "ljung_box_pValue" : n_ljungBox_pValue  
+                    "ljung_box_pValue" : n_ljungBox_pValue,
+                    "iterations": dict_mle_retvals.get("iterations"),
+                    "warm_start_order": t_start_order,
+                    "warm_start_fallback": b_cold_fallback
                 })
-                # ==========================
-
-                if n_ljungBox_pValue > 0.05: 
-                    good_models.append({
-                        "order": (i , d , j),
-                        "aic": fitted_model.aic,
-                        "model": fitted_model 
-                    })
+            # ==========================
+            if n_ljungBox_pValue > n_ljung_box_threshold: 
+                dict_good_model = {
+                    "order": t_order,
+                    "aic": fitted_model.aic,
+                    "model": fitted_model,
+                    "ljung_box_pValue" : n_ljungBox_pValue, 
+                }
+                if b_lean: # keep the best qualified model only, on equal AIC the earlier one like min() below
+                    good_models = [min(good_models + [dict_good_model], key=lambda x: x["aic"])]
                 else:
-                    print("one lag is not good enough")
-            except:
-                continue
+                    good_models.append(dict_good_model)
+            else:
+                print("one lag is not good enough")
         if not good_models:
-            print("nothing found")
+            print(f"nothing found {str_model_type}")
         else:
-            best_model = min(good_models, key=lambda x: x["aic"])
+            best_model = min(good_models, key=lambda x: x["aic"]) #lowest AIC score
             return best_model
 
+class CandidateRecord:
+
+    """
+    A compact record of a fitted ARIMA candidate, added to dict_results["models"] in lean mode instead of a dictionary holding the whole fitted model.
+    The fields can be read as attributes or like the keys of the full mode dictionaries, e.g. record["aic"].
+    Args:
+        order (tuple): The (p, d, q) order of the candidate
+        aic (float): The AIC of the fitted candidate
+        ljung_box_pValue (float): The Ljung-Box p-value of the residuals
+        params (numpy.ndarray): The fitted parameter vector
+        iterations (int): The number of optimiser iterations, None if unknown
+        warm_start_order (tuple): The order the optimiser was warm started from, None for a cold start
+        warm_start_fallback (bool): Whether the warm start did not converge and the candidate was refitted from a cold start
+    """
+
+    __slots__ = ("order", "aic", "ljung_box_pValue", "params", "iterations", "warm_start_order", "warm_start_fallback")
+
+    def __init__(self, order, aic, ljung_box_pValue, params, iterations=None, warm_start_order=None, warm_start_fallback=False):
+        self.order = order
+        self.aic = aic
+        self.ljung_box_pValue = ljung_box_pValue
+        self.params = params
+        self.iterations = iterations
+        self.warm_start_order = warm_start_order
+        self.warm_start_fallback = warm_start_fallback
+
+    def __getitem__(self, str_key):
+        try:
+            return getattr(self, str_key)
+        except AttributeError:
+            raise KeyError(str_key) from None
+
+    def get(self, str_key, default=None):
+        return getattr(self, str_key, default) if str_key in self.__slots__ else default
+
+    def __repr__(self):
+        return f"CandidateRecord(order={self.order}, aic={self.aic}, ljung_box_pValue={self.ljung_box_pValue})"
+
+def iterFittedCandidates(df_series, l_orders, s_trend, n_workers=None):
+
+    """
+    Provides the fitted candidate models in the order of the given candidate orders.
+    This function performs the following operations:
+        1. Fits the candidates lazily one after another if no more than one worker is requested
+        2. Otherwise fits all candidates concurrently on a process pool and collects them in submission order
+    Args:
+        df_series (pandas.DataSeries): The data upon which the models are supposed to be fitted
+        l_orders (list): A list of (p, d, q) tuples
+        s_trend (str): The trend parameter of the ARIMA models, None for no trend
+        n_workers (int): The number of worker processes, None or 1 fits the candidates one after another
+    Returns:
+        (iterator): An iterator over pairs of the fitCandidate() result and the order the candidate was warm started from, which is always None here
+    """
+    if not n_workers or n_workers == 1:
+        return ((fitCandidate(df_series, t_order, s_trend), None) for t_order in l_orders)
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        l_fitted = list(executor.map(fitCandidate, repeat(df_series), l_orders, repeat(s_trend)))
+    l_fitted.reverse() # handing out the candidates by popping them releases each one as soon as the caller drops it
+    return ((l_fitted.pop(), None) for _ in range(len(l_fitted)))
+
+def iterWarmStartedCandidates(df_series, l_orders, s_trend):
+
+    """
+    Provides the fitted candidate models in the order of the given candidate orders, each warm started from an already fitted neighbour.
+    This function performs the following operations:
+        1. Looks for the already fitted order with the most lags that is nested within the candidate order
+        2. Fits the candidate starting from the converged parameters of that neighbour, the new lags start at zero
+        3. Fits the candidate from a cold start if there is no such neighbour
+    A warm start only saves optimiser iterations, it must reach the same optimum as a cold fit. fitCandidate() therefore refits a warm started candidate
+    from the default start parameters if the optimiser did not converge, e.g. when it stops right at the start vector.
+    Args:
+        df_series (pandas.DataSeries): The data upon which the models are supposed to be fitted
+        l_orders (list): A list of (p, d, q) tuples
+        s_trend (str): The trend parameter of the ARIMA models, None for no trend
+    Returns:
+        (iterator): An iterator over pairs of the fitCandidate() result and the order the candidate was warm started from, None for a cold start
+    """
+    dict_fitted_params = {} # converged parameters by parameter name of every fitted order
+    for t_order in l_orders:
+        l_neighbours = [t_fitted_order for t_fitted_order in dict_fitted_params
+                        if t_fitted_order[1] == t_order[1] and t_fitted_order[0] <= t_order[0] and t_fitted_order[2] <= t_order[2]]
+        t_start_order = max(l_neighbours, key=lambda x: x[0] + x[2], default=None)
+
+        t_fitted = fitCandidate(df_series, t_order, s_trend, dict_fitted_params.get(t_start_order))
+        if not isinstance(t_fitted, Exception):
+            fitted_model = t_fitted[0]
+            dict_fitted_params[t_order] = dict(zip(fitted_model.model.param_names, np.asarray(fitted_model.params)))
+        yield t_fitted, t_start_order
+
+def fitCandidate(df_series, t_order, s_trend=None, dict_start_params=None):
+
+    """
+    Fits a single ARIMA candidate and runs its Ljung-Box test. Defined on module level so it can be sent to worker processes.
+    Args:
+        df_series (pandas.DataSeries): The data upon which the model is supposed to be fitted
+        t_order (tuple): The (p, d, q) order of the candidate
+        s_trend (str): The trend parameter of the ARIMA model, None for no trend
+        dict_start_params (dict): Start parameters by parameter name, parameters missing in it start at zero. None uses the default start parameters.
+                                  A warm started fit which does not converge is repeated with the default start parameters, so that warm starts reach the same optimum as cold fits
+    Returns:
+        tuple (fitted_model, n_ljungBox_pValue, b_cold_fallback) or the exception raised while fitting:
+            fitted_model (statsmodels.tsa.arima.model.ARIMAResults): The fitted candidate
+            n_ljungBox_pValue (float): The Ljung-Box p-value of the last lag
+            b_cold_fallback (bool): Whether the warm start did not converge and the candidate was refitted from a cold start
+    """
+    from statsmodels.tsa.arima.model import ARIMA
+
+    try:
+        model = ARIMA(df_series, order=t_order, trend=s_trend)
+        a_start_params = None
+        if dict_start_params is not None:
+            a_start_params = np.array([dict_start_params.get(s_param_name, 0.0) for s_param_name in model.param_names])
+        fitted_model = model.fit(start_params=a_start_params)
+        b_cold_fallback = False
+        if a_start_params is not None and not fitted_model.mle_retvals.get("converged", True):
+            fitted_model = model.fit()
+            b_cold_fallback = True
+        n_ljungBox_results = fitted_model.test_serial_correlation(method="ljungbox")
+        n_ljungBox_pValue = n_ljungBox_results[0,1,-1] #gets the p-value of the last lag, portmonteau cumulative test
+        return fitted_model, n_ljungBox_pValue, b_cold_fallback
+    except Exception as e:
+        return e
+
 def getForecast(ARIMAResults_fitted,fore_length, n_lambda = None):
     #get a clean forecast for the specified length
     #if it has a lambda then use inv boxcox otherwise just forecast
 
     """
     Generates a forecast with a given length and detransforms the data if necessary.
+    Forecasts are cached per fitted model and lambda. The longest requested horizon is computed once and shorter horizons are served as its prefix,
+    as an ARIMA forecast of fewer steps equals the first steps of a longer one.
     This function performs the following operations:
-        1. Takes the fitted model and forecasts up to a given length
-        2. Applies inverse boxcox if necessary
+        1. Looks up a cached forecast of at least the given length for the fitted model and lambda
+        2. Otherwise takes the fitted model and forecasts up to the given length and applies inverse boxcox if necessary
+        3. Returns the first fore_length steps
     Args:
         ARIMAResults_fitted (statsmodels.tsa.arima.model.ARIMAResults): A fitted ARIMA model
         fore_length (int): The length of the forecast
@@ -217,10 +345,28 @@ def getForecast(ARIMAResults_fitted,fore_length, n_lambda = None):
         (np.ndarray): An array containing a forecast of fore_length steps
     """
 
-    if n_lambda:
+    fore_length = int(fore_length) # statsmodels rejects numpy integers as horizon
+    dict_model_cache = dict_forecast_cache.setdefault(ARIMAResults_fitted, {})
+    a_cached_forecast = dict_model_cache.get(n_lambda)
 
+    if a_cached_forecast is None or len(a_cached_forecast) < fore_length:
         pred_forecast = ARIMAResults_fitted.forecast(steps=fore_length)
-        return inv_boxcox(pred_forecast, n_lambda)
+        if n_lambda:
+            from coreforecast.scalers import inv_boxcox
+            pred_forecast = inv_boxcox(pred_forecast, n_lambda)
+        dict_model_cache[n_lambda] = pred_forecast
+        a_cached_forecast = pred_forecast
 
+    return a_cached_forecast[:fore_length].copy()
+
+def invalidateForecastCache(ARIMAResults_fitted=None):
+
+    """
+    Drops cached forecasts. Needs to be called whenever a model is refit or its state is changed in place.
+    Args:
+        ARIMAResults_fitted (statsmodels.tsa.arima.model.ARIMAResults): The model whose forecasts are dropped, None drops the forecasts of all models
+    """
+    if ARIMAResults_fitted is None:
+        dict_forecast_cache.clear()
     else:
-        return ARIMAResults_fitted.forecast(steps=fore_length)
+        dict_forecast_cache.pop(ARIMAResults_fitted, None)
@@ -0,0 +1,184 @@
+"""
+Runs the time series and outlier detection pipeline for many pairs of base and anomalous processes.
+The jobs are read from a JSON manifest, e.g. batchManifest.json, and executed on a process pool:
+
+    python -m SourceCode.source.BatchRun SourceCode/source/batchManifest.json --workers 4
+"""
+
+from . import run as run
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+from pathlib import Path
+import pandas as pd
+import argparse
+import json
+import os
+import time
+import traceback
+
+def readManifest(str_manifest_path):
+
+    """
+    A function for reading the jobs of a batch run.
+    This function performs the following operations:
+        1. Reads the list of jobs from the JSON manifest
+        2. Checks that every job contains the required keys and fills in the defaults of run.run()
+        3. Resolves the dataset and model store paths and the files of sqlite:/// database sources (see run.loadTrainAndTestSet()) relative to the manifest
+    Args:
+        str_manifest_path (str): A string containing the file path of the manifest
+    Returns:
+        l_jobs (list): A list of dictionaries, each describing one job
+    """
+    path_manifest = Path(str_manifest_path)
+    with open(path_manifest, "r", encoding="utf-8") as f:
+        l_manifest = json.load(f)
+
+    l_jobs = []
+    for i, dict_entry in enumerate(l_manifest):
+        l_missing = [s_key for s_key in ("undamaged", "damaged", "variable", "seasons", "alpha", "folder") if s_key not in dict_entry]
+        if l_missing:
+            raise ValueError(f"job {i} of the manifest is missing {', '.join(l_missing)}")
+
+        dict_job = {
+            "rename": dict_entry["variable"],
+            "test_type": "ADF",
+            "split": 0.8,
+            "abs": False,
+            "store": None
+        }
+        dict_job.update(dict_entry)
+        for s_key in ("undamaged", "damaged"):
+            dict_job[s_key] = resolveSource(dict_entry[s_key], path_manifest.parent)
+        if dict_job["store"]:
+            dict_job["store"] = str(path_manifest.parent / dict_job["store"])
+        l_jobs.append(dict_job)
+
+    return l_jobs
+
+def resolveSource(source, path_base):
+
+    """
+    Resolves a csv file path or the file of a sqlite:/// database source relative to the given directory, other connection strings are kept as they are.
+    Args:
+        source (str): A string containing the file path of the process or a dictionary describing a database source
+        path_base (pathlib.Path): The directory relative paths refer to
+    Returns:
+        source (str): The source with an absolute path, a copy in case of a database source
+    """
+    if not isinstance(source, dict):
+        return str(path_base / source)
+
+    source = dict(source)
+    str_connection = source.get("connection", "")
+    if str_connection.startswith("sqlite:///"):
+        str_path = str_connection[len("sqlite:///"):]
+        if str_path != ":memory:" and not Path(str_path).is_absolute():
+            source["connection"] = "sqlite:///" + str(path_base / str_path)
+    return source
+
+def runJob(dict_job, script_dir):
+
+    """
+    A function for running a single job of a batch run. Failures are caught so that they do not affect the other jobs.
+    This function performs the following operations:
+        1. Runs the pipeline with the parameters of the job and measures its duration
+        2. Condenses the results to the evaluation metrics and the failure percentages of the outlier simulations
+    Args:
+        dict_job (dict): A dictionary describing the job
+        script_dir (str): A string pointing to the right project directory
+    Returns:
+        dict_summary (dict): A dictionary containing status, duration and results of the job
+    """
+    dict_summary = {
+        "folder": dict_job["folder"],
+        "status": "ok"
+    }
+    n_start = time.perf_counter()
+    try:
+        dict_results = run.run(dict_job["undamaged"], dict_job["damaged"], dict_job["variable"], dict_job["rename"], dict_job["seasons"], dict_job["alpha"],
+                               dict_job["test_type"], script_dir, nSplit=dict_job["split"], bAbs=dict_job["abs"], str_FolderName=dict_job["folder"], str_store_dir=dict_job["store"])
+
+        dict_eval = dict_results["evaluation"]
+        dict_summary.update({
+            "mae_base": dict_eval["base_to_base"],
+            "mae_anomaly": dict_eval["ano_to_ano"],
+            "precision": dict_eval["cm"]["precision"],
+            "recall": dict_eval["cm"]["recall"],
+            "failure_percentages": ", ".join(f"{outl_res['failure_percentage']}%" for outl_res in dict_results["outlier_results"])
+        })
+    except Exception as e:
+        dict_summary["status"] = "failed"
+        dict_summary["error"] = f"{type(e).__name__}: {e}"
+        dict_summary["traceback"] = traceback.format_exc()
+
+    dict_summary["seconds"] = round(time.perf_counter() - n_start, 3)
+    return dict_summary
+
+def runBatch(l_jobs, script_dir, n_workers=None):
+
+    """
+    A function for running many jobs on a process pool.
+    Every csv job runs in a fresh worker process, so that a crashing job or the global plotting state of one job cannot affect the others.
+    Jobs reading from the database run on long-lived workers of a second pool instead, since the connection pools are kept per process, see DatabaseSource.getPool().
+    This function performs the following operations:
+        1. Splits the workers between both pools in proportion to their jobs and submits every job to the pool of its kind at once
+        2. Prints the progress whenever a job of either pool finishes
+        3. Prints a combined summary of timings and results and returns it
+    Args:
+        l_jobs (list): A list of dictionaries, each describing one job
+        script_dir (str): A string pointing to the right project directory
+        n_workers (int): The number of worker processes, None uses the number of processors
+    Returns:
+        df_summary (pandas.DataFrame): A dataframe containing one row per job in the order of the manifest
+    """
+    n_start = time.perf_counter()
+    l_summaries = [None] * len(l_jobs)
+
+    l_database = [isinstance(dict_job["undamaged"], dict) or isinstance(dict_job["damaged"], dict) for dict_job in l_jobs]
+    dict_indices = {b_database: [i for i in range(len(l_jobs)) if l_database[i] == b_database] for b_database in (False, True)}
+    n_pool_workers = n_workers or os.cpu_count() or 1
+    n_database_workers = min(len(dict_indices[True]), max(1, round(n_pool_workers * len(dict_indices[True]) / max(len(l_jobs), 1))))
+    dict_workers = {True: n_database_workers, False: max(1, n_pool_workers - n_database_workers)}
+
+    with ExitStack() as stack:
+        dict_futures = {}
+        for b_database, l_indices in dict_indices.items():
+            if not l_indices:
+                continue
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=dict_workers[b_database], max_tasks_per_child=None if b_database else 1))
+            dict_futures.update({executor.submit(runJob, l_jobs[i], script_dir): i for i in l_indices})
+
+        for n_done, future in enumerate(as_completed(dict_futures), start=1):
+            i = dict_futures[future]
+            try:
+                l_summaries[i] = future.result()
+            except Exception as e: # the worker process itself died
+                l_summaries[i] = {"folder": l_jobs[i]["folder"], "status": "failed", "error": f"{type(e).__name__}: {e}", "seconds": None}
+
+            dict_summary = l_summaries[i]
+            print(f"[{n_done}/{len(l_jobs)}] {dict_summary['folder']}: {dict_summary['status']} ({dict_summary['seconds'] if dict_summary['seconds'] is not None else '-'} s)")
+            if dict_summary["status"] == "failed":
+                print(dict_summary.get("traceback", dict_summary["error"]))
+
+    n_total = time.perf_counter() - n_start
+    df_summary = pd.DataFrame(l_summaries).drop(columns=["traceback"], errors="ignore")
+
+    # === Print Summary =========
+    print(df_summary.to_markdown(index=False))
+    n_failed = (df_summary["status"] == "failed").sum()
+    print(f"{len(l_jobs) - n_failed} of {len(l_jobs)} jobs succeeded. Wall time: {n_total:.3f} s, summed job time: {df_summary['seconds'].sum():.3f} s")
+    # ===========================
+
+    return df_summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the time series and outlier detection pipeline for every job of a manifest.")
+    parser.add_argument("manifest", help="path of the JSON manifest")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--summary", default=None, help="optional path of a markdown file the summary is written to")
+    args = parser.parse_args()
+
+    df_summary = runBatch(readManifest(args.manifest), Path(__file__).parent, args.workers)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            f.write(df_summary.to_markdown(index=False))
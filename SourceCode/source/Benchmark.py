@@ -0,0 +1,429 @@
+"""
+Provides a benchmark suite timing the stages of the time series analysis and outlier detection pipeline.
+The suite runs on the shipped 3mm and 5mm test data and on synthetic series of growing length and stores the timings as JSON,
+so that two runs can be compared for regressions:
+
+    python -m SourceCode.source.Benchmark --sizes 1000 10000 --output new.json --compare old.json
+
+With --imports the import time of the modules in DICT_IMPORT_BUDGETS is measured in fresh interpreters and checked against its budget.
+"""
+
+from . import UtilsDataFrame as dfUtils
+from . import ARIMAUtils as arimaUtil
+from . import ModelEvaluation as modEval
+from . import OutPut as out
+from . import Profiler as profUtil
+from . import run as run
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import argparse
+import datetime
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+script_dir = Path(__file__).parent
+
+# Pairs of base and anomalous process shipped with the project
+DICT_REAL_DATASETS = {
+    "3mm": (script_dir.parent / "testData" / "3mm" / "3mm_NoDMG_20092025_edited.csv", script_dir.parent / "testData" / "3mm" / "3mm_DMG_05_11_2025_edited.csv"),
+    "5mm": (script_dir.parent / "testData" / "5mm" / "5mm_noDMG_05_11_2025_edited.csv", script_dir.parent / "testData" / "5mm" / "5mm_DMG_05_11_2025_edited.csv")
+}
+L_SYNTHETIC_SIZES = [10**3, 10**4, 10**5, 10**6]
+
+# Import time budgets in seconds. Importing these modules must not load any of L_HEAVY_MODULES,
+# which are imported by the functions needing them instead
+DICT_IMPORT_BUDGETS = {
+    "SourceCode.source.OutlierDetectorUtil": 1.0,
+    "SourceCode.source.ModelStore": 0.1,
+    "SourceCode.source.run": 1.0
+}
+L_HEAVY_MODULES = ["statsmodels", "sklearn", "matplotlib", "coreforecast"]
+
+def timeCall(dict_timings, str_stage, func, *args, **kwargs):
+
+    """
+    Calls a function and appends its wall time to the timings of a stage.
+    Args:
+        dict_timings (dict): A dictionary containing a list of wall times in seconds per stage
+        str_stage (str): The name of the stage
+        func (callable): The function to time
+    Returns:
+        The return value of the function
+    """
+    n_start = time.perf_counter()
+    result = func(*args, **kwargs)
+    dict_timings.setdefault(str_stage, []).append(time.perf_counter() - n_start)
+    return result
+
+def timeTimeSeriesAnalysis(df_train, df_test, n_Seasons, n_alpha, s_test_type, dict_timings):
+
+    """
+    Runs run.doTimeSeriesAnalysis() with the instrumentation switched on and collects the wall time of each of its steps.
+    Args:
+        df_train (pandas.DataFrame): A dataframe containing the training set
+        df_test (pandas.DataFrame): A dataframe containing the test set
+        n_Seasons (int): An integer indicating the number of seasons/periods
+        n_alpha (float): A floating point value for tests invloving an alpha value
+        s_test_type (str): A string containing the stationary test type
+        dict_timings (dict): A dictionary the wall times per stage are appended to
+    Returns:
+        dict_results (dict): A dictionary object containing information gathered during the time series analysis
+    """
+    profiler = profUtil.StageProfiler(b_memory=False) # tracemalloc would distort the timings
+    dict_results = run.doTimeSeriesAnalysis(df_train, df_test, n_Seasons, n_alpha, s_test_type, profiler=profiler)
+
+    for dict_record in dict_results["profile"]:
+        if dict_record["depth"] == 0:
+            dict_timings.setdefault(dict_record["stage"], []).append(dict_record["wall_s"])
+    return dict_results
+
+def getScenarios(df_base_test, df_anomaly_test, n_seed):
+
+    """
+    Constructs the four outlier simulation scenarios of run.run(), shuffled with a fixed seed.
+    Returns:
+        (list): A list of dataframes, one per scenario
+    """
+    return [pd.concat([df_base_test, df_anomaly_test.iloc[-n_tail:]]).sample(frac=1, random_state=n_seed).reset_index(drop=True) for n_tail in (8, 31, 60, 100)]
+
+def benchmarkRealDataset(str_name, t_paths, n_Seasons, n_alpha, s_test_type, n_repeat):
+
+    """
+    Times the whole pipeline on a shipped pair of base and anomalous process.
+    This function performs the following operations:
+        1. Times loading the sets and the stages of the time series analysis of both processes
+        2. Times the model evaluation and the outlier simulation
+        3. Times the output into a temporary directory containing copies of the report templates
+    Returns:
+        dict_timings (dict): A dictionary containing a list of wall times in seconds per stage
+    """
+    dict_timings = {}
+    for n_run in range(n_repeat):
+        df_base_train, df_base_test = timeCall(dict_timings, "load", dfUtils.getTrainAndTestSetFromCSV, t_paths[0], n_Seasons, "Torque_ax8", "Torque", True, 0.8)
+        df_anomaly_train, df_anomaly_test = dfUtils.getTrainAndTestSetFromCSV(t_paths[1], n_Seasons, "Torque_ax8", "Torque", True, 0.8)
+        df_base_train, df_base_test, df_anomaly_train, df_anomaly_test = (df.abs() for df in (df_base_train, df_base_test, df_anomaly_train, df_anomaly_test))
+
+        dict_base_results = timeTimeSeriesAnalysis(df_base_train, df_base_test, n_Seasons, n_alpha, s_test_type, dict_timings)
+        dict_anomaly_results = timeTimeSeriesAnalysis(df_anomaly_train, df_anomaly_test, n_Seasons, n_alpha, s_test_type, {})
+
+        def evaluate():
+            arimaUtil.invalidateForecastCache()
+            return modEval.getEvaluationResults(dict_base_results, dict_anomaly_results)
+
+        dict_eval = timeCall(dict_timings, "evaluation", evaluate)
+
+        def simulate():
+            arimaUtil.invalidateForecastCache()
+            return [run.simulateOutlierDetection(dict_base_results, dict_anomaly_results, df_observ) for df_observ in getScenarios(df_base_test, df_anomaly_test, n_run)]
+
+        l_outlier_results = timeCall(dict_timings, "outlier_simulation", simulate)
+
+        with tempfile.TemporaryDirectory() as str_tmp_dir:
+            path_output = Path(str_tmp_dir) / "output"
+            path_output.mkdir()
+            for path_template in (script_dir.parent / "output").glob("*Template.md"):
+                shutil.copy(path_template, path_output)
+            timeCall(dict_timings, "output", out.output, dict_base_results, dict_anomaly_results, dict_eval, l_outlier_results, Path(str_tmp_dir) / "source", str_name)
+
+        print(f"{str_name}: run {n_run + 1}/{n_repeat} done")
+    return dict_timings
+
+def getSyntheticSeries(n_size, n_Seasons, n_seed=0):
+
+    """
+    Generates a positive, trending and seasonal series with AR(1) noise, resembling the torque observations.
+    Args:
+        n_size (int): The amount of observations
+        n_Seasons (int): The amount of observations per season
+        n_seed (int): The seed of the random number generator
+    Returns:
+        (pandas.DataFrame): A dataframe with a single coloumn "Torque"
+    """
+    rng = np.random.default_rng(n_seed)
+    a_noise = rng.normal(0, 0.05, n_size)
+    a_ar = np.empty(n_size)
+    a_ar[0] = a_noise[0]
+    for t in range(1, n_size):
+        a_ar[t] = 0.6 * a_ar[t - 1] + a_noise[t]
+
+    a_time = np.arange(n_size)
+    a_values = 2 + 0.3 * np.sin(2 * np.pi * a_time / n_Seasons) + 0.5 * a_time / n_size + a_ar
+    return pd.DataFrame({"Torque": np.abs(a_values)})
+
+def benchmarkSyntheticSeries(n_size, n_Seasons, n_alpha, s_test_type, n_repeat):
+
+    """
+    Times the stages of the time series analysis on a synthetic series of the given length.
+    Returns:
+        dict_timings (dict): A dictionary containing a list of wall times in seconds per stage
+    """
+    df_series = getSyntheticSeries(n_size, n_Seasons)
+    n_observ_train = dfUtils.getTrainSize(len(df_series), n_Seasons, 0.8)
+    df_train = df_series.iloc[:n_observ_train]
+    df_test = df_series.iloc[n_observ_train:].reset_index(drop=True)
+
+    dict_timings = {}
+    for n_run in range(n_repeat):
+        timeTimeSeriesAnalysis(df_train, df_test, n_Seasons, n_alpha, s_test_type, dict_timings)
+        print(f"synthetic_{n_size}: run {n_run + 1}/{n_repeat} done")
+    return dict_timings
+
+def getVersions():
+
+    """
+    Collects platform information and the versions of the heavy dependencies for the benchmark metadata.
+    """
+    import coreforecast, matplotlib, sklearn, statsmodels
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "statsmodels": statsmodels.__version__,
+        "sklearn": sklearn.__version__,
+        "matplotlib": matplotlib.__version__,
+        "coreforecast": getattr(coreforecast, "__version__", "unknown")
+    }
+
+def runBenchmarks(l_sizes, n_Seasons=39, n_alpha=0.05, s_test_type="ADF", n_repeat=1, b_real=True):
+
+    """
+    A function for running the benchmark suite.
+    This function performs the following operations:
+        1. Times the pipeline on the shipped test data
+        2. Times the time series analysis on synthetic series of every given size
+        3. Condenses the timings to minimum and median per dataset and stage
+    Args:
+        l_sizes (list): A list of lengths of the synthetic series
+        n_Seasons (int): An integer indicating the number of seasons/periods
+        n_alpha (float): A floating point value for tests invloving an alpha value
+        s_test_type (str): A string containing the stationary test type
+        n_repeat (int): The number of repetitions per dataset
+        b_real (bool): A boolean for including the shipped test data
+    Returns:
+        dict_report (dict): A dictionary containing the metadata and one entry per dataset and stage
+    """
+    dict_datasets = {}
+    if b_real:
+        for str_name, t_paths in DICT_REAL_DATASETS.items():
+            dict_datasets[str_name] = benchmarkRealDataset(str_name, t_paths, n_Seasons, n_alpha, s_test_type, n_repeat)
+    for n_size in l_sizes:
+        dict_datasets[f"synthetic_{n_size}"] = benchmarkSyntheticSeries(n_size, n_Seasons, n_alpha, s_test_type, n_repeat)
+
+    l_results = []
+    for str_dataset, dict_timings in dict_datasets.items():
+        for str_stage, l_seconds in dict_timings.items():
+            l_results.append({
+                "dataset": str_dataset,
+                "stage": str_stage,
+                "seconds": l_seconds,
+                "min": min(l_seconds),
+                "median": statistics.median(l_seconds)
+            })
+
+    dict_report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "n_Seasons": n_Seasons,
+            "n_alpha": n_alpha,
+            "s_test_type": s_test_type,
+            "n_repeat": n_repeat,
+            "versions": getVersions()
+        },
+        "results": l_results
+    }
+    return dict_report
+
+def measureImport(str_module):
+
+    """
+    Measures the import time of a module in a fresh interpreter and lists the heavy dependencies loaded by it.
+    Args:
+        str_module (str): The full name of the module
+    Returns:
+        tuple (n_seconds, l_heavy_loaded):
+            n_seconds (float): The import time in seconds
+            l_heavy_loaded (list): The heavy dependencies found in sys.modules after the import
+    """
+    str_code = (
+        "import json, sys, time\n"
+        "n_start = time.perf_counter()\n"
+        f"import {str_module}\n"
+        "n_seconds = time.perf_counter() - n_start\n"
+        f"print(json.dumps([n_seconds, [s for s in {L_HEAVY_MODULES!r} if s in sys.modules]]))\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", str_code], cwd=script_dir.parent.parent, capture_output=True, text=True, check=True)
+    n_seconds, l_heavy_loaded = json.loads(proc.stdout.strip().splitlines()[-1])
+    return n_seconds, l_heavy_loaded
+
+def checkImportBudget(dict_budgets=DICT_IMPORT_BUDGETS, n_repeat=3):
+
+    """
+    A function for checking the import time budgets.
+    This function performs the following operations:
+        1. Measures the import time of every module several times and keeps the minimum
+        2. Checks the minimum against the budget and that no heavy dependency was loaded
+    Args:
+        dict_budgets (dict): A dictionary containing the budget in seconds per module
+        n_repeat (int): The number of measurements per module
+    Returns:
+        l_results (list): A list of dictionaries, one per module
+    """
+    l_results = []
+    for str_module, n_budget in dict_budgets.items():
+        l_measurements = [measureImport(str_module) for _ in range(n_repeat)]
+        n_seconds = min(n_seconds for n_seconds, _ in l_measurements)
+        l_heavy_loaded = l_measurements[0][1]
+        l_results.append({
+            "module": str_module,
+            "seconds": n_seconds,
+            "budget": n_budget,
+            "heavy_loaded": l_heavy_loaded,
+            "ok": n_seconds <= n_budget and not l_heavy_loaded
+        })
+    return l_results
+
+def getPeakRSS():
+
+    """
+    Returns:
+        (int): The peak resident set size of the current process in bytes
+    """
+    try:
+        import resource
+    except ImportError: # Windows
+        import psutil
+        return psutil.Process().memory_info().peak_wset
+
+    n_maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return n_maxrss if sys.platform == "darwin" else n_maxrss * 1024 # kilobytes except on macOS
+
+def holdResults(n_series, str_dataset="3mm", n_Seasons=39, n_alpha=0.05, s_test_type="ADF", b_lean=False):
+
+    """
+    Analyses the base and the anomalous process of a shipped dataset in turns and holds on to all results, like a batch run collecting results in memory.
+    Returns:
+        (int): The peak resident set size of the current process in bytes
+    """
+    l_sets = []
+    for str_path in DICT_REAL_DATASETS[str_dataset]:
+        df_train, df_test = dfUtils.getTrainAndTestSetFromCSV(str_path, n_Seasons, "Torque_ax8", "Torque", True, 0.8)
+        l_sets.append((df_train.abs(), df_test.abs()))
+
+    l_results = []
+    for i in range(n_series):
+        df_train, df_test = l_sets[i % len(l_sets)]
+        l_results.append(run.doTimeSeriesAnalysis(df_train, df_test, n_Seasons, n_alpha, s_test_type, b_lean=b_lean))
+    return getPeakRSS()
+
+def compareResultMemory(n_series=10, str_dataset="3mm"):
+
+    """
+    A function for comparing the peak resident set size of holding full and lean results, see run.doTimeSeriesAnalysis().
+    Each mode runs in a fresh interpreter, so that both peaks start from the same baseline.
+    Args:
+        n_series (int): The number of analyses whose results are held at once
+        str_dataset (str): The key of the shipped dataset in DICT_REAL_DATASETS
+    Returns:
+        df_memory (pandas.DataFrame): A dataframe with one row per mode
+    """
+    l_rows = []
+    for b_lean in (False, True):
+        str_code = (
+            "import json\n"
+            "from SourceCode.source import Benchmark\n"
+            f"print(json.dumps(Benchmark.holdResults({n_series}, {str_dataset!r}, b_lean={b_lean})))\n"
+        )
+        proc = subprocess.run([sys.executable, "-c", str_code], cwd=script_dir.parent.parent, capture_output=True, text=True, check=True)
+        l_rows.append({
+            "mode": "lean" if b_lean else "full",
+            "dataset": str_dataset,
+            "series": n_series,
+            "peak_rss_mb": round(json.loads(proc.stdout.strip().splitlines()[-1]) / 2**20, 1)
+        })
+
+    df_memory = pd.DataFrame(l_rows)
+    df_memory["ratio"] = (df_memory["peak_rss_mb"] / df_memory["peak_rss_mb"].iloc[0]).round(3)
+    return df_memory
+
+def compareReports(dict_report, dict_baseline, n_tolerance=0.2):
+
+    """
+    A function for comparing a benchmark report with a baseline report.
+    This function performs the following operations:
+        1. Matches the entries of both reports by dataset and stage
+        2. Computes the ratio of the minimum wall times
+        3. Flags a regression if the ratio exceeds one plus the tolerance
+    Args:
+        dict_report (dict): The new benchmark report
+        dict_baseline (dict): The baseline benchmark report
+        n_tolerance (float): The allowed relative slowdown
+    Returns:
+        df_comparison (pandas.DataFrame): A dataframe with one row per matching dataset and stage
+    """
+    dict_baseline_min = {(dict_entry["dataset"], dict_entry["stage"]): dict_entry["min"] for dict_entry in dict_baseline["results"]}
+
+    l_rows = []
+    for dict_entry in dict_report["results"]:
+        t_key = (dict_entry["dataset"], dict_entry["stage"])
+        if t_key not in dict_baseline_min:
+            continue
+        n_ratio = dict_entry["min"] / dict_baseline_min[t_key] if dict_baseline_min[t_key] > 0 else np.inf
+        l_rows.append({
+            "dataset": t_key[0],
+            "stage": t_key[1],
+            "baseline_s": round(dict_baseline_min[t_key], 6),
+            "new_s": round(dict_entry["min"], 6),
+            "ratio": round(n_ratio, 3),
+            "regression": n_ratio > 1 + n_tolerance
+        })
+    return pd.DataFrame(l_rows, columns=["dataset", "stage", "baseline_s", "new_s", "ratio", "regression"])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Times the stages of the time series analysis and outlier detection pipeline.")
+    parser.add_argument("--sizes", type=int, nargs="*", default=L_SYNTHETIC_SIZES, help="lengths of the synthetic series")
+    parser.add_argument("--repeat", type=int, default=1, help="repetitions per dataset")
+    parser.add_argument("--no-real", action="store_true", help="skip the shipped test data")
+    parser.add_argument("--output", default=None, help="path of the JSON report, defaults to output/benchmarks/benchmark_<timestamp>.json")
+    parser.add_argument("--compare", default=None, help="path of a baseline JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown before a stage counts as regression")
+    parser.add_argument("--imports", action="store_true", help="only check the import time budgets")
+    parser.add_argument("--lean-memory", type=int, default=None, metavar="N_SERIES", help="only compare the peak memory of holding N_SERIES full and lean results of the 3mm data")
+    args = parser.parse_args()
+
+    if args.lean_memory:
+        print(compareResultMemory(args.lean_memory).to_markdown(index=False))
+        raise SystemExit(0)
+
+    if args.imports:
+        df_imports = pd.DataFrame(checkImportBudget())
+        print(df_imports.to_markdown(index=False))
+        raise SystemExit(0 if df_imports["ok"].all() else 1)
+
+    dict_report = runBenchmarks(args.sizes, n_repeat=args.repeat, b_real=not args.no_real)
+
+    str_output = args.output
+    if str_output is None:
+        path_dir = script_dir.parent / "output" / "benchmarks"
+        path_dir.mkdir(parents=True, exist_ok=True)
+        str_output = path_dir / f"benchmark_{datetime.datetime.now():%Y%m%d_%H%M%S}.json"
+    with open(str_output, "w", encoding="utf-8") as f:
+        json.dump(dict_report, f, indent=4)
+
+    print(pd.DataFrame(dict_report["results"]).drop(columns=["seconds"]).to_markdown(index=False))
+    print(f"Report saved to {str_output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            df_comparison = compareReports(dict_report, json.load(f), args.tolerance)
+        print(df_comparison.to_markdown(index=False))
+        if df_comparison["regression"].any():
+            raise SystemExit(1)
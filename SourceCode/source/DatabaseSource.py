@@ -0,0 +1,228 @@
+"""
+Provides functions for reading the dependent variable straight from the machine database instead of an exported csv file.
+Connections are opened through pools, one per connection string, which are shared by all jobs of a process. The pools live as long as the process,
+so only jobs running in the same worker process reuse connections, see BatchRun.runBatch().
+A connection string starting with "sqlite:///" opens a local SQLite file as stand-in for the SQL Server database, any other string is handed to pyodbc.
+"""
+
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+import queue
+import re
+import threading
+from . import UtilsDataFrame as dfUtils
+
+# The table of the machine data, see testData/Query_150mm_noDMG_23092025.sql. SQLite has no schemas, the stand-in uses the bare table name
+STR_TABLE = "dbo.MaschinenDatenAI"
+STR_TABLE_SQLITE = "MaschinenDatenAI"
+STR_TIME_COLUMN = "Zeitstempel"
+
+# Identifiers cannot be passed as query parameters, so table and column names are checked against this pattern instead
+RE_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$")
+
+dict_pools = {}
+lock_pools = threading.Lock()
+
+class ConnectionPool:
+
+    """
+    Hands out database connections and takes them back for reuse instead of opening a new connection per query.
+    Args:
+        connect (callable): A function without arguments opening a new DB-API connection
+        n_max_size (int): The maximum number of idle connections kept open
+    """
+
+    def __init__(self, connect, n_max_size=4):
+        self.connect = connect
+        self.queue_idle = queue.LifoQueue(maxsize=n_max_size)
+
+    @contextmanager
+    def connection(self):
+        """
+        A context manager providing a connection, which is returned to the pool afterwards or closed if the pool is full or the connection failed.
+        """
+        try:
+            conn = self.queue_idle.get_nowait()
+        except queue.Empty:
+            conn = self.connect()
+
+        try:
+            yield conn
+        except Exception:
+            conn.close() # the connection may be in an undefined state
+            raise
+        else:
+            conn.rollback() # end the read transaction before the next job uses the connection
+            try:
+                self.queue_idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self):
+        """
+        Closes all idle connections.
+        """
+        while True:
+            try:
+                self.queue_idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+def getPool(str_connection, n_max_size=4):
+
+    """
+    Returns the pool of a connection string, creating it on first use.
+    The pools are kept per process, a new worker process opens new connections.
+    Args:
+        str_connection (str): "sqlite:///<path>" for a local SQLite file or an ODBC connection string for the SQL Server
+        n_max_size (int): The maximum number of idle connections of a new pool
+    Returns:
+        (ConnectionPool): The pool shared by every caller using the same connection string
+    """
+    with lock_pools:
+        if str_connection not in dict_pools:
+            dict_pools[str_connection] = ConnectionPool(getConnector(str_connection), n_max_size)
+        return dict_pools[str_connection]
+
+def closePools():
+
+    """
+    Closes the idle connections of all pools and forgets the pools.
+    """
+    with lock_pools:
+        for pool in dict_pools.values():
+            pool.close()
+        dict_pools.clear()
+
+def getConnector(str_connection):
+
+    """
+    Returns a function opening a connection for the given connection string.
+    pyodbc is only needed for the SQL Server and therefore imported on demand.
+    """
+    if str_connection.startswith("sqlite:///"):
+        import sqlite3
+        str_path = str_connection[len("sqlite:///"):]
+        return lambda: sqlite3.connect(str_path, check_same_thread=False)
+
+    try:
+        import pyodbc
+    except ImportError as e:
+        raise ImportError("reading from the SQL Server requires pyodbc, install it or use a sqlite:/// connection string") from e
+    return lambda: pyodbc.connect(str_connection, readonly=True)
+
+def getDefaultTable(str_connection):
+
+    """
+    Returns the table of the machine data for the given connection string, without the dbo schema for SQLite.
+    """
+    return STR_TABLE_SQLITE if str_connection.startswith("sqlite:///") else STR_TABLE
+
+def buildQuery(l_columns, str_start=None, str_end=None, str_table=STR_TABLE):
+
+    """
+    Builds the query selecting only the given columns within the given time window, ordered by time.
+    Args:
+        l_columns (list): The names of the columns
+        str_start (str): The first time stamp of the window, e.g. "2025-09-23 15:11:00.000", None for no lower bound
+        str_end (str): The last time stamp of the window, None for no upper bound
+        str_table (str): The name of the table
+    Returns:
+        tuple (str_query, l_params):
+            str_query (str): The query with a ? placeholder per time bound
+            l_params (list): The time bounds in order of their placeholders
+    """
+    for str_identifier in [*l_columns, str_table]:
+        if not RE_IDENTIFIER.match(str_identifier):
+            raise ValueError(f"{str_identifier!r} is not a valid table or column name")
+
+    l_conditions = []
+    l_params = []
+    if str_start is not None:
+        l_conditions.append(f"{STR_TIME_COLUMN} >= ?")
+        l_params.append(str_start)
+    if str_end is not None:
+        l_conditions.append(f"{STR_TIME_COLUMN} <= ?")
+        l_params.append(str_end)
+
+    str_query = f"SELECT {', '.join(l_columns)} FROM {str_table}"
+    if l_conditions:
+        str_query += " WHERE " + " AND ".join(l_conditions)
+    str_query += f" ORDER BY {STR_TIME_COLUMN}"
+    return str_query, l_params
+
+def readTimeSeriesSQL(str_connection, sDepVar, str_start=None, str_end=None, str_table=None, n_batch_rows=10000, dtype=np.float64):
+
+    """
+    Streams a single dependent variable out of the database into a numeric array.
+    This function performs the following operations:
+        1. Queries only the dependent variable within the time window, using a pooled connection
+        2. Fetches the rows in batches of n_batch_rows and converts each batch right away
+        3. Converts numbers stored as text with German decimal commas as well, missing values become NaN
+    Args:
+        str_connection (str): "sqlite:///<path>" for a local SQLite file or an ODBC connection string for the SQL Server
+        sDepVar (str): The name of the desired dependent variable
+        str_start (str): The first time stamp of the window, None for no lower bound
+        str_end (str): The last time stamp of the window, None for no upper bound
+        str_table (str): The name of the table, None uses the machine data table, see getDefaultTable()
+        n_batch_rows (int): The amount of rows fetched at once
+        dtype (numpy.dtype): The floating point type of the values
+    Returns:
+        a_values (numpy.array): A one dimensional array in order of time
+    """
+    if str_table is None:
+        str_table = getDefaultTable(str_connection)
+    str_query, l_params = buildQuery([sDepVar], str_start, str_end, str_table)
+    l_batches = []
+
+    with getPool(str_connection).connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(str_query, l_params)
+            while True:
+                l_rows = cursor.fetchmany(n_batch_rows)
+                if not l_rows:
+                    break
+                l_batches.append(convertBatch([row[0] for row in l_rows], dtype))
+        finally:
+            cursor.close()
+
+    return np.concatenate(l_batches) if l_batches else np.empty(0, dtype=dtype)
+
+def convertBatch(l_values, dtype=np.float64):
+
+    """
+    Converts a batch of fetched values to a numeric array, numbers stored as text may use a German decimal comma.
+    """
+    try:
+        return np.asarray(l_values, dtype=dtype)
+    except (TypeError, ValueError):
+        return np.asarray([value.replace(",", ".") if isinstance(value, str) else value for value in l_values], dtype=dtype)
+
+def getTrainAndTestSetSQL(str_connection, nObsPerSeason, depVar, sRenameDepVar, n_Split, str_start=None, str_end=None, str_table=None, n_batch_rows=10000):
+
+    """
+    A wrapper function for returning a training and test set straight from the database, the counterpart of UtilsDataFrame.getTrainAndTestSetFromCSV().
+    Args:
+        str_connection (str): "sqlite:///<path>" for a local SQLite file or an ODBC connection string for the SQL Server
+        nObsPerSeason (int): The amount of observations per season
+        depVar (str): The name of the desired dependent variable
+        sRenameDepVar (str): String for renaming the desired dependent variable
+        n_Split (float): A number indicating the training/test split
+        str_start (str): The first time stamp of the window, None for no lower bound
+        str_end (str): The last time stamp of the window, None for no upper bound
+        str_table (str): The name of the table, None uses the machine data table, see getDefaultTable()
+        n_batch_rows (int): The amount of rows fetched at once
+    Returns:
+        tuple (df_train_set, df_test_set):
+            df_train_set (pandas.DataFrame): The training set
+            df_test_set (pandas.DataFrame): The test set
+    """
+    a_values = readTimeSeriesSQL(str_connection, depVar, str_start, str_end, str_table, n_batch_rows)
+    n_observ_train = dfUtils.getTrainSize(len(a_values), nObsPerSeason, n_Split)
+    sName = sRenameDepVar if sRenameDepVar else depVar
+
+    df_train_set = pd.DataFrame({sName: a_values[:n_observ_train]}, copy=False)
+    df_test_set = pd.DataFrame({sName: a_values[n_observ_train:]}, copy=False)
+    return df_train_set, df_test_set
@@ -2,14 +2,43 @@
 Provides functions for evaluating model and outlier detector performance.
 """
 
-from sklearn.metrics import mean_absolute_error
-from sklearn.metrics import confusion_matrix
-from sklearn.metrics import precision_score, recall_score
+from concurrent.futures import ProcessPoolExecutor
+import math
 import numpy as np
+import pandas as pd
 from . import ARIMAUtils as arimaUtil
 from . import OutlierDetectorUtil as outDetUtil
 
 def getEvaluationResults(df_test_base_results, df_test_ano_results):
+    """
+    A function for determining forecasting precision and determining outlier detector performance based on a confusion matrix.
+    The metrics are computed by getEvaluationMetrics() and formatted as percentages.
+    Args:
+        df_test_base_results (dict): A dictionary containing information from the previous time series analysis steps of the base process
+        df_test_ano_results (dict): A dictionary containing information from the previous time series analysis steps of the anomalous process
+    Returns:
+        dict_results (dict): A dictionary containing the MAE values and confusion matrix, with the computed recall and precision
+    """
+    dict_metrics = getEvaluationMetrics(df_test_base_results, df_test_ano_results)
+
+    dict_results = {
+        "base_to_base": f"{dict_metrics['base_to_base']:.6f}%",
+        "ano_to_ano":f"{dict_metrics['ano_to_ano']:.6f}%",
+        "base_to_ano":f"{dict_metrics['base_to_ano']:.6f}%",
+        "ano_to_base": f"{dict_metrics['ano_to_base']:.6f}%",
+        "cm": {
+            "TN": dict_metrics["TN"],
+            "FP": dict_metrics["FP"],
+            "FN": dict_metrics["FN"],
+            "TP": dict_metrics["TP"],
+            "precision":f"{dict_metrics['precision']:.6f}%",
+            "recall": f"{dict_metrics['recall']:.6f}%"
+        }
+    }
+
+    return dict_results
+
+def getEvaluationMetrics(df_test_base_results, df_test_ano_results):
     """
     A function for determining forecasting precision and determining outlier detector performance based on a confusion matrix.
     This function performs the following operations:
@@ -19,13 +48,14 @@ def getEvaluationResults(df_test_base_results, df_test_ano_results):
         4. Constructs a ground truth label set with a concatenated set of base and anomalous test sets
         5. Obtains the predicted labels via application of the detector on the test sets and concatenates the produced labels
         6. Constructs the confusion matrix based on ground truth and predicted labels
-        7. Saves the result in a dict object and returns it along MAE values
+        7. Returns the MAE values, the confusion matrix and the computed recall and precision as numbers
     Args:
         df_test_base_results (dict): A dictionary containing information from the previous time series analysis steps of the base process
         df_test_ano_results (dict): A dictionary containing information from the previous time series analysis steps of the anomalous process
     Returns:
-        dict_results (dict): A dictionary containing the MAE values and confusion matrix, with the computed recall and precision
+        dict_metrics (dict): A dictionary containing the MAE values and precision and recall in percent and the counts of the confusion matrix
     """
+    from sklearn.metrics import mean_absolute_error, confusion_matrix, precision_score, recall_score
 
     # base
     df_test_base_obs = df_test_base_results["test_set"]
@@ -67,24 +97,194 @@ def getEvaluationResults(df_test_base_results, df_test_ano_results):
     y_pred = np.concatenate([anomaly_indices_base, anomaly_indices_ano])
 
 
-    cm = confusion_matrix(y_true, y_pred)
+    cm = confusion_matrix(y_true, y_pred, labels=[0, 1])
     TN, FP, FN, TP = cm.ravel()
-    precision = precision_score(y_true, y_pred) * 100
-    recall = recall_score(y_true, y_pred) * 100
+    precision = precision_score(y_true, y_pred, zero_division=0) * 100
+    recall = recall_score(y_true, y_pred, zero_division=0) * 100
 
-    dict_results = {
-        "base_to_base": f"{n_MAE_base_base:.6f}%",
-        "ano_to_ano":f"{n_MAE_ano_ano:.6f}%",
-        "base_to_ano":f"{n_MAE_base_ano:.6f}%",
-        "ano_to_base": f"{n_MAE_ano_base:.6f}%",
-        "cm": {
-            "TN": TN,
-            "FP": FP,
-            "FN": FN ,
-            "TP": TP,
-            "precision":f"{precision:.6f}%",
-            "recall": f"{recall:.6f}%"
-        }
+    dict_metrics = {
+        "base_to_base": n_MAE_base_base,
+        "ano_to_ano": n_MAE_ano_ano,
+        "base_to_ano": n_MAE_base_ano,
+        "ano_to_base": n_MAE_ano_base,
+        "TN": TN,
+        "FP": FP,
+        "FN": FN,
+        "TP": TP,
+        "precision": precision,
+        "recall": recall
+    }
+
+    return dict_metrics
+
+def getRollingOrigins(n_rows, n_Seasons, n_folds, n_horizon_seasons=1, n_step_seasons=1, n_min_train_seasons=None):
+
+    """
+    Computes the season aligned cut points of a rolling origin backtest, so that the test set of the last fold ends with the last full season.
+    Args:
+        n_rows (int): The amount of observations
+        n_Seasons (int): An integer indicating the number of seasons/periods
+        n_folds (int): The number of folds
+        n_horizon_seasons (int): The number of seasons within the test set of a fold
+        n_step_seasons (int): The number of seasons the origin moves on from one fold to the next
+        n_min_train_seasons (int): The minimum number of seasons within the training set of the first fold. None derives it from the correlation analysis,
+                                   which needs 2 * n_Seasons lags below half of the training set after up to two differences
+    Returns:
+        l_cuts (list): The amount of training observations per fold, in ascending order
+    """
+    if n_min_train_seasons is None:
+        # PACF with 2 * n_Seasons lags needs more than twice as many observations left after differencing up to twice, see ACF_PACFUtils
+        n_min_train_seasons = math.ceil((2 * (2 * n_Seasons + 1) + 2) / n_Seasons)
+    n_seasons = n_rows // n_Seasons
+    n_first_train_seasons = n_seasons - n_horizon_seasons - (n_folds - 1) * n_step_seasons
+    if n_first_train_seasons < n_min_train_seasons:
+        raise ValueError(f"{n_seasons} seasons are too few for {n_folds} folds, the first fold would be trained on {n_first_train_seasons} seasons instead of at least {n_min_train_seasons}")
+
+    l_cuts = [(n_first_train_seasons + i * n_step_seasons) * n_Seasons for i in range(n_folds)]
+    return l_cuts
+
+def backtestChain(df_series, l_cuts, n_horizon, n_Seasons, n_alpha, s_test_type, n_drift_factor=None, b_warm_start=False):
+
+    """
+    Runs consecutive folds of a rolling origin backtest of one process.
+    This function performs the following operations:
+        1. Runs the whole time series analysis on the training set of the first fold
+        2. Extends the state of the fitted model by the observations between two origins for every further fold via run.updateTimeSeriesAnalysis(),
+           which refits only if drift is detected
+        3. Keeps the fitted model, lambda and test set of every fold for the evaluation
+    A failed fold is reported and the next fold starts over with the whole time series analysis.
+    Args:
+        df_series (pandas.DataFrame): A dataframe containing the whole series of the process
+        l_cuts (list): The amount of training observations per fold, in ascending order
+        n_horizon (int): The amount of test observations per fold
+        n_Seasons (int): An integer indicating the number of seasons/periods
+        n_alpha (float): A floating point value for tests invloving an alpha value
+        s_test_type (str): A string containing the stationary test type
+        n_drift_factor (float): Refits a fold if the MAE on the new observations exceeds the out of sample MAE by this factor, None never refits
+        b_warm_start (bool): A boolean for warm starting the ARIMA candidates
+    Returns:
+        l_folds (list): A dictionary per fold with the fields getEvaluationMetrics() needs and whether the fold was refitted, or the exception of a failed fold
+    """
+    from . import run as run
+
+    l_folds = []
+    dict_results = None
+    n_previous_cut = None
+    for n_cut in l_cuts:
+        df_test = df_series.iloc[n_cut:n_cut + n_horizon]
+        try:
+            if dict_results is None:
+                dict_results = run.doTimeSeriesAnalysis(df_series.iloc[:n_cut], df_test, n_Seasons, n_alpha, s_test_type, b_warm_start=b_warm_start)
+                b_refit = True
+            else:
+                run.updateTimeSeriesAnalysis(dict_results, df_series.iloc[n_previous_cut:n_cut], n_Seasons, n_alpha, s_test_type, n_drift_factor=n_drift_factor,
+                                             b_warm_start=b_warm_start, df_test_new=df_test)
+                b_refit = dict_results["update_info"]["refit"]
+        except Exception as e:
+            l_folds.append(e)
+            dict_results = None
+            continue
+
+        l_folds.append({
+            "test_set": df_test,
+            "fitted_optimal_model": dict_results["fitted_optimal_model"],
+            "train_trans_set": {"opt_lambda": dict_results["train_trans_set"]["opt_lambda"]},
+            "refit": b_refit
+        })
+        n_previous_cut = n_cut
+
+    return l_folds
+
+def backtestRollingOrigin(df_base, df_anomaly, n_Seasons, n_alpha, s_test_type, n_folds=5, n_horizon_seasons=1, n_step_seasons=1, n_chain_length=3, n_drift_factor=None, n_workers=None, b_warm_start=False, n_min_train_seasons=None):
+
+    """
+    A function for evaluating forecasting precision and outlier detector performance over many season aligned origins instead of a single split.
+    This function performs the following operations:
+        1. Computes the origins of both processes, the test sets of the last fold end with their last full season
+        2. Splits the folds into chains of n_chain_length consecutive folds, every chain starts with a whole time series analysis
+           and its further folds extend the state of the previous fold's model
+        3. Runs the chains of both processes in parallel
+        4. Evaluates every fold with getEvaluationMetrics()
+        5. Aggregates the metrics over the folds, precision and recall are additionally pooled over the confusion matrices of all folds
+    Longer chains fit fewer models, shorter chains run more of them in parallel.
+    Args:
+        df_base (pandas.DataFrame): A dataframe containing the whole series of the base process
+        df_anomaly (pandas.DataFrame): A dataframe containing the whole series of the anomalous process
+        n_Seasons (int): An integer indicating the number of seasons/periods
+        n_alpha (float): A floating point value for tests invloving an alpha value
+        s_test_type (str): A string containing the stationary test type
+        n_folds (int): The number of folds
+        n_horizon_seasons (int): The number of seasons within the test set of a fold
+        n_step_seasons (int): The number of seasons the origin moves on from one fold to the next
+        n_chain_length (int): The number of consecutive folds sharing one fitted model, 1 refits every fold
+        n_drift_factor (float): Refits a fold within a chain if the MAE on the new observations exceeds the out of sample MAE by this factor, None never refits
+        n_workers (int): The number of worker processes running the chains, None uses the number of processors and 1 runs them one after another
+        b_warm_start (bool): A boolean for warm starting the ARIMA candidates
+        n_min_train_seasons (int): The minimum number of seasons within the training set of the first fold, None derives it from the lags, see getRollingOrigins()
+    Returns:
+        dict_results (dict): A dictionary containing
+            folds (pandas.DataFrame): The origins, refit flags and metrics per fold
+            aggregate (pandas.DataFrame): Mean, standard deviation, minimum and maximum of every metric over the folds
+            pooled (dict): Precision and recall in percent of the summed confusion matrices
+            errors (dict): The error per failed fold
+    """
+    n_horizon = n_horizon_seasons * n_Seasons
+    dict_cuts = {
+        "base": getRollingOrigins(len(df_base), n_Seasons, n_folds, n_horizon_seasons, n_step_seasons, n_min_train_seasons),
+        "anomaly": getRollingOrigins(len(df_anomaly), n_Seasons, n_folds, n_horizon_seasons, n_step_seasons, n_min_train_seasons)
+    }
+    dict_series = {"base": df_base, "anomaly": df_anomaly}
+
+    # === 1. Chains of both processes ===================================================
+    l_jobs = [(str_process, n_start) for str_process in ("base", "anomaly") for n_start in range(0, n_folds, n_chain_length)]
+    l_args = [(dict_series[str_process], dict_cuts[str_process][n_start:n_start + n_chain_length], n_horizon, n_Seasons, n_alpha, s_test_type, n_drift_factor, b_warm_start) for str_process, n_start in l_jobs]
+    if n_workers == 1:
+        l_chains = [backtestChain(*args) for args in l_args]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            l_chains = list(executor.map(backtestChain, *zip(*l_args)))
+
+    dict_folds = {"base": [], "anomaly": []}
+    for (str_process, _), l_folds in zip(l_jobs, l_chains):
+        dict_folds[str_process].extend(l_folds)
+
+    # === 2. Metrics per fold ===========================================================
+    l_rows = []
+    dict_errors = {}
+    for i in range(n_folds):
+        fold_base, fold_anomaly = dict_folds["base"][i], dict_folds["anomaly"][i]
+        l_errors = [f"{str_process}: {type(fold).__name__}: {fold}" for str_process, fold in (("base", fold_base), ("anomaly", fold_anomaly)) if isinstance(fold, Exception)]
+        if l_errors:
+            dict_errors[i] = "; ".join(l_errors)
+            continue
+
+        l_rows.append({
+            "fold": i,
+            "origin_base": dict_cuts["base"][i],
+            "origin_anomaly": dict_cuts["anomaly"][i],
+            "refit_base": fold_base["refit"],
+            "refit_anomaly": fold_anomaly["refit"],
+            **getEvaluationMetrics(fold_base, fold_anomaly)
+        })
+
+    if not l_rows:
+        raise ValueError(f"every fold failed: {dict_errors}")
+    df_folds = pd.DataFrame(l_rows)
+
+    # === 3. Aggregation ================================================================
+    l_metrics = ["base_to_base", "ano_to_ano", "base_to_ano", "ano_to_base", "precision", "recall"]
+    df_aggregate = df_folds[l_metrics].agg(["mean", "std", "min", "max"])
+
+    n_TP, n_FP, n_FN = (int(df_folds[str_count].sum()) for str_count in ("TP", "FP", "FN"))
+    dict_pooled = {
+        "precision": n_TP / (n_TP + n_FP) * 100 if n_TP + n_FP else 0.0,
+        "recall": n_TP / (n_TP + n_FN) * 100 if n_TP + n_FN else 0.0
     }
 
+    dict_results = {
+        "folds": df_folds,
+        "aggregate": df_aggregate,
+        "pooled": dict_pooled,
+        "errors": dict_errors
+    }
     return dict_results
@@ -0,0 +1,95 @@
+"""
+Provides functions for storing the results of the time series analysis on disk and reusing them as long as data and parameters are unchanged.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+# Part of every key, needs to be increased whenever the content of the stored results changes
+STORE_VERSION = 3
+
+def getStoreKey(df_train, df_test, n_Seasons, n_alpha, s_test_type, b_warm_start=False, b_lean=False, n_ljung_box_threshold=0.05, n_forecast_horizon=None):
+
+    """
+    Computes the key of a time series analysis based on its input data and parameters.
+    This function performs the following operations:
+        1. Hashes the parameters together with the store version
+        2. Hashes the column names and values of the training and test set
+        3. Returns the hash as hexadecimal string
+    Args:
+        df_train (pandas.DataFrame): A dataframe containing the training set
+        df_test (pandas.DataFrame): A dataframe containing the test set
+        n_Seasons (int): An integer indicating the number of seasons/periods
+        n_alpha (float): A floating point value for tests invloving an alpha value
+        s_test_type (str): A string containing the stationary test type
+        b_warm_start (bool): A boolean indicating warm started ARIMA candidates, which may converge to slightly different parameters
+        b_lean (bool): A boolean indicating lean results, which hold less than the full ones
+        n_ljung_box_threshold (float): The Ljung-Box p-value an ARIMA candidate needs to exceed to qualify
+        n_forecast_horizon (int): The length of the forecast after the training set, None for one season
+    Returns:
+        (str): The key of the time series analysis
+    """
+    hash_data = hashlib.sha256()
+    dict_params = {
+        "version": STORE_VERSION,
+        "n_Seasons": n_Seasons,
+        "n_alpha": n_alpha,
+        "s_test_type": s_test_type,
+        "b_warm_start": b_warm_start,
+        "b_lean": b_lean,
+        "n_ljung_box_threshold": n_ljung_box_threshold,
+        "n_forecast_horizon": n_forecast_horizon
+    }
+    hash_data.update(json.dumps(dict_params, sort_keys=True).encode("utf-8"))
+
+    for df_set in (df_train, df_test):
+        hash_data.update(json.dumps([str(column) for column in df_set.columns]).encode("utf-8"))
+        hash_data.update(str(df_set.shape).encode("utf-8"))
+        hash_data.update(df_set.to_numpy(dtype="float64").tobytes())
+
+    return hash_data.hexdigest()
+
+def loadResults(str_store_dir, str_key):
+
+    """
+    Loads the stored results of a time series analysis.
+    Args:
+        str_store_dir (str): A string pointing to the directory of the store
+        str_key (str): The key of the time series analysis as given by getStoreKey()
+    Returns:
+        dict_results (dict): The stored results, None if nothing is stored under the key or the stored file cannot be read
+    """
+    path_file = Path(str_store_dir) / f"{str_key}.pkl"
+    if not path_file.exists():
+        return None
+
+    try:
+        with open(path_file, "rb") as f:
+            return pickle.load(f)
+    except Exception as e:
+        print(f"Stored results {path_file.name} cannot be read, refitting instead: {e}")
+        return None
+
+def saveResults(str_store_dir, str_key, dict_results):
+
+    """
+    Stores the results of a time series analysis, containing among others the fitted optimal model, the Box-Cox lambda and the pipeline metadata.
+    The file is written to a temporary file first and then moved, so that concurrent runs never read a partially written file.
+    Args:
+        str_store_dir (str): A string pointing to the directory of the store
+        str_key (str): The key of the time series analysis as given by getStoreKey()
+        dict_results (dict): A dictionary containing information gathered during the time series analysis
+    """
+    os.makedirs(str_store_dir, exist_ok=True)
+    n_fd, str_tmp_path = tempfile.mkstemp(dir=str_store_dir, suffix=".tmp")
+    try:
+        with os.fdopen(n_fd, "wb") as f:
+            pickle.dump(dict_results, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(str_tmp_path, Path(str_store_dir) / f"{str_key}.pkl")
+    except Exception:
+        os.remove(str_tmp_path)
+        raise
@@ -0,0 +1,189 @@
+"""
+Provides an asyncio service monitoring machines continuously with the models of the time series analysis.
+Every machine has a data source which is polled for new observations, the observations are scored by an OnlineAnomalyDetector
+over a sliding window and a maintenance alert is emitted whenever the recommendation of a machine changes.
+The queues between polling, scoring and the alert consumer are bounded, so a slow consumer slows the polling down instead of piling up observations.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import inspect
+import math
+import time
+from . import OutlierDetectorUtil as outDetUtil
+from . import run as run
+
+class MonitoringService:
+
+    """
+    Polls the data sources of several machines concurrently and emits maintenance alerts.
+    A data source is a callable without arguments returning the new observations since its last call, None once it is exhausted.
+    It may be a coroutine function; blocking functions, e.g. database reads, are run on the default thread pool of the event loop.
+    Args:
+        n_window (int): The number of latest observations a recommendation is based on
+        n_queue_size (int): The maximum number of observations waiting per machine and of alerts waiting for the consumer
+        n_poll_interval (float): The seconds between two polls of a source
+        n_refit_workers (int): The number of worker processes refitting models, None uses the number of processors
+    """
+
+    def __init__(self, n_window=100, n_queue_size=1000, n_poll_interval=1.0, n_refit_workers=None):
+        self.n_window = n_window
+        self.n_queue_size = n_queue_size
+        self.n_poll_interval = n_poll_interval
+        self.n_refit_workers = n_refit_workers
+        self.dict_machines = {}
+        self.queue_alerts = asyncio.Queue(maxsize=n_queue_size) # created here, so that alerts() may be awaited before run()
+        self.executor = ProcessPoolExecutor(max_workers=n_refit_workers) # starts its worker processes with the first refit only
+        self.b_closed = False
+
+    def addMachine(self, str_name, source, m_TimeSeries_Baseline, m_TimeSeries_Anomalous):
+        """
+        Registers a machine before the service is started.
+        Args:
+            str_name (str): The name of the machine, used in its alerts
+            source (callable): The data source of the machine
+            m_TimeSeries_Baseline (dict): A dictionary containing information from the time series analysis of the base process
+            m_TimeSeries_Anomalous (dict): A dictionary containing information from the time series analysis of the anomalous process
+        """
+        self.dict_machines[str_name] = {
+            "source": source,
+            "base": m_TimeSeries_Baseline,
+            "anomaly": m_TimeSeries_Anomalous,
+            "detector": outDetUtil.OnlineAnomalyDetector(m_TimeSeries_Baseline, m_TimeSeries_Anomalous, n_window=self.n_window),
+            "str_recommendation": None,
+            "n_scored": 0
+        }
+
+    async def run(self):
+        """
+        Polls and scores every machine until all sources are exhausted. Alerts are available through alerts() meanwhile.
+        The refit workers stay available afterwards until close() is called.
+        """
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                for str_name in self.dict_machines:
+                    queue_observ = asyncio.Queue(maxsize=self.n_queue_size)
+                    task_group.create_task(self.poll(str_name, queue_observ))
+                    task_group.create_task(self.score(str_name, queue_observ))
+        finally:
+            # tells alerts() that no more alerts follow, without waiting for a consumer which may be gone already
+            if self.queue_alerts.full():
+                self.queue_alerts.get_nowait() # the oldest alert makes room
+            self.queue_alerts.put_nowait(None)
+
+    def close(self):
+        """
+        Stops the refit workers, pending refits are cancelled. refit() cannot be called afterwards.
+        """
+        self.b_closed = True
+        self.executor.shutdown(cancel_futures=True)
+
+    async def poll(self, str_name, queue_observ):
+        """
+        Polls the source of a machine and hands the observations over to the scoring, waiting while its queue is full.
+        """
+        source = self.dict_machines[str_name]["source"]
+        loop = asyncio.get_running_loop()
+        while True:
+            if inspect.iscoroutinefunction(source):
+                l_observ = await source()
+            else:
+                l_observ = await loop.run_in_executor(None, source)
+
+            if l_observ is None:
+                await queue_observ.put(None)
+                return
+            for n_observation in l_observ:
+                await queue_observ.put(float(n_observation))
+            await asyncio.sleep(self.n_poll_interval)
+
+    async def score(self, str_name, queue_observ):
+        """
+        Scores the observations of a machine and emits an alert whenever its recommendation changes once the window is full.
+        """
+        dict_machine = self.dict_machines[str_name]
+        while True:
+            n_observation = await queue_observ.get()
+            if n_observation is None:
+                return
+            if math.isnan(n_observation):
+                continue
+
+            detector = dict_machine["detector"]
+            detector.update(n_observation)
+            dict_machine["n_scored"] += 1
+            if detector.n_observations < self.n_window:
+                continue
+
+            dict_alert = {}
+            str_recommendation = detector.getRecommendation(dict_alert)
+            if str_recommendation != dict_machine["str_recommendation"]:
+                dict_machine["str_recommendation"] = str_recommendation
+                dict_alert.update({
+                    "machine": str_name,
+                    "time": time.time(),
+                    "n_observations": dict_machine["n_scored"]
+                })
+                await self.queue_alerts.put(dict_alert)
+
+    async def alerts(self):
+        """
+        An asynchronous iterator over the alerts of all machines, ending once the service stopped.
+        Yields:
+            dict_alert (dict): A dictionary containing machine, time, the number of observations scored so far, recommendation, failure percentage and lowest anomaly of the window
+        """
+        while True:
+            dict_alert = await self.queue_alerts.get()
+            if dict_alert is None:
+                return
+            yield dict_alert
+
+    async def refit(self, str_name, df_train, df_test, n_Seasons, n_alpha, s_test_type, b_anomaly=False):
+        """
+        Refits the base or anomalous model of a machine on a worker process while the event loop keeps polling and scoring.
+        It may be called before, during and after run() until close() is called.
+        The detector of the machine starts over with the medians of the new model.
+        Args:
+            str_name (str): The name of the machine
+            df_train (pandas.DataFrame): A dataframe containing the new training set
+            df_test (pandas.DataFrame): A dataframe containing the new test set
+            n_Seasons (int): An integer indicating the number of seasons/periods
+            n_alpha (float): A floating point value for tests invloving an alpha value
+            s_test_type (str): A string containing the stationary test type
+            b_anomaly (bool): A boolean for refitting the model of the anomalous instead of the base process
+        Returns:
+            dict_results (dict): The results of the new time series analysis
+        """
+        if self.b_closed:
+            raise RuntimeError(f"cannot refit {str_name}, the refit workers of the service were stopped by close()")
+        loop = asyncio.get_running_loop()
+        dict_results = await loop.run_in_executor(self.executor, run.doTimeSeriesAnalysis, df_train, df_test, n_Seasons, n_alpha, s_test_type)
+
+        dict_machine = self.dict_machines[str_name]
+        dict_machine["anomaly" if b_anomaly else "base"] = dict_results
+        dict_machine["detector"] = outDetUtil.OnlineAnomalyDetector(dict_machine["base"], dict_machine["anomaly"], n_window=self.n_window)
+        dict_machine["str_recommendation"] = None
+        return dict_results
+
+def replaySource(a_values, n_batch=10):
+
+    """
+    Creates a data source replaying recorded observations in batches, e.g. the test set of a csv file, for trying the service without a machine.
+    Args:
+        a_values (array-like): The recorded observations
+        n_batch (int): The number of observations returned per poll
+    Returns:
+        (callable): A data source returning the next batch per call and None once all observations were returned
+    """
+    l_values = [float(n_value) for n_value in a_values]
+    n_position = 0
+
+    def source():
+        nonlocal n_position
+        if n_position >= len(l_values):
+            return None
+        l_batch = l_values[n_position:n_position + n_batch]
+        n_position += n_batch
+        return l_batch
+
+    return source
@@ -2,12 +2,13 @@
 Provides functions for generating the outputs for time series analysis and outlier detection simulation.
 """
 
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import numpy as np
 import pandas as pd
 import os
 
-def output(l_TimeSeries_Result_Base,l_TimeSeries_Result_Anomaly,l_Evaluation, l_Outlier_Results,script_dir, str_FolderName =None):
+def output(l_TimeSeries_Result_Base,l_TimeSeries_Result_Anomaly,l_Evaluation, l_Outlier_Results,script_dir, str_FolderName =None, n_workers=None):
 
     """
     A wrapper function containing output methods for the results of the time series analysis of the base and anomalous process, as well as of the outlier detector.
@@ -24,24 +25,38 @@ def output(l_TimeSeries_Result_Base,l_TimeSeries_Result_Anomaly,l_Evaluation, l_
         l_Outlier_Results (dict): A dictionary containing the results of the outlier detector simulation
         script_dir (str): A string pointing to the right project directory
         str_FolderName (str): A string for naming a folder where the output can be stored
+        n_workers (int): The number of worker processes rendering the figures, None or 1 renders them one after another
     """
 
 
     #=== Time Series Result=====================================
 
-    plotOutputsTSA(l_TimeSeries_Result_Base,l_TimeSeries_Result_Anomaly, script_dir, str_FolderName)
+    plotOutputsTSA(l_TimeSeries_Result_Base,l_TimeSeries_Result_Anomaly, script_dir, str_FolderName, n_workers)
     # === Time Series Analysis output
 
     writeOutputsTSA(l_TimeSeries_Result_Base, script_dir,str_FolderName, "Base")
     writeOutputsTSA(l_TimeSeries_Result_Anomaly, script_dir,str_FolderName, "Anomaly")
 
     # === Outlier Results =============================================================
-    plotOutlierSim(l_Outlier_Results,script_dir, str_FolderName)
+    plotOutlierSim(l_Outlier_Results,script_dir, str_FolderName, n_workers)
 
     writeOutputOutlierSim(l_Outlier_Results,script_dir, str_FolderName)
     writeEval(l_Evaluation, script_dir, str_FolderName )
 
 
+@lru_cache(maxsize=None)
+def getTemplate(str_template_path):
+
+    """
+    Reads a markdown template. Each template is read only once per process and reused for every report.
+    Args:
+        str_template_path (str): The path of the template
+    Returns:
+        (str): The template text
+    """
+    with open(str_template_path, "r", encoding="utf-8") as f:
+        return f.read()
+
 def writeEval(l_Evaluation, script_dir, str_FolderName):
 
     """
@@ -57,21 +72,20 @@ def writeEval(l_Evaluation, script_dir, str_FolderName):
         str_FolderName (str): A string for naming a folder where the output can be stored
     """
 
-    with open(f"{script_dir.parent}/output/reportEvaluationTemplate.md", "r", encoding="utf-8") as f:
-        template_text = f.read()
+    template_text = getTemplate(f"{script_dir.parent}/output/reportEvaluationTemplate.md")
 
-        dict_context = {
-            "base_to_base": l_Evaluation["base_to_base"],
-            "ano_to_ano": l_Evaluation["ano_to_ano"],
-            "base_to_ano": l_Evaluation["base_to_ano"],
-            "ano_to_base": l_Evaluation["ano_to_base"],
-            "TN": l_Evaluation["cm"]["TN"],
-            "FP": l_Evaluation["cm"]["FP"],
-            "FN": l_Evaluation["cm"]["FN"] ,
-            "TP": l_Evaluation["cm"]["TP"],
-            "precision": l_Evaluation["cm"]["precision"],
-            "recall": l_Evaluation["cm"]["recall"]
-        }
+    dict_context = {
+        "base_to_base": l_Evaluation["base_to_base"],
+        "ano_to_ano": l_Evaluation["ano_to_ano"],
+        "base_to_ano": l_Evaluation["base_to_ano"],
+        "ano_to_base": l_Evaluation["ano_to_base"],
+        "TN": l_Evaluation["cm"]["TN"],
+        "FP": l_Evaluation["cm"]["FP"],
+        "FN": l_Evaluation["cm"]["FN"] ,
+        "TP": l_Evaluation["cm"]["TP"],
+        "precision": l_Evaluation["cm"]["precision"],
+        "recall": l_Evaluation["cm"]["recall"]
+    }
 
     try:
         os.makedirs(f"{script_dir.parent}/output/{str_FolderName}")
@@ -98,8 +112,7 @@ def writeOutputsTSA(l_TimeSeries_Results, script_dir, str_FolderName, str_tsa_na
         str_tsa_name (str): A string containing the string to identify the underlying process
     """
 
-    with open(f"{script_dir.parent}/output/reportTSATemplate.md", "r", encoding="utf-8") as f:
-        template_text = f.read()
+    template_text = getTemplate(f"{script_dir.parent}/output/reportTSATemplate.md")
 
     # construct strings and a proper table for displaying the results of the unit root tests
     dict_adf = l_TimeSeries_Results['adf_test_statistic']
@@ -183,8 +196,7 @@ def writeOutputOutlierSim(l_Outlier_Results,script_dir, str_FolderName):
         str_FolderName (str): A string for naming a folder where the output can be stored
     """
 
-    with open(f"{script_dir.parent}/output/reportOutlierSimTemplate.md", "r", encoding="utf-8") as f:
-        template_text = f.read()
+    template_text = getTemplate(f"{script_dir.parent}/output/reportOutlierSimTemplate.md")
 
 
     try:
@@ -209,175 +221,229 @@ def writeOutputOutlierSim(l_Outlier_Results,script_dir, str_FolderName):
         with open(f"{script_dir.parent}/output/{str_FolderName}/OutlierSim_{i}.md", "w", encoding="utf-8") as f:
             f.write(gen_text)
 
-def plotOutlierSim(l_Outlier_Results,script_dir, str_FolderName =None):
+def plotOutlierSim(l_Outlier_Results,script_dir, str_FolderName =None, n_workers=None):
 
     """
     A function for plotting the outlier detector simulations.
     This function performs the following operations:
-        1. Creates a figure and plots the medians of base and anomaly forecast
-        2. Plots the found anomalies
-        3. Creates and plots a no-anomaly area
-        4. Saves the output
+        1. Collects one figure per simulation, drawn by drawOutlierSim()
+        2. Renders and saves the figures, on a process pool if requested
 
     Args:
         l_Outlier_Results (dict): A dictionary containing information of the outlier detection simulation  
         script_dir (str): A string pointing to the right project directory
         str_FolderName (str): A string for naming a folder where the output can be stored
+        n_workers (int): The number of worker processes rendering the figures, None or 1 renders them one after another
     """
+    str_plot_dir = getPlotDir(script_dir, str_FolderName)
+    l_figures = []
     for i in range(len(l_Outlier_Results)):
     # outlier simulation results
         test_outlier = l_Outlier_Results[i]
+        dict_plot_data = {s_key: test_outlier[s_key] for s_key in ("df_baseline_fore_median", "df_anomal_fore_median_pos", "df_observ_outDet", "df_base_fore_band_values_upper", "df_anomalies_indices")}
+        l_figures.append((drawOutlierSim, f"{str_plot_dir}/OutlierSimulation_{i}.pdf", (dict_plot_data,)))
 
-        plt.figure(figsize=(6,4)) 
-        plt.title("Anomaly Detection Simulation", fontsize=16)
-        # === Create a blue "confidence band" based on the lowest found anomaly of baseline to observation
-        
-        # === Plot the forecasted base and anomalous value  
-        plt.plot(test_outlier["df_baseline_fore_median"], label="Forecast: Baseline", linestyle="--", color ="blue")
-        plt.plot(test_outlier["df_anomal_fore_median_pos"], label="Forecast: Anomaly Positive", linestyle="--", color ="orange")
-        plt.plot(test_outlier["df_observ_outDet"], label="Original Forecast", color="black")
-
-        # As we only have an anomaly set for a damaged mill head where the toque is higher than the base, only the uppe region is considered
-        plt.fill_between(test_outlier["df_baseline_fore_median"].index, test_outlier["df_baseline_fore_median"].squeeze(), test_outlier["df_base_fore_band_values_upper"].squeeze(), color="#0072B2", alpha=0.2, label="Limit for Baseline")
-        # === Plot the anomalies
-        plt.scatter(test_outlier["df_anomalies_indices"], test_outlier["df_observ_outDet"].iloc[test_outlier["df_anomalies_indices"]], color="red", marker="x", s=50, label="Anomaly Detected")
-
-        # === Create the plot with a legend and x an y-axis descriptions
-        plt.legend(loc="lower right")
-        plt.xlabel("Milling Steps(cumulated)")
-        plt.ylabel("Torque in Nm")
-        plt.grid(True, linestyle=":", alpha=0.6)
-        try: 
-            os.makedirs(f"{script_dir.parent}/output/{str_FolderName}/plots")
-        except:
-            print("Directory already existing. Using existing instead")
-        plt.savefig(f"{script_dir.parent}/output/{str_FolderName}/plots/OutlierSimulation_{i}.pdf", bbox_inches="tight")
-        plt.clf()
-        plt.close()
-
-def plotOutputsTSA(l_TimeSeries_Result_Base,l_TimeSeries_Result_Anomaly,script_dir, str_FolderName =None):
+    renderFigures(l_figures, n_workers)
+
+def plotOutputsTSA(l_TimeSeries_Result_Base,l_TimeSeries_Result_Anomaly,script_dir, str_FolderName =None, n_workers=None):
     """
     A function for plotting the results of the time series analysis pipeline.
     This function performs the following operations:
-        1. Creates a figure, plots the base and anomalous observations and saves the figure
-        2. Creates a figure, plots the observation and trend component of the STL decomposition of both processes and saves the figure
-        3. Creates a figure, plots the one season forecast and saves the figure
-        4. Plots the results of heteroscedasticity, to be used for further improvements
+        1. Collects a figure of the base and anomalous observations
+        2. Collects figures of the observation and trend component of the STL decomposition of both processes
+        3. Collects a figure of the one season forecast
+        4. Collects figures of the results of heteroscedasticity, to be used for further improvements
+        5. Renders and saves the figures, on a process pool if requested
 
     Args:
         l_TimeSeries_Result_Base (dict): A dictionary containing information from the time series analysis of the base process
         l_TimeSeries_Result_Anomaly (dict): A dictionary containing information from the time series analysis of the anomalous process
         script_dir (str): A string pointing to the right project directory
         str_FolderName (str): A string for naming a folder where the output can be stored
+        n_workers (int): The number of worker processes rendering the figures, None or 1 renders them one after another
     """
+    str_plot_dir = getPlotDir(script_dir, str_FolderName)
 
-
-    # === plot===
-        # ====Base and Anomaly as well as their respective transformations ====
+    # Only the data needed for drawing is handed over, so that the workers do not need to receive whole models
     tsa_base_original = pd.concat([l_TimeSeries_Result_Base["train_set"], l_TimeSeries_Result_Base["test_set"]]).reset_index(drop=True)
     tsa_anomaly_original = pd.concat([l_TimeSeries_Result_Anomaly["train_set"], l_TimeSeries_Result_Anomaly["test_set"]]).reset_index(drop=True)
-    plt.figure(figsize=(6,4)) 
-    plt.plot(tsa_base_original, label="Base Observation", color="blue", alpha=0.7)
-    plt.plot(tsa_anomaly_original, label="Anomaly Observation", color="red", alpha=0.7)
 
-    plt.title("Base and Anomaly Observations")
-    plt.legend()
-    plt.xlabel("Milling Steps (cumulated)")
-    plt.ylabel("Torque in Nm")
-    plt.grid(True, linestyle=":", alpha=0.6)
+    stl_fitted_base =l_TimeSeries_Result_Base["stl_train"]
+    stl_fitted_anomaly = l_TimeSeries_Result_Anomaly["stl_train"]
+
+    fitted_model_base = l_TimeSeries_Result_Base["fitted_optimal_model"]
+    fitted_model_anomaly = l_TimeSeries_Result_Anomaly["fitted_optimal_model"]
+
+    l_figures = [
+        (drawObservations, f"{str_plot_dir}/Observations.pdf", (tsa_base_original, tsa_anomaly_original)),
+        (drawSTL, f"{str_plot_dir}/STL_Base.pdf", (l_TimeSeries_Result_Base["train_trans_set"]["df_set"].index, stl_fitted_base.observed, stl_fitted_base.trend, "STL of Transformed Base Training Set", True)),
+        (drawSTL, f"{str_plot_dir}/STL_Anomaly.pdf", (l_TimeSeries_Result_Anomaly["train_trans_set"]["df_set"].index, stl_fitted_anomaly.observed, stl_fitted_anomaly.trend, "STL of Transformed Anomaly Training Set", False)),
+        (drawForecasts, f"{str_plot_dir}/BaseAndAnomalyForecast.pdf", (l_TimeSeries_Result_Base["forecast_next_season"], l_TimeSeries_Result_Anomaly["forecast_next_season"])),
+        (drawResidVariance, f"{str_plot_dir}/BaseResidVariance.pdf", (fitted_model_base.fittedvalues, fitted_model_base.resid, "Base Variance of Residuals")),
+        (drawResidVariance, f"{str_plot_dir}/AnomalyResidVariance.pdf", (fitted_model_anomaly.fittedvalues, fitted_model_anomaly.resid, "Anomaly Variance of Residuals"))
+    ]
+
+    renderFigures(l_figures, n_workers)
+
+def getPlotDir(script_dir, str_FolderName):
 
-    #== Save Figure
+    """
+    Creates the plot directory of an output folder if needed and returns its path.
+    Args:
+        script_dir (str): A string pointing to the right project directory
+        str_FolderName (str): A string for naming a folder where the output can be stored
+    Returns:
+        (str): The path of the plot directory
+    """
+    str_plot_dir = f"{script_dir.parent}/output/{str_FolderName}/plots"
     try: 
-        os.makedirs(f"{script_dir.parent}/output/{str_FolderName}/plots")
+        os.makedirs(str_plot_dir)
     except:
         print("Directory already existing. Using existing instead")
-    plt.savefig(f"{script_dir.parent}/output/{str_FolderName}/plots/Observations.pdf", bbox_inches="tight")
+    return str_plot_dir
 
-        # === Plot the respective STL graphs. Maybe only transformed observation and trend ===
-    tsa_base_train_trans = l_TimeSeries_Result_Base["train_trans_set"]["df_set"]
-    tsa_anomaly_train_trans = l_TimeSeries_Result_Anomaly["train_trans_set"]["df_set"]
+def renderFigures(l_figures, n_workers=None):
 
-    stl_fitted_base =l_TimeSeries_Result_Base["stl_train"]
-    stl_fitted_anomaly = l_TimeSeries_Result_Anomaly["stl_train"]
+    """
+    A function for rendering figures one after another or on a process pool.
+    Args:
+        l_figures (list): A list of tuples, each containing a draw function, the path of the PDF and the arguments of the draw function
+        n_workers (int): The number of worker processes, None or 1 renders the figures one after another
+    """
+    if not n_workers or n_workers == 1:
+        for draw_func, str_path, t_args in l_figures:
+            renderFigure(draw_func, str_path, t_args)
+        return
 
-            # === Plot Base STL ========
-    fig, axes_base = plt.subplots(2, 1, figsize=(6,4), sharex=True)
-    axes_base[0].plot(tsa_base_train_trans.index, stl_fitted_base.observed, color="black")
-    axes_base[0].set_ylabel("Torque[Nm]")
-    axes_base[0].set_title("STL of Transformed Base Training Set")
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        l_futures = [executor.submit(renderFigure, draw_func, str_path, t_args) for draw_func, str_path, t_args in l_figures]
+        for future in l_futures:
+            future.result() # raises the exceptions of the workers
 
-    axes_base[1].plot(tsa_base_train_trans.index, stl_fitted_base.trend, color="green")
-    axes_base[1].set_ylabel("Trend")
-    axes_base[1].set_xlabel("Milling Steps (cumulated)")
+def renderFigure(draw_func, str_path, t_args):
+
+    """
+    Renders a single figure with the object-oriented API on a non-interactive Agg canvas, independent of pyplot's global state, and saves it.
+    Args:
+        draw_func (callable): A function drawing onto the given figure
+        str_path (str): The path of the PDF
+        t_args (tuple): The arguments of the draw function
+    """
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=(6,4))
+    FigureCanvasAgg(fig)
+    draw_func(fig, *t_args)
+    fig.savefig(str_path, bbox_inches="tight")
+
+def drawOutlierSim(fig, test_outlier):
+
+    """
+    Draws an outlier detector simulation.
+    This function performs the following operations:
+        1. Plots the medians of base and anomaly forecast
+        2. Plots the found anomalies
+        3. Creates and plots a no-anomaly area
+    Args:
+        fig (matplotlib.figure.Figure): The figure to draw onto
+        test_outlier (dict): A dictionary containing the medians, observations, band values and anomaly indices of a simulation
+    """
+    ax = fig.add_subplot()
+    ax.set_title("Anomaly Detection Simulation", fontsize=16)
+    # === Create a blue "confidence band" based on the lowest found anomaly of baseline to observation
+    
+    # === Plot the forecasted base and anomalous value  
+    ax.plot(test_outlier["df_baseline_fore_median"], label="Forecast: Baseline", linestyle="--", color ="blue")
+    ax.plot(test_outlier["df_anomal_fore_median_pos"], label="Forecast: Anomaly Positive", linestyle="--", color ="orange")
+    ax.plot(test_outlier["df_observ_outDet"], label="Original Forecast", color="black")
+
+    # As we only have an anomaly set for a damaged mill head where the toque is higher than the base, only the uppe region is considered
+    ax.fill_between(test_outlier["df_baseline_fore_median"].index, test_outlier["df_baseline_fore_median"].squeeze(), test_outlier["df_base_fore_band_values_upper"].squeeze(), color="#0072B2", alpha=0.2, label="Limit for Baseline")
+    # === Plot the anomalies
+    ax.scatter(test_outlier["df_anomalies_indices"], test_outlier["df_observ_outDet"].iloc[test_outlier["df_anomalies_indices"]], color="red", marker="x", s=50, label="Anomaly Detected")
+
+    # === Create the plot with a legend and x an y-axis descriptions
+    ax.legend(loc="lower right")
+    ax.set_xlabel("Milling Steps(cumulated)")
+    ax.set_ylabel("Torque in Nm")
+    ax.grid(True, linestyle=":", alpha=0.6)
 
-    # axes_base[2].plot(tsa_base_train_trans.index, stl_fitted_base.seasonal, color="blue")
-    # axes_base[2].set_ylabel("Seasonal")
+def drawObservations(fig, tsa_base_original, tsa_anomaly_original):
 
-    # axes_base[3].plot(tsa_base_train_trans.index, stl_fitted_base.resid, color="red")
-    # axes_base[3].set_ylabel("Residual")
-    # axes_base[3].set_xlabel("Milling Steps (cumulated)")
+    """
+    Draws the base and anomalous observations.
+    Args:
+        fig (matplotlib.figure.Figure): The figure to draw onto
+        tsa_base_original (pandas.DataFrame): The training and test set of the base process
+        tsa_anomaly_original (pandas.DataFrame): The training and test set of the anomalous process
+    """
+    ax = fig.add_subplot()
+    ax.plot(tsa_base_original, label="Base Observation", color="blue", alpha=0.7)
+    ax.plot(tsa_anomaly_original, label="Anomaly Observation", color="red", alpha=0.7)
 
-    plt.tight_layout()
-            #== Save Figure
-    plt.savefig(f"{script_dir.parent}/output/{str_FolderName}/plots/STL_Base.pdf", bbox_inches="tight")
+    ax.set_title("Base and Anomaly Observations")
+    ax.legend()
+    ax.set_xlabel("Milling Steps (cumulated)")
+    ax.set_ylabel("Torque in Nm")
+    ax.grid(True, linestyle=":", alpha=0.6)
 
-            # === Plot Anomaly STL ======
-    fig, axes_base = plt.subplots(2, 1, figsize=(6,4), sharex=True)
-    axes_base[0].plot(tsa_anomaly_train_trans.index, stl_fitted_anomaly.observed, color="black")
+def drawSTL(fig, index, stl_observed, stl_trend, str_title, b_tight_layout):
+
+    """
+    Draws the transformed observation and the trend component of a STL decomposition.
+    Args:
+        fig (matplotlib.figure.Figure): The figure to draw onto
+        index (pandas.Index): The index of the transformed training set
+        stl_observed (pandas.DataSeries): The observed component
+        stl_trend (pandas.DataSeries): The trend component
+        str_title (str): The title of the figure
+        b_tight_layout (bool): A boolean for applying the tight layout
+    """
+    axes_base = fig.subplots(2, 1, sharex=True)
+    axes_base[0].plot(index, stl_observed, color="black")
     axes_base[0].set_ylabel("Torque[Nm]")
-    axes_base[0].set_title("STL of Transformed Anomaly Training Set")
+    axes_base[0].set_title(str_title)
 
-    axes_base[1].plot(tsa_anomaly_train_trans.index, stl_fitted_anomaly.trend, color="green")
+    axes_base[1].plot(index, stl_trend, color="green")
     axes_base[1].set_ylabel("Trend")
     axes_base[1].set_xlabel("Milling Steps (cumulated)")
 
-    # axes_base[2].plot(tsa_anomaly_train_trans.index, stl_fitted_anomaly.seasonal, color="blue")
-    # axes_base[2].set_ylabel("Seasonal")
-
-    # axes_base[3].plot(tsa_anomaly_train_trans.index, stl_fitted_anomaly.resid, color="red")
-    # axes_base[3].set_ylabel("Residual")
-    # axes_base[3].set_xlabel("Milling Steps (cumulated)")
-
-            #== Save Figure
-    plt.savefig(f"{script_dir.parent}/output/{str_FolderName}/plots/STL_Anomaly.pdf", bbox_inches="tight")
+    if b_tight_layout:
+        fig.tight_layout()
 
-    # Plot the forecast for the next season (in this case 39 steps)
-    base_forecast = l_TimeSeries_Result_Base["forecast_next_season"]
-    anomaly_forecast = l_TimeSeries_Result_Anomaly["forecast_next_season"]
+def drawForecasts(fig, base_forecast, anomaly_forecast):
 
-    plt.figure(figsize=(6,4)) 
-    plt.plot(anomaly_forecast, label="Anomaly Forecast", color="red", alpha=0.7)
-    plt.plot(base_forecast, label="Base Forecast", color="blue", alpha=0.7)
+    """
+    Draws the forecast for the next season (in this case 39 steps) of both processes.
+    Args:
+        fig (matplotlib.figure.Figure): The figure to draw onto
+        base_forecast (numpy.ndarray): The forecast of the base process
+        anomaly_forecast (numpy.ndarray): The forecast of the anomalous process
+    """
+    ax = fig.add_subplot()
+    ax.plot(anomaly_forecast, label="Anomaly Forecast", color="red", alpha=0.7)
+    ax.plot(base_forecast, label="Base Forecast", color="blue", alpha=0.7)
 
-    plt.title("Base and Anomaly One Season Forecast")
-    plt.legend()
-    plt.xlabel("Milling Steps (cumulated)")
-    plt.ylabel("Torque in Nm")
-    plt.grid(True, linestyle=":", alpha=0.6)
+    ax.set_title("Base and Anomaly One Season Forecast")
+    ax.legend()
+    ax.set_xlabel("Milling Steps (cumulated)")
+    ax.set_ylabel("Torque in Nm")
+    ax.grid(True, linestyle=":", alpha=0.6)
 
-    #== Save Figure
-    plt.savefig(f"{script_dir.parent}/output/{str_FolderName}/plots/BaseAndAnomalyForecast.pdf", bbox_inches="tight")
+def drawResidVariance(fig, fittedvalues, resid, str_title):
 
-    # Maybe plot hetero/homoscedasticity
-    fitted_model_base = l_TimeSeries_Result_Base["fitted_optimal_model"]
-    fitted_model_anomaly = l_TimeSeries_Result_Anomaly["fitted_optimal_model"]
-        # Base Residuals vs Fitted 
-    plt.figure(figsize=(6,4)) 
-    plt.scatter(fitted_model_base.fittedvalues, fitted_model_base.resid, alpha=0.6)
-    plt.axhline(0, color="black")
-    plt.xlabel("Fitted Values")
-    plt.ylabel("Residuals")
-    plt.title("Base Variance of Residuals")
-
-        #== Save Figure
-    plt.savefig(f"{script_dir.parent}/output/{str_FolderName}/plots/BaseResidVariance.pdf", bbox_inches="tight")
-        # Anomaly Residuals vs Fitted 
-    plt.figure(figsize=(6,4)) 
-    plt.scatter(fitted_model_anomaly.fittedvalues, fitted_model_anomaly.resid, alpha=0.6)
-    plt.axhline(0, color="black")
-    plt.xlabel("Fitted Values")
-    plt.ylabel("Residuals")
-    plt.title("Anomaly Variance of Residuals")
-
-        #== Save Figure
-    plt.savefig(f"{script_dir.parent}/output/{str_FolderName}/plots/AnomalyResidVariance.pdf", bbox_inches="tight")
\ No newline at end of file
+    """
+    Draws the residuals against the fitted values of a model, to be used for further improvements regarding hetero/homoscedasticity.
+    Args:
+        fig (matplotlib.figure.Figure): The figure to draw onto
+        fittedvalues (pandas.DataSeries): The fitted values of the model
+        resid (pandas.DataSeries): The residuals of the model
+        str_title (str): The title of the figure
+    """
+    ax = fig.add_subplot()
+    ax.scatter(fittedvalues, resid, alpha=0.6)
+    ax.axhline(0, color="black")
+    ax.set_xlabel("Fitted Values")
+    ax.set_ylabel("Residuals")
+    ax.set_title(str_title)
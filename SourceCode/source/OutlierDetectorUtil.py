@@ -2,9 +2,9 @@
 Provides functions around detecting anomalies based on forecasting error to the median of a base and anomaloues forecast.
 """
 
-from statsmodels.robust.scale import mad
 import numpy as np
 from . import ARIMAUtils as arimaUtil
+from collections import deque
 import math
 import pandas as pd
 
@@ -74,6 +74,95 @@ def getRecommendation(df_anomalies, df_observ, dict_results):
         dict_results (dict): A dictionary containing information of previous time series analysis steps
     """
     failure_percentage = len(df_anomalies) / len(df_observ)
+    str_recommendation = getRecommendationText(failure_percentage)
+    
+    # === Save Results =========
+    dict_results["str_recommendation"] = str_recommendation
+    dict_results["failure_percentage"] = round(failure_percentage * 100, 6) 
+    # ==========================
+
+    return str_recommendation
+
+def getAnomaliesBatch(a_median_baseline, a_median_anomaly, l_observ):
+
+    """
+    A function for detecting anomalies in many observation sets at once, following the same rule as getAnomalies().
+    This function performs the following operations:
+        1. Pads the observation sets with NaN into a single matrix with one row per set
+        2. Detects an anomaly wherever an observation is nearer to the median of the anomalous forecast than to the base one
+        3. Computes the failure percentage, lowest anomaly and recommendation of every set
+    Args:
+        a_median_baseline (numpy.array): The median of the base forecast for each observation set
+        a_median_anomaly (numpy.array): The median of the anomalous forecast for each observation set
+        l_observ (list): A list of observation sets, each being array-like with a single column
+    Returns:
+        dict_results (dict): A dictionary containing the padded observations, the anomaly masks and the per set results
+    """
+    a_lengths = np.array([len(observ) for observ in l_observ])
+    m_observ = np.full((len(l_observ), a_lengths.max()), np.nan)
+    for i, observ in enumerate(l_observ):
+        m_observ[i, :a_lengths[i]] = np.asarray(observ, dtype=float).ravel()
+    m_valid = np.arange(m_observ.shape[1]) < a_lengths[:, None] # masks the padding
+
+    m_base_err = np.abs(m_observ - np.asarray(a_median_baseline, dtype=float)[:, None])
+    m_anomaly_err = np.abs(m_observ - np.asarray(a_median_anomaly, dtype=float)[:, None])
+    m_anomaly = (m_anomaly_err <= m_base_err) & m_valid
+
+    a_failure_percentage = m_anomaly.sum(axis=1) / a_lengths
+    a_min_anomaly = np.where(m_anomaly, m_observ, np.inf).min(axis=1)
+    a_lowest_anomaly = np.where(np.isinf(a_min_anomaly), np.nan, np.abs(a_min_anomaly)) # NaN if a set has no anomalies, like getAnomalies()
+
+    # === Save Results =========
+    dict_results = {
+        "observ": m_observ,
+        "lengths": a_lengths,
+        "anomaly_bool": m_anomaly,
+        "lowest_anomaly": a_lowest_anomaly,
+        "failure_percentage": np.round(a_failure_percentage * 100, 6),
+        "str_recommendation": [getRecommendationText(n_failure) for n_failure in a_failure_percentage]
+    }
+    # ==========================
+    return dict_results
+
+def combineChannelAnomalies(dict_anomaly_bool, n_min_channels=1):
+
+    """
+    A function for combining the anomaly masks of several sensor channels of one machine into a machine level recommendation.
+    This function performs the following operations:
+        1. Counts per observation how many channels detected an anomaly
+        2. Flags an observation of the machine as anomalous if at least n_min_channels channels did
+        3. Computes the failure percentage and recommendation of the machine like getRecommendation()
+    Args:
+        dict_anomaly_bool (dict): A dictionary containing the anomaly mask per channel, all masks covering the same observations in the same order
+        n_min_channels (int): The number of channels which need to detect an anomaly at an observation
+    Returns:
+        dict_results (dict): A dictionary containing the votes per observation, the machine level mask, failure percentage and recommendation
+    """
+    m_anomaly = np.vstack([np.asarray(a_anomaly_bool, dtype=bool).ravel() for a_anomaly_bool in dict_anomaly_bool.values()])
+    a_votes = m_anomaly.sum(axis=0)
+    a_anomaly_bool = a_votes >= n_min_channels
+    failure_percentage = a_anomaly_bool.mean()
+
+    # === Save Results =========
+    dict_results = {
+        "channels": list(dict_anomaly_bool),
+        "channel_votes": a_votes,
+        "anomaly_bool": a_anomaly_bool,
+        "failure_percentage": round(failure_percentage * 100, 6),
+        "str_recommendation": getRecommendationText(failure_percentage)
+    }
+    # ==========================
+    return dict_results
+
+def getRecommendationText(failure_percentage):
+
+    """
+    A function for mapping a relative amount of anomalies to a maintenance strategy.
+    Args:
+        failure_percentage (float): The share of anomalies within an observation set, ranging from 0 to 1
+    Returns:
+        str_recommendation (str): The recommended maintenance strategy, an empty string if operations can go on
+    """
     str_recommendation = ""
 
     if 0.2 > failure_percentage >= 0.05:
@@ -84,14 +173,104 @@ def getRecommendation(df_anomalies, df_observ, dict_results):
         str_recommendation = "Schedule maintenance immediately"
     elif failure_percentage >= 0.4:
         str_recommendation = "Critical operations failure imminent"
-    
-    # === Save Results =========
-    dict_results["str_recommendation"] = str_recommendation
-    dict_results["failure_percentage"] = round(failure_percentage * 100, 6) 
-    # ==========================
 
     return str_recommendation
 
+class OnlineAnomalyDetector:
+
+    """
+    A stateful outlier detector for scoring observations one at a time, e.g. during live spindle monitoring.
+    It applies the same rule as getAnomalies(), but the forecast medians are computed once at initialisation
+    and the anomaly count is kept as a running total, so scoring a new observation takes constant time.
+    Args:
+        m_TimeSeries_Baseline (dict): A dictionary containing information from the time series analysis of the base process
+        m_TimeSeries_Anomalous (dict): A dictionary containing information from the time series analysis of the anomalous process
+        n_fore_length (int): The forecast length the medians are based on, defaults to the length of the one season forecast
+        n_window (int): The number of latest observations the totals cover, None covers every observation since the last reset
+    """
+
+    def __init__(self, m_TimeSeries_Baseline, m_TimeSeries_Anomalous, n_fore_length=None, n_window=None):
+        if n_fore_length is None:
+            n_fore_length = len(m_TimeSeries_Baseline["forecast_next_season"])
+
+        df_baseline_fore = arimaUtil.getForecast(m_TimeSeries_Baseline["fitted_optimal_model"], n_fore_length, m_TimeSeries_Baseline["train_trans_set"]["opt_lambda"])
+        df_anomaly_fore = arimaUtil.getForecast(m_TimeSeries_Anomalous["fitted_optimal_model"], n_fore_length, m_TimeSeries_Anomalous["train_trans_set"]["opt_lambda"])
+
+        self.n_median_baseline = float(np.median(df_baseline_fore))
+        self.n_median_anomaly = float(np.median(df_anomaly_fore))
+        self.n_window = n_window
+        self.reset()
+
+    def reset(self):
+        """
+        Forgets all observations scored so far while keeping the forecast medians.
+        """
+        self.n_observations = 0
+        self.n_anomalies = 0
+        self.n_min_anomaly = math.nan
+        self.deque_window = deque(maxlen=self.n_window) if self.n_window else None # anomalies of the latest observations, NaN for normal ones
+
+    def update(self, n_observation):
+        """
+        Scores a single observation and adds it to the running totals.
+        Args:
+            n_observation (float): A new observation, e.g. a torque sample
+        Returns:
+            (bool): True if the observation is nearer to the median of the anomalous forecast than to the base one
+        """
+        b_anomaly = abs(n_observation - self.n_median_anomaly) <= abs(n_observation - self.n_median_baseline)
+
+        if self.deque_window is not None:
+            if len(self.deque_window) == self.n_window: # the oldest observation drops out of the window
+                self.n_observations -= 1
+                if not math.isnan(self.deque_window[0]):
+                    self.n_anomalies -= 1
+            self.deque_window.append(n_observation if b_anomaly else math.nan)
+
+        self.n_observations += 1
+        if b_anomaly:
+            self.n_anomalies += 1
+            if not n_observation >= self.n_min_anomaly: # also true while n_min_anomaly is still NaN
+                self.n_min_anomaly = n_observation
+        return b_anomaly
+
+    @property
+    def lowest_anomaly(self):
+        """
+        (float): The absolute value of the smallest anomaly scored so far or within the window, like the band value of getAnomalies()
+        """
+        if self.deque_window is not None:
+            return abs(min((n_value for n_value in self.deque_window if not math.isnan(n_value)), default=math.nan))
+        return abs(self.n_min_anomaly)
+
+    @property
+    def failure_percentage(self):
+        """
+        (float): The share of anomalies among all observations scored so far, ranging from 0 to 1
+        """
+        if self.n_observations == 0:
+            return 0.0
+        return self.n_anomalies / self.n_observations
+
+    def getRecommendation(self, dict_results=None):
+        """
+        Recommends a maintenance strategy based on the observations scored so far, in the same way as getRecommendation().
+        Args:
+            dict_results (dict): An optional dictionary the recommendation and failure percentage are saved to
+        Returns:
+            str_recommendation (str): The recommended maintenance strategy
+        """
+        str_recommendation = getRecommendationText(self.failure_percentage)
+
+        # === Save Results =========
+        if dict_results is not None:
+            dict_results["str_recommendation"] = str_recommendation
+            dict_results["failure_percentage"] = round(self.failure_percentage * 100, 6)
+            dict_results["lowest_anomaly"] = self.lowest_anomaly
+        # ==========================
+
+        return str_recommendation
+
 
 
 
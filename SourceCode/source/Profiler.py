@@ -0,0 +1,110 @@
+"""
+Provides an optional instrumentation layer recording wall time, CPU time and peak allocated memory per pipeline stage.
+"""
+
+from contextlib import contextmanager, nullcontext
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+class StageProfiler:
+
+    """
+    Records wall time, CPU time and peak allocated memory of nested stages.
+    The peak memory is measured with tracemalloc, which is started on entering the outermost stage and stopped on leaving it.
+    A stage's peak also covers the peaks of its nested stages.
+    Args:
+        b_memory (bool): A boolean for measuring the peak allocated memory, which slows down the measured code
+    """
+
+    def __init__(self, b_memory=True):
+        self.b_memory = b_memory
+        self.l_records = []
+        self.l_stack = [] # records and running peaks of the currently entered stages
+        self.b_started_tracing = False
+        self.n_origin = time.perf_counter()
+
+    @contextmanager
+    def stage(self, str_name):
+        """
+        A context manager measuring the enclosed code as a stage.
+        Args:
+            str_name (str): The name of the stage
+        """
+        if self.b_memory:
+            if not self.l_stack and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.b_started_tracing = True
+            if self.l_stack: # keep the peak of the enclosing stage before resetting it
+                self.l_stack[-1][1] = max(self.l_stack[-1][1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            n_start_memory = tracemalloc.get_traced_memory()[0]
+
+        dict_record = {
+            "stage": f"{self.l_stack[-1][0]['stage']}/{str_name}" if self.l_stack else str_name,
+            "depth": len(self.l_stack),
+            "start_s": time.perf_counter() - self.n_origin
+        }
+        self.l_records.append(dict_record)
+        self.l_stack.append([dict_record, 0])
+
+        n_start_wall = time.perf_counter()
+        n_start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            dict_record["wall_s"] = time.perf_counter() - n_start_wall
+            dict_record["cpu_s"] = time.process_time() - n_start_cpu
+            _, n_nested_peak = self.l_stack.pop()
+
+            if self.b_memory:
+                n_peak = max(n_nested_peak, tracemalloc.get_traced_memory()[1])
+                dict_record["peak_bytes"] = n_peak - n_start_memory
+                if self.l_stack:
+                    self.l_stack[-1][1] = max(self.l_stack[-1][1], n_peak)
+                elif self.b_started_tracing:
+                    tracemalloc.stop()
+                    self.b_started_tracing = False
+
+    def getProfile(self):
+        """
+        Returns:
+            (list): A list of dictionaries, one per stage in the order the stages were entered
+        """
+        return [dict(dict_record) for dict_record in self.l_records]
+
+    def writeTrace(self, str_path):
+        """
+        Writes the recorded stages as JSON trace in the Trace Event Format, which can be opened with chrome://tracing or Perfetto.
+        Args:
+            str_path (str): The path of the trace file
+        """
+        l_events = [{
+            "name": dict_record["stage"].split("/")[-1],
+            "ph": "X",
+            "ts": dict_record["start_s"] * 1e6,
+            "dur": dict_record["wall_s"] * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": {s_key: dict_record[s_key] for s_key in ("stage", "cpu_s", "peak_bytes") if s_key in dict_record}
+        } for dict_record in self.l_records if "wall_s" in dict_record]
+
+        with open(str_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": l_events, "displayTimeUnit": "ms"}, f, indent=4)
+
+class NullProfiler:
+
+    """
+    A stand-in for StageProfiler which records nothing, used while the instrumentation is switched off.
+    """
+
+    def stage(self, str_name):
+        return NULL_CONTEXT
+
+    def getProfile(self):
+        return []
+
+NULL_CONTEXT = nullcontext()
+NULL_PROFILER = NullProfiler()
@@ -2,9 +2,7 @@
 Provides functions around STL decomposition and trend strength in particular.
 """
 
-import statsmodels.tsa.seasonal as STL
 import pandas as pd
-import matplotlib.pyplot as plt
 
 def getTrendStrength(df_stl_trend, df_stl_residual):
     
@@ -0,0 +1,308 @@
+"""
+Provides a small local HTTP service scoring observation sets with the models of the time series analysis, for systems which cannot import this package.
+The models and lambdas are loaded once at startup. Concurrent requests are collected into micro batches and scored in one vectorized pass.
+
+    python -m SourceCode.source.ScoringServer SourceCode/testData/5mm/5mm_noDMG_05_11_2025_edited.csv SourceCode/testData/5mm/5mm_DMG_05_11_2025_edited.csv --abs
+
+Endpoints:
+    POST /score  {"observations": [[...], [...]]} or {"observations": [...]} for a single set
+                 returns one result per set with anomaly_bool, failure_percentage, str_recommendation and lowest_anomaly
+    GET  /stats  returns the request latency percentiles in milliseconds and the micro batch sizes
+    GET  /health returns {"status": "ok"}
+
+With --check-clients 64 the server is not kept running, instead it is checked that bursts of 64 concurrent local clients are all answered.
+"""
+
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+import urllib.request
+from collections import deque
+import numpy as np
+from . import run as run
+
+class MicroBatcher:
+
+    """
+    Collects the observation sets of concurrent requests and scores them together on a single thread.
+    A batch is scored as soon as n_max_sets sets are waiting or the first waiting set waited n_max_delay seconds.
+    Args:
+        m_TimeSeries_Baseline (dict): A dictionary containing information from the time series analysis of the base process
+        m_TimeSeries_Anomalous (dict): A dictionary containing information from the time series analysis of the anomalous process
+        n_max_sets (int): The maximum number of observation sets per batch
+        n_max_delay (float): The maximum seconds a set waits for others
+    """
+
+    def __init__(self, m_TimeSeries_Baseline, m_TimeSeries_Anomalous, n_max_sets=256, n_max_delay=0.005):
+        self.m_TimeSeries_Baseline = m_TimeSeries_Baseline
+        self.m_TimeSeries_Anomalous = m_TimeSeries_Anomalous
+        self.n_max_sets = n_max_sets
+        self.n_max_delay = n_max_delay
+        self.queue_pending = queue.Queue()
+        self.deque_batch_sizes = deque(maxlen=10000)
+        self.thread = threading.Thread(target=self.loop, daemon=True)
+        self.thread.start()
+
+    def submit(self, l_observ):
+        """
+        Queues the observation sets of a request.
+        Args:
+            l_observ (list): A list of observation sets, each a list of floats
+        Returns:
+            (concurrent.futures.Future): A future resolving to the list of results, one per set
+        """
+        future = Future()
+        self.queue_pending.put((l_observ, future))
+        return future
+
+    def loop(self):
+        while True:
+            l_requests = [self.queue_pending.get()]
+            n_sets = len(l_requests[0][0])
+            n_deadline = time.perf_counter() + self.n_max_delay
+            while n_sets < self.n_max_sets:
+                n_timeout = n_deadline - time.perf_counter()
+                if n_timeout <= 0:
+                    break
+                try:
+                    l_requests.append(self.queue_pending.get(timeout=n_timeout))
+                except queue.Empty:
+                    break
+                n_sets += len(l_requests[-1][0])
+
+            self.deque_batch_sizes.append(n_sets)
+            try:
+                l_results = scoreSets(self.m_TimeSeries_Baseline, self.m_TimeSeries_Anomalous, [observ for l_observ, _ in l_requests for observ in l_observ])
+            except Exception as e:
+                for _, future in l_requests:
+                    future.set_exception(e)
+                continue
+
+            n_start = 0
+            for l_observ, future in l_requests:
+                future.set_result(l_results[n_start:n_start + len(l_observ)])
+                n_start += len(l_observ)
+
+def scoreSets(m_TimeSeries_Baseline, m_TimeSeries_Anomalous, l_observ):
+
+    """
+    Scores observation sets with run.simulateOutlierDetectionBatch() and converts the results to JSON compatible dictionaries.
+    Args:
+        m_TimeSeries_Baseline (dict): A dictionary containing information from the time series analysis of the base process
+        m_TimeSeries_Anomalous (dict): A dictionary containing information from the time series analysis of the anomalous process
+        l_observ (list): A list of observation sets
+    Returns:
+        l_results (list): A list of dictionaries, one per observation set
+    """
+    dict_batch = run.simulateOutlierDetectionBatch(m_TimeSeries_Baseline, m_TimeSeries_Anomalous, l_observ)
+    l_results = []
+    for i, n_length in enumerate(dict_batch["lengths"]):
+        n_lowest_anomaly = float(dict_batch["lowest_anomaly"][i])
+        l_results.append({
+            "anomaly_bool": dict_batch["anomaly_bool"][i, :n_length].tolist(),
+            "failure_percentage": float(dict_batch["failure_percentage"][i]),
+            "str_recommendation": dict_batch["str_recommendation"][i],
+            "lowest_anomaly": None if math.isnan(n_lowest_anomaly) else n_lowest_anomaly
+        })
+    return l_results
+
+class ScoringServer(ThreadingHTTPServer):
+
+    """
+    The HTTP server holding the models, the micro batcher and the request latencies.
+    Args:
+        t_address (tuple): Host and port, port 0 picks a free one
+        m_TimeSeries_Baseline (dict): A dictionary containing information from the time series analysis of the base process
+        m_TimeSeries_Anomalous (dict): A dictionary containing information from the time series analysis of the anomalous process
+        n_max_sets (int): The maximum number of observation sets per micro batch
+        n_max_delay (float): The maximum seconds a set waits for others
+    """
+
+    daemon_threads = True
+    # The listen backlog, the default of 5 resets the connections of a burst of concurrent clients before they reach the micro batcher
+    request_queue_size = 128
+
+    def __init__(self, t_address, m_TimeSeries_Baseline, m_TimeSeries_Anomalous, n_max_sets=256, n_max_delay=0.005):
+        self.request_queue_size = max(self.request_queue_size, n_max_sets) # a full batch may arrive at once
+        super().__init__(t_address, ScoringHandler)
+        self.batcher = MicroBatcher(m_TimeSeries_Baseline, m_TimeSeries_Anomalous, n_max_sets, n_max_delay)
+        self.deque_latencies = deque(maxlen=10000)
+        self.lock_latencies = threading.Lock()
+
+    def getStats(self):
+        """
+        Returns:
+            (dict): The number of timed requests, the latency percentiles in milliseconds and the mean and maximum micro batch size
+        """
+        with self.lock_latencies:
+            a_latencies = np.array(self.deque_latencies) * 1000
+        a_batch_sizes = np.array(self.batcher.deque_batch_sizes)
+
+        dict_stats = {"requests": len(a_latencies)}
+        for n_percentile in (50, 90, 99):
+            dict_stats[f"p{n_percentile}_ms"] = float(np.percentile(a_latencies, n_percentile)) if len(a_latencies) else None
+        dict_stats["batch_size_mean"] = float(a_batch_sizes.mean()) if len(a_batch_sizes) else None
+        dict_stats["batch_size_max"] = int(a_batch_sizes.max()) if len(a_batch_sizes) else None
+        return dict_stats
+
+class ScoringHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path == "/health":
+            self.sendJSON(200, {"status": "ok"})
+        elif self.path == "/stats":
+            self.sendJSON(200, self.server.getStats())
+        else:
+            self.sendJSON(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/score":
+            self.sendJSON(404, {"error": f"unknown path {self.path}"})
+            return
+
+        n_start = time.perf_counter()
+        try:
+            dict_request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            l_observ = dict_request["observations"]
+            if l_observ and not isinstance(l_observ[0], list): # a single observation set
+                l_observ = [l_observ]
+            if not l_observ or not all(l_observ):
+                raise ValueError("observations must contain at least one non-empty set")
+            l_observ = [[float(n_value) for n_value in observ] for observ in l_observ]
+        except (ValueError, KeyError, TypeError) as e:
+            self.sendJSON(400, {"error": f"{type(e).__name__}: {e}"})
+            return
+
+        try:
+            l_results = self.server.batcher.submit(l_observ).result()
+        except Exception as e:
+            self.sendJSON(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+
+        self.sendJSON(200, {"results": l_results})
+        with self.server.lock_latencies:
+            self.server.deque_latencies.append(time.perf_counter() - n_start)
+
+    def sendJSON(self, n_status, dict_body):
+        bytes_body = json.dumps(dict_body).encode("utf-8")
+        self.send_response(n_status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(bytes_body)))
+        self.end_headers()
+        self.wfile.write(bytes_body)
+
+    def log_message(self, format, *args):
+        pass # the latencies are reported by /stats instead of a line per request
+
+def startServer(m_TimeSeries_Baseline, m_TimeSeries_Anomalous, str_host="127.0.0.1", n_port=0, n_max_sets=256, n_max_delay=0.005):
+
+    """
+    Starts the scoring server on a background thread, e.g. for local clients within the same process.
+    Returns:
+        server (ScoringServer): The running server, server.server_address contains the chosen port, server.shutdown() stops it
+    """
+    server = ScoringServer((str_host, n_port), m_TimeSeries_Baseline, m_TimeSeries_Anomalous, n_max_sets, n_max_delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def requestScores(str_url, l_observ, n_timeout=30):
+
+    """
+    A local client scoring observation sets with a running server.
+    Args:
+        str_url (str): The base URL of the server, e.g. "http://127.0.0.1:8765"
+        l_observ (list): A list of observation sets, each a list of floats
+        n_timeout (float): The seconds to wait for the response
+    Returns:
+        (list): A list of dictionaries, one per observation set
+    """
+    request = urllib.request.Request(f"{str_url}/score", data=json.dumps({"observations": l_observ}).encode("utf-8"), headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=n_timeout) as response:
+        return json.loads(response.read())["results"]
+
+def checkConcurrentClients(str_url, l_observ, n_clients=64, n_rounds=5, n_timeout=30):
+
+    """
+    A check of a running server against bursts of concurrent local clients, none of which may be dropped.
+    This function performs the following operations:
+        1. Starts n_clients threads per round, which request the scores of the same observation sets at once
+        2. Counts the requests which failed or returned another number of results than sets
+    Args:
+        str_url (str): The base URL of the server, e.g. "http://127.0.0.1:8765"
+        l_observ (list): A list of observation sets, each a list of floats
+        n_clients (int): The number of concurrent clients per burst
+        n_rounds (int): The number of bursts
+        n_timeout (float): The seconds each client waits for its response
+    Returns:
+        dict_check (dict): A dictionary containing the number of requests, the number of failed requests and the distinct errors
+    """
+    l_errors = []
+    lock_errors = threading.Lock()
+
+    def client(barrier):
+        barrier.wait() # all clients connect at once
+        try:
+            l_results = requestScores(str_url, l_observ, n_timeout)
+            if len(l_results) != len(l_observ):
+                raise ValueError(f"{len(l_results)} results for {len(l_observ)} sets")
+        except Exception as e:
+            with lock_errors:
+                l_errors.append(f"{type(e).__name__}: {e}")
+
+    for _ in range(n_rounds):
+        barrier = threading.Barrier(n_clients)
+        l_threads = [threading.Thread(target=client, args=(barrier,)) for _ in range(n_clients)]
+        for thread in l_threads:
+            thread.start()
+        for thread in l_threads:
+            thread.join()
+
+    return {
+        "requests": n_clients * n_rounds,
+        "failed": len(l_errors),
+        "errors": sorted(set(l_errors))
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serves anomaly verdicts of the base and anomalous model of a process over HTTP.")
+    parser.add_argument("undamaged", help="csv file of the base process")
+    parser.add_argument("damaged", help="csv file of the anomalous process")
+    parser.add_argument("--variable", default="Torque_ax8", help="dependent variable")
+    parser.add_argument("--seasons", type=int, default=39, help="observations per season")
+    parser.add_argument("--alpha", type=float, default=0.05, help="alpha of the stationarity tests")
+    parser.add_argument("--split", type=float, default=0.8, help="training/test split")
+    parser.add_argument("--abs", action="store_true", help="use the absolute values")
+    parser.add_argument("--store", default=None, help="model store directory, reuses the fitted models across restarts")
+    parser.add_argument("--host", default="127.0.0.1", help="host to bind to")
+    parser.add_argument("--port", type=int, default=8765, help="port to bind to")
+    parser.add_argument("--check-clients", type=int, default=None, help="instead of serving, checks that this many concurrent clients are all answered")
+    args = parser.parse_args()
+
+    l_models = []
+    for str_path in (args.undamaged, args.damaged):
+        df_train, df_test = run.loadTrainAndTestSet(str_path, args.seasons, args.variable, args.variable, args.split)
+        if args.abs:
+            df_train, df_test = df_train.abs(), df_test.abs()
+        l_models.append(run.doTimeSeriesAnalysis(df_train, df_test, args.seasons, args.alpha, "ADF", str_store_dir=args.store))
+
+    if args.check_clients:
+        server = startServer(*l_models, args.host, args.port)
+        l_observ = [[float(n_value) for n_value in l_models[0]["test_set"].iloc[:, 0]]]
+        dict_check = checkConcurrentClients(f"http://{args.host}:{server.server_address[1]}", l_observ, args.check_clients)
+        server.shutdown()
+        print(f"{dict_check['requests'] - dict_check['failed']} of {dict_check['requests']} requests answered")
+        for str_error in dict_check["errors"]:
+            print(str_error)
+        raise SystemExit(1 if dict_check["failed"] else 0)
+
+    server = ScoringServer((args.host, args.port), *l_models)
+    print(f"Scoring on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
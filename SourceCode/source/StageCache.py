@@ -0,0 +1,178 @@
+"""
+Provides a content addressed cache on disk for the single stages of the time series analysis, see run.doTimeSeriesAnalysis().
+The key of a stage is a hash of its name, its parameters and the keys of the stages it depends on, the first stage hashes the training set itself.
+A changed setting therefore only changes the keys of the stages depending on it, every stage before is loaded instead of recomputed.
+The cache is bounded in size, the least recently used entries are evicted first.
+"""
+
+from collections import ChainMap
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+# Part of every key, needs to be increased whenever the output of a stage changes
+STAGE_CACHE_VERSION = 2
+
+class StageKey(str):
+
+    """
+    The key of a cached stage, hashed as is when handed to a later stage as input instead of the output itself.
+    """
+
+def hashInput(hash_data, value):
+
+    """
+    Adds a stage input to a hash: dataframes, series and arrays by shape, column names and values, stage keys by themselves and anything else by its JSON form.
+    """
+    if isinstance(value, StageKey):
+        hash_data.update(b"key:" + value.encode("utf-8"))
+    elif isinstance(value, (pd.DataFrame, pd.Series)):
+        l_columns = list(value.columns) if isinstance(value, pd.DataFrame) else [value.name]
+        hash_data.update(json.dumps([str(column) for column in l_columns]).encode("utf-8"))
+        hash_data.update(str(value.shape).encode("utf-8"))
+        hash_data.update(value.to_numpy(dtype="float64").tobytes())
+    elif isinstance(value, np.ndarray):
+        hash_data.update(str(value.shape).encode("utf-8"))
+        hash_data.update(np.ascontiguousarray(value, dtype="float64").tobytes())
+    else:
+        hash_data.update(json.dumps(value, sort_keys=True, default=str).encode("utf-8"))
+
+class StageCache:
+
+    """
+    Stores the outputs of stages on disk under their key, one pickle file per stage.
+    Args:
+        str_cache_dir (str): A string pointing to the directory of the cache
+        n_max_bytes (int): The size the cache files may take up together, the least recently used files are deleted beyond it
+    """
+
+    def __init__(self, str_cache_dir, n_max_bytes=512 * 2**20):
+        self.path_dir = Path(str_cache_dir)
+        self.n_max_bytes = n_max_bytes
+        self.lock_evict = threading.Lock()
+        self.dict_stats = {"hits": 0, "misses": 0, "evicted": 0}
+        os.makedirs(self.path_dir, exist_ok=True)
+
+    def getKey(self, str_stage, l_inputs):
+        """
+        Computes the key of a stage.
+        Args:
+            str_stage (str): The name of the stage
+            l_inputs (list): The parameters of the stage and the keys of the stages it depends on
+        Returns:
+            (StageKey): The key of the stage
+        """
+        hash_data = hashlib.sha256(f"{STAGE_CACHE_VERSION}:{str_stage}".encode("utf-8"))
+        for value in l_inputs:
+            hashInput(hash_data, value)
+        return StageKey(hash_data.hexdigest())
+
+    def getPath(self, str_stage, str_key):
+        return self.path_dir / f"{str_stage}-{str_key}.pkl"
+
+    def load(self, str_stage, str_key):
+        """
+        Loads the output of a stage and marks it as recently used.
+        Returns:
+            tuple (b_found, output): Whether the stage is cached and its output, None if not
+        """
+        path_file = self.getPath(str_stage, str_key)
+        try:
+            with open(path_file, "rb") as f:
+                output = pickle.load(f)
+            os.utime(path_file) # the modification time orders the entries for the eviction
+        except FileNotFoundError:
+            return False, None
+        except Exception as e:
+            print(f"Cached stage {path_file.name} cannot be read, recomputing instead: {e}")
+            return False, None
+        return True, output
+
+    def save(self, str_stage, str_key, output):
+        """
+        Saves the output of a stage and evicts the least recently used entries if the cache exceeds its size.
+        The file is written to a temporary file first and then moved, so that concurrent runs never read a partially written file.
+        """
+        n_fd, str_tmp_path = tempfile.mkstemp(dir=self.path_dir, suffix=".tmp")
+        try:
+            with os.fdopen(n_fd, "wb") as f:
+                pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(str_tmp_path, self.getPath(str_stage, str_key))
+        except Exception as e:
+            os.remove(str_tmp_path)
+            print(f"Stage {str_stage} cannot be cached: {e}")
+            return
+        self.evict()
+
+    def evict(self):
+        """
+        Deletes the least recently used entries until the cache fits into its size.
+        """
+        with self.lock_evict:
+            l_entries = []
+            for path_file in self.path_dir.glob("*.pkl"):
+                try:
+                    stat_file = path_file.stat()
+                except FileNotFoundError: # evicted by a concurrent run
+                    continue
+                l_entries.append((stat_file.st_mtime_ns, stat_file.st_size, path_file))
+
+            n_bytes = sum(n_size for _, n_size, _ in l_entries)
+            for _, n_size, path_file in sorted(l_entries, key=lambda x: x[0]):
+                if n_bytes <= self.n_max_bytes:
+                    break
+                path_file.unlink(missing_ok=True)
+                n_bytes -= n_size
+                self.dict_stats["evicted"] += 1
+
+    def runStage(self, str_stage, l_inputs, func, dict_results):
+        """
+        Runs a stage unless its output is cached.
+        The stage function is called with a view on dict_results, the entries it adds are cached along with its output and added to dict_results.
+        Args:
+            str_stage (str): The name of the stage
+            l_inputs (list): The parameters of the stage and the keys of the stages it depends on
+            func (callable): The stage function, taking the view on dict_results and returning the output
+            dict_results (dict): A dictionary containing information of previous time series analysis steps
+        Returns:
+            tuple (output, str_key): The output of the stage and its key for the later stages
+        """
+        str_key = self.getKey(str_stage, l_inputs)
+        b_found, t_cached = self.load(str_stage, str_key)
+        if b_found:
+            self.dict_stats["hits"] += 1
+        else:
+            self.dict_stats["misses"] += 1
+            dict_stage_results = ChainMap({}, dict_results)
+            t_cached = (func(dict_stage_results), dict_stage_results.maps[0])
+            self.save(str_stage, str_key, t_cached)
+
+        output, dict_added = t_cached
+        dict_results.update(dict_added)
+        return output, str_key
+
+class NullStageCache:
+
+    """
+    A stand-in for StageCache which runs every stage, used while no cache directory is given.
+    """
+
+    def getKey(self, str_stage, l_inputs):
+        return None
+
+    def load(self, str_stage, str_key):
+        return False, None
+
+    def save(self, str_stage, str_key, output):
+        pass
+
+    def runStage(self, str_stage, l_inputs, func, dict_results):
+        return func(dict_results), None
+
+NULL_STAGE_CACHE = NullStageCache()
@@ -2,9 +2,15 @@
 Provides functions for performing hyptothesis tests in order to detect non-stationarity.
 """
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import numpy as np
 import pandas as pd
-from statsmodels.tsa.stattools import adfuller as adf
-from statsmodels.tsa.stattools import kpss
+
+# Test statistics and critical values per series content and regression type, see getTestStatistics()
+N_TEST_CACHE_SIZE = 64
+dict_test_cache = OrderedDict()
 
 def getStatInd(df_DataSeries, n_alpha, s_test_type, bTrending, dict_results):
     """
@@ -84,6 +90,7 @@ def checkStatADFKPSS (df_DataSeries, s_ARParam, s_alpha, dict_results):
     Returns:
         str_stat_type (str): A string indicating stationary type
     """
+    getTestStatistics(df_DataSeries, s_ARParam) # runs both tests at once, the wrappers below only compare against the critical values
     adfRes = adfWrapper(df_DataSeries, s_ARParam, s_alpha, dict_results)
     kpssResult = kpssWrapper(df_DataSeries, s_ARParam, s_alpha, dict_results)
 
@@ -152,9 +159,8 @@ def adfWrapper(df_DataSeries, s_ARParam, s_alpha, dict_results):
     Returns:
         A boolean indicating the result of the hypothesis test
     """
-    t_adf = adf(df_DataSeries, regression =s_ARParam, autolag="AIC") #get the test statistic and critical value
-    n_adf_stat= t_adf[0]
-    n_adf_crit = t_adf[4][s_alpha]
+    n_adf_stat, dict_adf_crit = getTestStatistics(df_DataSeries, s_ARParam)["adf"] #get the test statistic and critical value
+    n_adf_crit = dict_adf_crit[s_alpha]
     bNullHypo = True #set true as the test expects a non stationary time 
     
     #=== Save results ===
@@ -185,9 +191,8 @@ def kpssWrapper(df_DataSeries, s_ARParam, s_alpha, dict_results):
     Returns:
         A boolean indicating the result of the hypothesis test
     """
-    t_kpss = kpss(df_DataSeries, regression=s_ARParam)
-    n_kpss_stat = t_kpss[0]
-    n_kpss_crit = t_kpss[3][s_alpha]
+    n_kpss_stat, dict_kpss_crit = getTestStatistics(df_DataSeries, s_ARParam)["kpss"]
+    n_kpss_crit = dict_kpss_crit[s_alpha]
     bNullHypo = True
 
     #=== Save results ===
@@ -203,6 +208,43 @@ def kpssWrapper(df_DataSeries, s_ARParam, s_alpha, dict_results):
     elif n_kpss_stat < n_kpss_crit:
         return bNullHypo
     
+def getTestStatistics(df_DataSeries, s_ARParam):
+
+    """
+    Provides the test statistics and critical values of the ADF and KPSS test.
+    Neither depends on alpha, so the results are cached by the content of the series and the regression type
+    and repeated checks with another alpha only compare against other critical values.
+    This function performs the following operations:
+        1. Looks up the results by a hash of the series values and the regression type
+        2. Otherwise runs the KPSS test on a second thread while the ADF test with its lag search runs on the calling one
+        3. Caches the results, dropping the least recently used ones beyond N_TEST_CACHE_SIZE
+    Args:
+        df_DataSeries (pd.Series): A series which is tested on its stationarity
+        s_ARParam (str): A string dictating regression type (ct = constant and trend, c = constant, n = no constant/trend)
+    Returns:
+        (dict): A dictionary containing a pair of test statistic and dictionary of critical values per test, keys "adf" and "kpss"
+    """
+    a_values = np.ascontiguousarray(df_DataSeries, dtype="float64")
+    t_key = (hashlib.sha256(a_values.tobytes()).hexdigest(), a_values.shape, s_ARParam)
+    if t_key in dict_test_cache:
+        dict_test_cache.move_to_end(t_key)
+        return dict_test_cache[t_key]
+
+    from statsmodels.tsa.stattools import adfuller as adf, kpss
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future_kpss = executor.submit(kpss, df_DataSeries, regression=s_ARParam)
+        t_adf = adf(df_DataSeries, regression =s_ARParam, autolag="AIC")
+        t_kpss = future_kpss.result()
+
+    dict_test_cache[t_key] = {
+        "adf": (t_adf[0], t_adf[4]),
+        "kpss": (t_kpss[0], t_kpss[3])
+    }
+    if len(dict_test_cache) > N_TEST_CACHE_SIZE:
+        dict_test_cache.popitem(last=False)
+    return dict_test_cache[t_key]
+
 def trFloatingAlphaToString(n_alpha): 
 
     """
@@ -0,0 +1,168 @@
+"""
+Runs the time series and outlier detection pipeline for every combination of seasons, alpha and training/test split and compares the settings.
+Work which does not depend on a parameter is shared instead of repeated:
+    - every csv file is parsed once, the splits are cut out of the parsed series
+    - the Box-Cox transformation and STL decomposition are computed once per process, season length and split and reused for every alpha
+    - the ADF/KPSS statistics and equal ARIMA grid searches are reused across alphas within a worker
+The remaining jobs, one per process, season length and split, run on a process pool:
+
+    python -m SourceCode.source.SweepRun SourceCode/testData/3mm/3mm_NoDMG_20092025_edited.csv SourceCode/testData/3mm/3mm_DMG_05_11_2025_edited.csv --seasons 39 --alpha 0.01 0.05 0.1 --split 0.7 0.8 --abs
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import itertools
+import time
+import pandas as pd
+from . import ModelEvaluation as modEval
+from . import UtilsDataFrame as dfUtils
+from . import run as run
+
+def runSweepJob(df_series, n_Seasons, nSplit, l_alphas, s_test_type):
+
+    """
+    A function for analysing one process with one season length and split for several alphas.
+    This function performs the following operations:
+        1. Splits the parsed series into training and test set
+        2. Transforms and decomposes the training set once via run.decomposeTrainingSet()
+        3. Completes a copy of the decomposition per alpha via run.analyseDecomposition(), sharing equal grid searches
+    Failures are caught per alpha, so that they do not affect the other settings.
+    Args:
+        df_series (pandas.DataFrame): A dataframe containing the whole series of the process
+        n_Seasons (int): An integer indicating the number of seasons/periods
+        nSplit (float): A floating point number indicating the test split
+        l_alphas (list): The alphas of the stationarity tests and correlation intervals
+        s_test_type (str): A string containing the stationary test type
+    Returns:
+        l_results (list): Per alpha a dictionary with the fields ModelEvaluation.getEvaluationMetrics() needs and the ARIMA order, or the exception of a failed analysis
+    """
+    n_observ_train = dfUtils.getTrainSize(len(df_series), n_Seasons, nSplit)
+    df_train = df_series.iloc[:n_observ_train]
+    df_test = df_series.iloc[n_observ_train:].reset_index(drop=True)
+
+    try:
+        dict_decomposition = run.decomposeTrainingSet(df_train, n_Seasons)
+    except Exception as e:
+        return [e] * len(l_alphas)
+    dict_decomposition["test_set"] = df_test
+
+    l_results = []
+    dict_grid_cache = {}
+    for n_alpha in l_alphas:
+        try:
+            dict_results = run.analyseDecomposition(dict(dict_decomposition), n_Seasons, n_alpha, s_test_type, dict_grid_cache=dict_grid_cache)
+        except Exception as e:
+            l_results.append(e)
+            continue
+        l_results.append({
+            "test_set": df_test,
+            "fitted_optimal_model": dict_results["fitted_optimal_model"],
+            "train_trans_set": {"opt_lambda": dict_results["train_trans_set"]["opt_lambda"]},
+            "order": dict_results["fitted_optimal_model"].model.order
+        })
+
+    return l_results
+
+def runSweep(str_path_undamaged, str_path_damaged, sDepVar, l_Seasons, l_alphas, l_splits, s_test_type="ADF", bAbs=False, n_workers=None):
+
+    """
+    A function for comparing every combination of season length, alpha and split.
+    This function performs the following operations:
+        1. Parses the dependent variable of both csv files once
+        2. Runs one job per process, season length and split on a process pool, every job covers all alphas
+        3. Evaluates base and anomalous model of every setting with ModelEvaluation.getEvaluationMetrics()
+        4. Prints and returns one comparison table
+    Args:
+        str_path_undamaged (str): A string containing the file path of the base process
+        str_path_damaged (str): A string containing the file path of the anomalous process
+        sDepVar (str): A string containing the dependent variable
+        l_Seasons (list): The season lengths to compare
+        l_alphas (list): The alphas to compare
+        l_splits (list): The training/test splits to compare
+        s_test_type (str): A string containing the stationary test type
+        bAbs (bool): A boolean for indicating the need to turn the values to their absolute counterparts
+        n_workers (int): The number of worker processes, None uses the number of processors and 1 runs the jobs one after another
+    Returns:
+        df_sweep (pandas.DataFrame): A dataframe containing one row per setting with MAE, precision, recall and ARIMA orders, or the error of a failed setting
+    """
+    n_start = time.perf_counter()
+
+    # === 1. Parse once =========================================================
+    dict_series = {}
+    for str_process, str_path in (("base", str_path_undamaged), ("anomaly", str_path_damaged)):
+        df_series = dfUtils.readTimeSeriesCSV(str_path, sDepVar, sDepVar)
+        dict_series[str_process] = df_series.abs() if bAbs else df_series
+
+    # === 2. Jobs per process, season length and split ==========================
+    l_jobs = list(itertools.product(("base", "anomaly"), l_Seasons, l_splits))
+    if n_workers == 1:
+        l_job_results = [runSweepJob(dict_series[str_process], n_Seasons, nSplit, l_alphas, s_test_type) for str_process, n_Seasons, nSplit in l_jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            l_futures = [executor.submit(runSweepJob, dict_series[str_process], n_Seasons, nSplit, l_alphas, s_test_type) for str_process, n_Seasons, nSplit in l_jobs]
+            l_job_results = []
+            for future in l_futures:
+                try:
+                    l_job_results.append(future.result())
+                except Exception as e: # the worker process itself died
+                    l_job_results.append([e] * len(l_alphas))
+    dict_job_results = dict(zip(l_jobs, l_job_results))
+
+    # === 3. Evaluation per setting =============================================
+    l_rows = []
+    for n_Seasons, n_alpha, nSplit in itertools.product(l_Seasons, l_alphas, l_splits):
+        i_alpha = l_alphas.index(n_alpha)
+        result_base = dict_job_results[("base", n_Seasons, nSplit)][i_alpha]
+        result_anomaly = dict_job_results[("anomaly", n_Seasons, nSplit)][i_alpha]
+        dict_row = {"n_Seasons": n_Seasons, "n_alpha": n_alpha, "nSplit": nSplit}
+
+        l_errors = [f"{str_process}: {type(result).__name__}: {result}" for str_process, result in (("base", result_base), ("anomaly", result_anomaly)) if isinstance(result, Exception)]
+        if not l_errors:
+            try:
+                dict_metrics = modEval.getEvaluationMetrics(result_base, result_anomaly)
+            except Exception as e:
+                l_errors.append(f"evaluation: {type(e).__name__}: {e}")
+        if l_errors:
+            dict_row["error"] = "; ".join(l_errors)
+            l_rows.append(dict_row)
+            continue
+
+        dict_row.update({
+            "order_base": result_base["order"],
+            "order_anomaly": result_anomaly["order"],
+            "mae_base": dict_metrics["base_to_base"],
+            "mae_anomaly": dict_metrics["ano_to_ano"],
+            "precision": dict_metrics["precision"],
+            "recall": dict_metrics["recall"]
+        })
+        l_rows.append(dict_row)
+
+    df_sweep = pd.DataFrame(l_rows)
+    if "error" in df_sweep:
+        df_sweep = df_sweep[[str_column for str_column in df_sweep.columns if str_column != "error"] + ["error"]]
+
+    # === Print Summary =========
+    print(df_sweep.to_markdown(index=False))
+    print(f"{len(df_sweep)} settings from {len(l_jobs)} jobs. Wall time: {time.perf_counter() - n_start:.3f} s")
+    # ===========================
+
+    return df_sweep
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares the pipeline for every combination of season length, alpha and training/test split.")
+    parser.add_argument("undamaged", help="csv file of the base process")
+    parser.add_argument("damaged", help="csv file of the anomalous process")
+    parser.add_argument("--variable", default="Torque_ax8", help="dependent variable")
+    parser.add_argument("--seasons", type=int, nargs="+", default=[39], help="observations per season")
+    parser.add_argument("--alpha", type=float, nargs="+", default=[0.05], help="alphas of the stationarity tests")
+    parser.add_argument("--split", type=float, nargs="+", default=[0.8], help="training/test splits")
+    parser.add_argument("--test-type", default="ADF", help="stationary test type")
+    parser.add_argument("--abs", action="store_true", help="use the absolute values")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--summary", default=None, help="optional path of a markdown file the table is written to")
+    args = parser.parse_args()
+
+    df_sweep = runSweep(args.undamaged, args.damaged, args.variable, args.seasons, args.alpha, args.split, args.test_type, args.abs, args.workers)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            f.write(df_sweep.to_markdown(index=False))
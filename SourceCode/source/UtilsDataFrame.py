@@ -5,6 +5,10 @@ Provides functions around creating the dataframe needed for the time series anal
 import pandas as pd
 import numpy as np
 import math as math
+import hashlib
+import os
+import tempfile
+from pathlib import Path
 
 def createTimeSeriesDataFrame(dfData, sDepVar, sRenameDepVar ="y", bGerman = True):
      """ 
@@ -55,11 +59,204 @@ def getTrainAndTestSet(dfData, nObsPerSeason, depVar, sRenameDepVar, bGerman, n_
                df_train_set (pandas.DataFrame): The training set
                df_test_set (pandas.DataFrame): The test set
      """
-     n_seasons = int(len(dfData) / nObsPerSeason) # get the amount of seasons
-     n_seasons_train = int(math.floor(n_seasons * n_Split)) #get the amount of seasons for training set
-     n_observ_train = n_seasons_train * nObsPerSeason #get the amount of observations for train set
+     n_observ_train = getTrainSize(len(dfData), nObsPerSeason, n_Split)
 
      #max index for test set is n_observ_train - 1
      df_train_set = createTimeSeriesDataFrame(dfData.iloc[:n_observ_train], depVar, sRenameDepVar, bGerman)
      df_test_set = createTimeSeriesDataFrame(dfData.iloc[n_observ_train:], depVar, sRenameDepVar, bGerman).reset_index(drop=True)
-     return df_train_set, df_test_set
\ No newline at end of file
+     return df_train_set, df_test_set
+
+
+def getTrainSize(n_rows, nObsPerSeason, n_Split):
+
+     """ 
+     Computes the amount of observations within the training set, so that it only contains full seasons.
+     Args:
+          n_rows (int): The amount of observations
+          nObsPerSeason (int): The amount of observations per season
+          n_Split (float): A number indicating the training/test split
+     Returns:
+          n_observ_train (int): The amount of observations for the training set
+     """
+     n_seasons = int(n_rows / nObsPerSeason) # get the amount of seasons
+     n_seasons_train = int(math.floor(n_seasons * n_Split)) #get the amount of seasons for training set
+     n_observ_train = n_seasons_train * nObsPerSeason #get the amount of observations for train set
+     return n_observ_train
+
+
+def readTimeSeriesCSV(str_path, sDepVar, sRenameDepVar ="y", bGerman = True):
+
+     """ 
+     Reads the dependent variable of a csv file directly into a numeric dataframe for time series analysis.
+     In contrast to createTimeSeriesDataFrame() only the needed coloumn is parsed and German floating point numbers are converted by the csv parser itself,
+     which avoids reading every coloumn as strings first.
+     This function performs the following operations:
+          1. Reads only the dependent variable coloumn as floating point numbers, using ',' as decimal separator if needed
+          2. Renames the dependent variable coloumn and returns the dataframe
+     Args:
+          str_path (str): The path of the csv file
+          sDepVar (str): The name of the desired dependent variable
+          sRenamDepVar (str): String for renaming the desired dependent variable
+          bGerman (bool): Boolean value in case of German floating point numbers
+
+     Returns:
+          dataFrame (pandas.DataFrame): A dataframe with a standardized index as the independent and the coloumn as the dependent variable
+     """
+     dataFrame = pd.read_csv(str_path, usecols=[sDepVar], dtype={sDepVar: np.float64}, decimal="," if bGerman else ".")
+     if sRenameDepVar:
+          dataFrame.rename(columns={sDepVar:sRenameDepVar}, inplace=True)
+     return dataFrame
+
+
+def getTrainAndTestSetFromCSV(str_path, nObsPerSeason, depVar, sRenameDepVar, bGerman, n_Split):
+
+     """ 
+     A wrapper function for returning a training and test set straight from a csv file, equal to getTrainAndTestSet() applied on the read file.
+     This function performs the following operations:
+          1. Reads the dependent variable via readTimeSeriesCSV()
+          2. Computes the training set size based on given seasons and amount of observations
+          3. Returns the sets as a tuple
+
+     Args:
+          str_path (str): The path of the csv file
+          nObsPerSeason (int): The amount of observations per season
+          depVar (str): The name of the desired dependent variable
+          sRenamDepVar (str): String for renaming the desired dependent variable
+          bGerman (bool): Boolean value in case of German floating point numbers
+          n_Split (float): A number indicating the training/test split
+     Returns:
+          tuple (df_train_set, df_test_set): 
+               df_train_set (pandas.DataFrame): The training set
+               df_test_set (pandas.DataFrame): The test set
+     """
+     dataFrame = readTimeSeriesCSV(str_path, depVar, sRenameDepVar, bGerman)
+     n_observ_train = getTrainSize(len(dataFrame), nObsPerSeason, n_Split)
+
+     df_train_set = dataFrame.iloc[:n_observ_train]
+     df_test_set = dataFrame.iloc[n_observ_train:].reset_index(drop=True)
+     return df_train_set, df_test_set
+
+
+def readTimeSeriesChannelsCSV(str_path, l_DepVars, bGerman = True):
+
+     """ 
+     Reads several dependent variables of a csv file at once into a numeric dataframe, the multi channel counterpart of readTimeSeriesCSV().
+     Args:
+          str_path (str): The path of the csv file
+          l_DepVars (list): The names of the desired dependent variables
+          bGerman (bool): Boolean value in case of German floating point numbers
+
+     Returns:
+          dataFrame (pandas.DataFrame): A dataframe with a standardized index and one coloumn per dependent variable in the given order
+     """
+     dataFrame = pd.read_csv(str_path, usecols=l_DepVars, dtype={sDepVar: np.float64 for sDepVar in l_DepVars}, decimal="," if bGerman else ".")
+     return dataFrame[l_DepVars]
+
+
+def getChannelTrainAndTestSetsFromCSV(str_path, nObsPerSeason, l_DepVars, bGerman, n_Split):
+
+     """ 
+     A wrapper function for returning training and test sets of several dependent variables, parsing the csv file only once.
+     Every set equals the one getTrainAndTestSetFromCSV() returns for its variable without renaming.
+     This function performs the following operations:
+          1. Reads all dependent variables via readTimeSeriesChannelsCSV()
+          2. Computes the training set size based on given seasons and amount of observations
+          3. Splits every coloumn into its own training and test set
+
+     Args:
+          str_path (str): The path of the csv file
+          nObsPerSeason (int): The amount of observations per season
+          l_DepVars (list): The names of the desired dependent variables
+          bGerman (bool): Boolean value in case of German floating point numbers
+          n_Split (float): A number indicating the training/test split
+     Returns:
+          dict_sets (dict): A dictionary containing a tuple (df_train_set, df_test_set) per dependent variable
+     """
+     dataFrame = readTimeSeriesChannelsCSV(str_path, l_DepVars, bGerman)
+     n_observ_train = getTrainSize(len(dataFrame), nObsPerSeason, n_Split)
+
+     df_train = dataFrame.iloc[:n_observ_train]
+     df_test = dataFrame.iloc[n_observ_train:].reset_index(drop=True)
+     return {sDepVar: (df_train[[sDepVar]], df_test[[sDepVar]]) for sDepVar in l_DepVars}
+
+
+def readTimeSeriesColumnChunked(str_path, sDepVar, bGerman = True, n_chunk_rows = 100000, dtype = np.float64, str_cache_dir = None):
+
+     """ 
+     Streams a single dependent variable out of a csv file chunk by chunk into a compact numeric array, for files too large to be read at once.
+     With a cache directory the values are written chunk by chunk into a binary file which is then memory-mapped,
+     so the coloumn never needs to fit into memory and later calls skip parsing the csv file as long as it is unchanged.
+     This function performs the following operations:
+          1. Returns the memory-mapped cache if it exists for this file, size, modification time, coloumn and data type
+          2. Otherwise reads the coloumn in chunks of n_chunk_rows rows, skipping every other coloumn while parsing
+          3. Appends each chunk to the cache file or collects it in memory and returns the values
+     Args:
+          str_path (str): The path of the csv file
+          sDepVar (str): The name of the desired dependent variable
+          bGerman (bool): Boolean value in case of German floating point numbers
+          n_chunk_rows (int): The amount of rows parsed at once
+          dtype (numpy.dtype): The floating point type of the values, numpy.float32 halves the memory
+          str_cache_dir (str): A string pointing to a directory for memory-mapped binary caches, None keeps the values in memory
+     Returns:
+          a_values (numpy.array): A one dimensional array, a read only numpy.memmap if a cache directory is given
+     """
+     dtype = np.dtype(dtype)
+     if str_cache_dir:
+          stat_file = os.stat(str_path)
+          str_key = f"{os.path.abspath(str_path)}|{stat_file.st_size}|{stat_file.st_mtime_ns}|{sDepVar}|{dtype.str}|{bGerman}"
+          path_cache = Path(str_cache_dir) / f"{Path(str_path).stem}_{hashlib.sha256(str_key.encode('utf-8')).hexdigest()[:16]}.bin"
+          if path_cache.exists():
+               return np.memmap(path_cache, dtype=dtype, mode="r")
+
+     reader = pd.read_csv(str_path, usecols=[sDepVar], dtype={sDepVar: dtype}, decimal="," if bGerman else ".", chunksize=n_chunk_rows)
+
+     if not str_cache_dir:
+          l_chunks = [chunk[sDepVar].to_numpy() for chunk in reader]
+          return np.concatenate(l_chunks) if l_chunks else np.empty(0, dtype=dtype)
+
+     os.makedirs(str_cache_dir, exist_ok=True)
+     n_fd, str_tmp_path = tempfile.mkstemp(dir=str_cache_dir, suffix=".tmp")
+     try:
+          with os.fdopen(n_fd, "wb") as f:
+               for chunk in reader:
+                    chunk[sDepVar].to_numpy().tofile(f)
+          os.replace(str_tmp_path, path_cache) # concurrent readers never see a partially written cache
+     except Exception:
+          os.remove(str_tmp_path)
+          raise
+     if path_cache.stat().st_size == 0: # numpy cannot map empty files
+          return np.empty(0, dtype=dtype)
+     return np.memmap(path_cache, dtype=dtype, mode="r")
+
+
+def getTrainAndTestSetChunked(str_path, nObsPerSeason, depVar, sRenameDepVar, bGerman, n_Split, n_chunk_rows = 100000, dtype = np.float64, str_cache_dir = None):
+
+     """ 
+     A wrapper function for returning a training and test set of a large csv file, equal to getTrainAndTestSetFromCSV() up to the data type.
+     This function performs the following operations:
+          1. Streams the dependent variable via readTimeSeriesColumnChunked()
+          2. Computes the season aligned training set size from the row count
+          3. Wraps both parts of the array into dataframes without copying the values
+
+     Args:
+          str_path (str): The path of the csv file
+          nObsPerSeason (int): The amount of observations per season
+          depVar (str): The name of the desired dependent variable
+          sRenamDepVar (str): String for renaming the desired dependent variable
+          bGerman (bool): Boolean value in case of German floating point numbers
+          n_Split (float): A number indicating the training/test split
+          n_chunk_rows (int): The amount of rows parsed at once
+          dtype (numpy.dtype): The floating point type of the values
+          str_cache_dir (str): A string pointing to a directory for memory-mapped binary caches, None keeps the values in memory
+     Returns:
+          tuple (df_train_set, df_test_set): 
+               df_train_set (pandas.DataFrame): The training set
+               df_test_set (pandas.DataFrame): The test set
+     """
+     a_values = readTimeSeriesColumnChunked(str_path, depVar, bGerman, n_chunk_rows, dtype, str_cache_dir)
+     n_observ_train = getTrainSize(len(a_values), nObsPerSeason, n_Split)
+     sName = sRenameDepVar if sRenameDepVar else depVar
+
+     df_train_set = pd.DataFrame({sName: a_values[:n_observ_train]}, copy=False)
+     df_test_set = pd.DataFrame({sName: a_values[n_observ_train:]}, copy=False)
+     return df_train_set, df_test_set
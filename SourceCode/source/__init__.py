@@ -0,0 +1,5 @@
+"""
+The time series analysis and outlier detection pipeline.
+Heavy dependencies (statsmodels, sklearn, matplotlib, coreforecast) are imported inside the functions using them,
+so that importing a module only costs what the called stage needs. Benchmark.checkImportBudget() guards this.
+"""
@@ -3,8 +3,6 @@ Runs the time series and outlier detection pipelines.
 """
 from . import UtilsDataFrame as dfUtils
 import pandas as pd
-import matplotlib.pyplot as plt
-from coreforecast.scalers import boxcox, inv_boxcox, boxcox_lambda
 from . import STLUtils as stlUtils
 from . import StationaryUtils as statUtil
 from . import ACF_PACFUtils as corrUtil
@@ -12,11 +10,19 @@ from . import ARIMAUtils as arimaUtil
 from . import OutlierDetectorUtil as outDetUtil
 from . import OutPut as out
 from . import ModelEvaluation as modEval
-import statsmodels.tsa.seasonal as STL
-from sklearn.metrics import mean_absolute_error
+from . import ModelStore as modStore
+from . import Profiler as profUtil
+from . import StageCache as stageCache
+from . import DatabaseSource as dbSource
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+import statistics
 
-def run(str_path_undamaged, str_path_damaged, sDepVar, sRenameVar, n_Seasons, n_alpha, s_test_type, script_dir, nSplit=0.8, bAbs=False, str_FolderName=None):
+# Results of the steps before the model selection, which updateTimeSeriesAnalysis() does not recompute without a refit
+L_UPDATE_STALE_KEYS = ["stl_train", "trend_info", "stationary_status", "adf_test_statistic", "kpss_test_statistic", "decay_rate_acf", "decay_rate_pacf",
+                       "ARIMA_Params_estimated", "cutoff_thresholds", "cutoff_thresholds_minimum", "cutoff_thresholds_filtered", "models", "stage_keys"]
+
+def run(str_path_undamaged, str_path_damaged, sDepVar, sRenameVar, n_Seasons, n_alpha, s_test_type, script_dir, nSplit=0.8, bAbs=False, str_FolderName=None, n_workers=None, str_store_dir=None, b_warm_start=False, b_profile=False, n_render_workers=None, n_chunk_rows=None, str_cache_dir=None, n_seed=None, n_mc_draws=None, str_stage_cache_dir=None):
 
     """
     A function for running the time series analysis and outlier detection pipeline.
@@ -30,8 +36,8 @@ def run(str_path_undamaged, str_path_damaged, sDepVar, sRenameVar, n_Seasons, n_
 
 
     Args:
-        str_path_undamaged (str): A string containing the file path of the base process
-        str_path_damaged (str): A string containing the file path of the anomalous process
+        str_path_undamaged (str): A string containing the file path of the base process, or a dictionary describing a database source, see loadTrainAndTestSet()
+        str_path_damaged (str): A string containing the file path of the anomalous process, or a dictionary describing a database source
         sDepVar (str): A string containing the dependent variable
         sRenameVar (str): A string for renaming the dependent variable
         n_Seasons (int): An integer indicating the number of seasons/periods
@@ -41,10 +47,22 @@ def run(str_path_undamaged, str_path_damaged, sDepVar, sRenameVar, n_Seasons, n_
         nSplit (float): A floating point number indicating the test split 
         bAbs (bool): A boolean for indicating the need to turn the values to their absolute counterparts
         str_FolderName (str): A string for naming a folder where the output can be stored
+        n_workers (int): The number of worker processes for the ARIMA grid search, None or 1 fits the candidates one after another
+        str_store_dir (str): A string pointing to a directory for storing and reusing the time series analysis results, None always refits
+        b_warm_start (bool): A boolean for warm starting the ARIMA candidates from already fitted neighbouring orders
+        b_profile (bool): A boolean for recording wall time, CPU time and peak memory per stage of the time series analyses
+        n_render_workers (int): The number of worker processes rendering the figures, None or 1 renders them one after another
+        n_chunk_rows (int): The amount of rows parsed at once by the streaming loader for large files, None reads the files at once
+        str_cache_dir (str): A string pointing to a directory for memory-mapped binary caches of the dependent variable, implies the streaming loader
+        n_seed (int): The seed of the scenario shuffles and the Monte Carlo simulation, None for unseeded shuffles
+        n_mc_draws (int): The number of draws per scenario of a Monte Carlo simulation added to the results, None skips it
+        str_stage_cache_dir (str): A string pointing to a directory caching the output of every step of the time series analyses, see StageCache, None runs every step
+    Returns:
+        dict_results (dict): A dictionary containing the evaluation results and the results of the outlier simulations
     """
 
-    df_undamaged_train, df_undamaged_test = dfUtils.getTrainAndTestSet(pd.read_csv(str_path_undamaged), n_Seasons, sDepVar, sRenameVar, True, nSplit)
-    df_damaged_train, df_damaged_test = dfUtils.getTrainAndTestSet(pd.read_csv(str_path_damaged), n_Seasons, sDepVar, sRenameVar, True, nSplit)
+    df_undamaged_train, df_undamaged_test = loadTrainAndTestSet(str_path_undamaged, n_Seasons, sDepVar, sRenameVar, nSplit, n_chunk_rows, str_cache_dir)
+    df_damaged_train, df_damaged_test = loadTrainAndTestSet(str_path_damaged, n_Seasons, sDepVar, sRenameVar, nSplit, n_chunk_rows, str_cache_dir)
 
     if bAbs:
         df_undamaged_train = df_undamaged_train.abs()
@@ -52,8 +70,9 @@ def run(str_path_undamaged, str_path_damaged, sDepVar, sRenameVar, n_Seasons, n_
         df_damaged_train = df_damaged_train.abs()
         df_damaged_test = df_damaged_test.abs()
     
-    tsa_undmg_results = doTimeSeriesAnalysis(df_undamaged_train, df_undamaged_test, n_Seasons, n_alpha, s_test_type) #produces fitted model for a given set and plotted graphs for analysing
-    tsa_dmg_results = doTimeSeriesAnalysis(df_damaged_train, df_damaged_test, n_Seasons, n_alpha, s_test_type)
+    stage_cache = stageCache.StageCache(str_stage_cache_dir) if str_stage_cache_dir else None
+    tsa_undmg_results = doTimeSeriesAnalysis(df_undamaged_train, df_undamaged_test, n_Seasons, n_alpha, s_test_type, n_workers, str_store_dir, b_warm_start, profUtil.StageProfiler() if b_profile else None, stage_cache=stage_cache) #produces fitted model for a given set and plotted graphs for analysing
+    tsa_dmg_results = doTimeSeriesAnalysis(df_damaged_train, df_damaged_test, n_Seasons, n_alpha, s_test_type, n_workers, str_store_dir, b_warm_start, profUtil.StageProfiler() if b_profile else None, stage_cache=stage_cache)
 
 
     t_model_detector_eval = modEval.getEvaluationResults(tsa_undmg_results, tsa_dmg_results)
@@ -65,10 +84,11 @@ def run(str_path_undamaged, str_path_damaged, sDepVar, sRenameVar, n_Seasons, n_
     df_damaged_test_maint_imm = df_damaged_test.iloc[-60:]
     df_damaged_test_critical = df_damaged_test.iloc[-100:]
 
-    concat_series_sched_maint = pd.concat([df_undamaged_test, df_damaged_test_sched_maint]).sample(frac=1).reset_index(drop=True)
-    concat_series_sched_maint_asap = pd.concat([df_undamaged_test, df_damaged_test_sched_maint_asap]).sample(frac=1).reset_index(drop=True)
-    concat_series_sched_maint_imme = pd.concat([df_undamaged_test, df_damaged_test_maint_imm]).sample(frac=1).reset_index(drop=True)
-    concat_series_sched_crit = pd.concat([df_undamaged_test, df_damaged_test_critical]).sample(frac=1).reset_index(drop=True)
+    rng_shuffle = np.random.default_rng(n_seed) if n_seed is not None else None
+    concat_series_sched_maint = pd.concat([df_undamaged_test, df_damaged_test_sched_maint]).sample(frac=1, random_state=rng_shuffle).reset_index(drop=True)
+    concat_series_sched_maint_asap = pd.concat([df_undamaged_test, df_damaged_test_sched_maint_asap]).sample(frac=1, random_state=rng_shuffle).reset_index(drop=True)
+    concat_series_sched_maint_imme = pd.concat([df_undamaged_test, df_damaged_test_maint_imm]).sample(frac=1, random_state=rng_shuffle).reset_index(drop=True)
+    concat_series_sched_crit = pd.concat([df_undamaged_test, df_damaged_test_critical]).sample(frac=1, random_state=rng_shuffle).reset_index(drop=True)
 
     outDetect_result_sched_main = simulateOutlierDetection(tsa_undmg_results, tsa_dmg_results, concat_series_sched_maint)
     outDetect_result_sched_maint_asap = simulateOutlierDetection(tsa_undmg_results, tsa_dmg_results, concat_series_sched_maint_asap)
@@ -76,9 +96,142 @@ def run(str_path_undamaged, str_path_damaged, sDepVar, sRenameVar, n_Seasons, n_
     outDetect_result_sched_crit  = simulateOutlierDetection(tsa_undmg_results, tsa_dmg_results, concat_series_sched_crit)
 
     
-    out.output(tsa_undmg_results, tsa_dmg_results,t_model_detector_eval, [outDetect_result_sched_main, outDetect_result_sched_maint_asap, outDetect_result_sched_maint_imme, outDetect_result_sched_crit],script_dir, str_FolderName)
+    l_outDetect_results = [outDetect_result_sched_main, outDetect_result_sched_maint_asap, outDetect_result_sched_maint_imme, outDetect_result_sched_crit]
+    out.output(tsa_undmg_results, tsa_dmg_results,t_model_detector_eval, l_outDetect_results,script_dir, str_FolderName, n_render_workers)
+
+    dict_results = {
+        "evaluation": t_model_detector_eval,
+        "outlier_results": l_outDetect_results
+    }
+    if n_mc_draws:
+        l_inject = [len(df_tail) for df_tail in (df_damaged_test_sched_maint, df_damaged_test_sched_maint_asap, df_damaged_test_maint_imm, df_damaged_test_critical)]
+        l_ratios = [n_inject / (len(df_undamaged_test) + n_inject) for n_inject in l_inject]
+        dict_results["monte_carlo"] = simulateOutlierDetectionMonteCarlo(tsa_undmg_results, tsa_dmg_results, df_undamaged_test, df_damaged_test, l_ratios, n_mc_draws, n_seed or 0)
+    return dict_results
+
+def loadTrainAndTestSet(source, n_Seasons, sDepVar, sRenameVar, nSplit=0.8, n_chunk_rows=None, str_cache_dir=None):
+
+    """
+    A function for loading the training and test set of a process from a csv file or the machine database.
+    A database source is a dictionary with the keys "connection" (see DatabaseSource.getPool()) and optionally "start", "end" and "table", e.g.
+    {"connection": "sqlite:///machine.db", "start": "2025-09-23 15:11:00.000", "end": "2025-09-23 15:20:00.000", "table": "MaschinenDatenAI"}.
+    Args:
+        source (str): A string containing the file path of the process or a dictionary describing a database source
+        n_Seasons (int): An integer indicating the number of seasons/periods
+        sDepVar (str): A string containing the dependent variable
+        sRenameVar (str): A string for renaming the dependent variable
+        nSplit (float): A floating point number indicating the test split
+        n_chunk_rows (int): The amount of rows parsed or fetched at once, None reads csv files at once
+        str_cache_dir (str): A string pointing to a directory for memory-mapped binary caches of csv files, implies the streaming loader
+    Returns:
+        tuple (df_train_set, df_test_set):
+            df_train_set (pandas.DataFrame): The training set
+            df_test_set (pandas.DataFrame): The test set
+    """
+    if isinstance(source, dict):
+        return dbSource.getTrainAndTestSetSQL(source["connection"], n_Seasons, sDepVar, sRenameVar, nSplit, source.get("start"), source.get("end"),
+                                              source.get("table"), n_chunk_rows or 10000)
+    if n_chunk_rows or str_cache_dir:
+        return dfUtils.getTrainAndTestSetChunked(source, n_Seasons, sDepVar, sRenameVar, True, nSplit, n_chunk_rows or 100000, str_cache_dir=str_cache_dir)
+    return dfUtils.getTrainAndTestSetFromCSV(source, n_Seasons, sDepVar, sRenameVar, True, nSplit)
+
+def runMultiChannel(str_path_undamaged, str_path_damaged, l_DepVars, n_Seasons, n_alpha, s_test_type, nSplit=0.8, bAbs=False, n_workers=None, str_store_dir=None, n_anomaly_tail=31, n_min_channels=1, n_seed=None):
+
+    """
+    A function for running the time series analysis and outlier detection on several sensor channels of a machine at once.
+    This function performs the following operations:
+        1. Reads every file once and splits all requested channels into training and test sets
+        2. Runs the time series analysis of base and anomalous process of every channel without missing values in parallel
+        3. Constructs one observation set from the base test set and the last n_anomaly_tail anomalous observations, shuffled alike for all channels
+        4. Detects the anomalies per channel and combines the masks into a machine level recommendation
+    A channel with missing values or whose analysis fails is reported and left out of the combination.
+    Args:
+        str_path_undamaged (str): A string containing the file path of the base process
+        str_path_damaged (str): A string containing the file path of the anomalous process
+        l_DepVars (list): A list of the dependent variables, e.g. ["Strom", "Spannung", "Temp_ax8", "Torque_ax8", "WirkLeistung"]
+        n_Seasons (int): An integer indicating the number of seasons/periods
+        n_alpha (float): A floating point value for tests invloving an alpha value
+        s_test_type (str): A string containing the stationary test type
+        nSplit (float): A floating point number indicating the test split 
+        bAbs (bool): A boolean for indicating the need to turn the values to their absolute counterparts
+        n_workers (int): The number of worker processes analysing the channels, None uses the number of processors and 1 analyses them one after another
+        str_store_dir (str): A string pointing to a directory for storing and reusing the time series analysis results, None always refits
+        n_anomaly_tail (int): The number of anomalous observations mixed into the observation set, at most the length of the anomalous test set
+        n_min_channels (int): The number of channels which need to detect an anomaly at an observation for the machine to count it
+        n_seed (int): The seed of the shuffle, None for an unseeded one
+    Returns:
+        dict_results (dict): A dictionary containing the results per channel, the errors of failed channels and the machine level results
+    """
+
+    dict_undamaged_sets = dfUtils.getChannelTrainAndTestSetsFromCSV(str_path_undamaged, n_Seasons, l_DepVars, True, nSplit)
+    dict_damaged_sets = dfUtils.getChannelTrainAndTestSetsFromCSV(str_path_damaged, n_Seasons, l_DepVars, True, nSplit)
+
+    if bAbs:
+        dict_undamaged_sets = {sDepVar: (df_train.abs(), df_test.abs()) for sDepVar, (df_train, df_test) in dict_undamaged_sets.items()}
+        dict_damaged_sets = {sDepVar: (df_train.abs(), df_test.abs()) for sDepVar, (df_train, df_test) in dict_damaged_sets.items()}
+
+    # === 1. Time series analysis of every channel and process =========================
+    # all channels share the rows of their file, but a sensor may have dropped out, which no analysis can fit
+    dict_results = {"channels": {}, "errors": {}}
+    for sDepVar in l_DepVars:
+        l_missing = [f"{int(df_set.isna().to_numpy().sum())} of {len(df_set)} {str_set} observations of the {str_process} process"
+                     for str_process, dict_sets in (("base", dict_undamaged_sets), ("anomalous", dict_damaged_sets))
+                     for str_set, df_set in zip(("training", "test"), dict_sets[sDepVar]) if df_set.isna().to_numpy().any()]
+        if l_missing:
+            dict_results["errors"][sDepVar] = "missing values: " + ", ".join(l_missing)
+    l_channels = [sDepVar for sDepVar in l_DepVars if sDepVar not in dict_results["errors"]]
+
+    l_jobs = [(sDepVar, dict_sets[sDepVar]) for sDepVar in l_channels for dict_sets in (dict_undamaged_sets, dict_damaged_sets)]
+    l_tsa_results = []
+    if n_workers == 1:
+        for sDepVar, (df_train, df_test) in l_jobs:
+            try:
+                l_tsa_results.append(doTimeSeriesAnalysis(df_train, df_test, n_Seasons, n_alpha, s_test_type, str_store_dir=str_store_dir))
+            except Exception as e:
+                l_tsa_results.append(e)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            l_futures = [executor.submit(doTimeSeriesAnalysis, df_train, df_test, n_Seasons, n_alpha, s_test_type, str_store_dir=str_store_dir) for sDepVar, (df_train, df_test) in l_jobs]
+            for future in l_futures:
+                try:
+                    l_tsa_results.append(future.result())
+                except Exception as e:
+                    l_tsa_results.append(e)
+
+    # === 2. Observation set with the same rows and order for every channel =============
+    n_undamaged_test = len(dict_undamaged_sets[l_DepVars[0]][1])
+    n_tail = min(n_anomaly_tail, len(dict_damaged_sets[l_DepVars[0]][1])) # a short anomalous test set provides fewer observations
+    a_order = np.random.default_rng(n_seed).permutation(n_undamaged_test + n_tail)
+
+    for sDepVar in dict_results["errors"]:
+        print(f"channel {sDepVar} left out: {dict_results['errors'][sDepVar]}")
+    dict_anomaly_bool = {}
+    for i, sDepVar in enumerate(l_channels):
+        tsa_undmg_results, tsa_dmg_results = l_tsa_results[2 * i], l_tsa_results[2 * i + 1]
+        for tsa_results in (tsa_undmg_results, tsa_dmg_results):
+            if isinstance(tsa_results, Exception):
+                dict_results["errors"][sDepVar] = f"{type(tsa_results).__name__}: {tsa_results}"
+        if sDepVar in dict_results["errors"]:
+            print(f"channel {sDepVar} left out: {dict_results['errors'][sDepVar]}")
+            continue
+
+        df_observ = pd.concat([dict_undamaged_sets[sDepVar][1], dict_damaged_sets[sDepVar][1].iloc[-n_tail:]]).iloc[a_order].reset_index(drop=True)
+        dict_outlier_result = simulateOutlierDetection(tsa_undmg_results, tsa_dmg_results, df_observ)
+        dict_anomaly_bool[sDepVar] = dict_outlier_result["anomaly_bool"]
+        dict_results["channels"][sDepVar] = {
+            "base": tsa_undmg_results,
+            "anomaly": tsa_dmg_results,
+            "evaluation": modEval.getEvaluationResults(tsa_undmg_results, tsa_dmg_results),
+            "outlier_result": dict_outlier_result
+        }
+
+    # === 3. Machine level recommendation ===============================================
+    if not dict_anomaly_bool:
+        raise ValueError("the analysis failed for every channel")
+    dict_results["machine"] = outDetUtil.combineChannelAnomalies(dict_anomaly_bool, n_min_channels)
+    return dict_results
 
-def doTimeSeriesAnalysis(df_train, df_test, n_Seasons, n_alpha, s_test_type):
+def doTimeSeriesAnalysis(df_train, df_test, n_Seasons, n_alpha, s_test_type, n_workers=None, str_store_dir=None, b_warm_start=False, profiler=None, str_trace_path=None, b_lean=False, stage_cache=None, n_ljung_box_threshold=0.05, n_forecast_horizon=None):
 
     """
     A function for the implementation of the time series pipeline.
@@ -90,51 +243,202 @@ def doTimeSeriesAnalysis(df_train, df_test, n_Seasons, n_alpha, s_test_type):
         5. Selects the optimal ARIMA model
         6. Checks variance and normality of residuals for possible further improvements
         7. Forecasts one season and returns the information gathered during this process
+    If a store directory is given, the results are saved under a hash of the sets and parameters and loaded instead of refitting as long as the hash matches.
+    If a stage cache is given, the output of every single step is cached instead, so that a changed setting only recomputes the steps depending on it.
     Args:
         df_train (pandas.DataFrame): A dataframe containing the training set
         df_test (pandas.DataFrame): A dataframe containing the test set
         n_alpha (float): A floating point value for tests invloving an alpha value
         s_test_type (str): A string containing the stationary test type
+        n_workers (int): The number of worker processes for the ARIMA grid search, None or 1 fits the candidates one after another
+        str_store_dir (str): A string pointing to a directory for storing and reusing the results, None always refits
+        b_warm_start (bool): A boolean for warm starting the ARIMA candidates from already fitted neighbouring orders
+        profiler (Profiler.StageProfiler): A profiler recording every step and ARIMA candidate into dict_results["profile"], None switches the instrumentation off
+        str_trace_path (str): A path the profiler writes a JSON trace file to, if given
+        b_lean (bool): A boolean for lean results: the candidates are kept as compact ARIMAUtils.CandidateRecords, only the optimal model is kept
+                       and the training set, transformed set and STL decomposition are dropped. Lean results can neither be plotted by OutPut nor updated
+                       by updateTimeSeriesAnalysis(), but many of them fit into memory at once
+        stage_cache (StageCache.StageCache): A cache for the output of every step, None runs every step
+        n_ljung_box_threshold (float): The Ljung-Box p-value an ARIMA candidate needs to exceed to qualify
+        n_forecast_horizon (int): The length of the forecast after the training set, None forecasts one season
     Returns:
         dict_results (dict): A dictionary object containing information gathered during the time series analysis
     """
 
+    if str_store_dir:
+        str_store_key = modStore.getStoreKey(df_train, df_test, n_Seasons, n_alpha, s_test_type, b_warm_start, b_lean, n_ljung_box_threshold, n_forecast_horizon)
+        dict_stored_results = modStore.loadResults(str_store_dir, str_store_key)
+        if dict_stored_results is not None:
+            return dict_stored_results
+
+    if profiler is None:
+        profiler = profUtil.NULL_PROFILER
+
+    dict_results = decomposeTrainingSet(df_train, n_Seasons, profiler, stage_cache)
+    dict_results["test_set"] = df_test
+    analyseDecomposition(dict_results, n_Seasons, n_alpha, s_test_type, n_workers, b_warm_start, profiler, b_lean, stage_cache=stage_cache,
+                         n_ljung_box_threshold=n_ljung_box_threshold, n_forecast_horizon=n_forecast_horizon)
+
+    # === Save Profile =========
+    if profiler is not profUtil.NULL_PROFILER:
+        dict_results["profile"] = profiler.getProfile()
+        if str_trace_path:
+            profiler.writeTrace(str_trace_path)
+    # ==========================
+
+    # === Drop Intermediate Sets =
+    if b_lean:
+        del dict_results["train_set"], dict_results["stl_train"], dict_results["train_trans_set"]["df_set"]
+    # ==========================
+
+    if str_store_dir:
+        modStore.saveResults(str_store_dir, str_store_key, dict_results)
+
+    return dict_results
+
+def decomposeTrainingSet(df_train, n_Seasons, profiler=None, stage_cache=None):
+
+    """
+    The first steps of the time series analysis, which depend on the training set and the number of seasons only.
+    This function performs the following operations:
+        1. Transforms the given training set via a Box-Cox transformation with the optimal lambda estimated based upon Guerreros approach
+        2. Performs a STL decomposition
+    The returned dictionary can be completed by analyseDecomposition() for several alphas and test types, e.g. by SweepRun.
+    Args:
+        df_train (pandas.DataFrame): A dataframe containing the training set
+        n_Seasons (int): An integer indicating the number of seasons/periods
+        profiler (Profiler.StageProfiler): A profiler recording the steps, None switches the instrumentation off
+        stage_cache (StageCache.StageCache): A cache for the output of every step, None runs every step
+    Returns:
+        dict_results (dict): A dictionary object containing the training set, the transformed training set with its lambda and the STL decomposition
+    """
+    from coreforecast.scalers import boxcox, boxcox_lambda
+    import statsmodels.tsa.seasonal as STL
+
+    if profiler is None:
+        profiler = profUtil.NULL_PROFILER
+    if stage_cache is None:
+        stage_cache = stageCache.NULL_STAGE_CACHE
+
     dict_results = {
-    "train_set": df_train,
-    "test_set" : df_test
+    "train_set": df_train
     }
-    # === 1. Transform data =================================================================== 
-    opt_lambda = boxcox_lambda(df_train, method="guerrero", season_length=n_Seasons)
-    df_train_trans = pd.DataFrame(
-        boxcox(df_train, opt_lambda),
-        index = df_train.index,
-        columns = df_train.columns
-    )
+    dict_keys = {}
+    # === 1. Transform data ===================================================================
+    with profiler.stage("boxcox"):
+        opt_lambda, dict_keys["boxcox_lambda"] = stage_cache.runStage("boxcox_lambda", [df_train, n_Seasons],
+            lambda dict_stage: boxcox_lambda(df_train, method="guerrero", season_length=n_Seasons), dict_results)
+        df_train_trans, dict_keys["boxcox"] = stage_cache.runStage("boxcox", [dict_keys["boxcox_lambda"]],
+            lambda dict_stage: pd.DataFrame(
+                boxcox(df_train, opt_lambda),
+                index = df_train.index,
+                columns = df_train.columns
+            ), dict_results)
     dict_results["train_trans_set"] = {
         "df_set": df_train_trans,
         "opt_lambda": opt_lambda
         }
 
-    # === 2. STL Decomposition ================================================================= 
-    stl_train_set = STL.STL(df_train_trans, period=n_Seasons) # Set up the STL object and its params
-    stl_fitted = stl_train_set.fit()                          # Decomposing via STL
+    # === 2. STL Decomposition =================================================================
+    with profiler.stage("stl"):
+        stl_fitted, dict_keys["stl"] = stage_cache.runStage("stl", [dict_keys["boxcox"], n_Seasons],
+            lambda dict_stage: STL.STL(df_train_trans, period=n_Seasons).fit(), dict_results) # Decomposing via STL
     dict_results["stl_train"] = stl_fitted
 
+    if stage_cache is not stageCache.NULL_STAGE_CACHE:
+        dict_results["stage_keys"] = dict_keys
+
+    return dict_results
+
+def analyseDecomposition(dict_results, n_Seasons, n_alpha, s_test_type, n_workers=None, b_warm_start=False, profiler=None, b_lean=False, dict_grid_cache=None, stage_cache=None, n_ljung_box_threshold=0.05, n_forecast_horizon=None):
+
+    """
+    The remaining steps of the time series analysis on the results of decomposeTrainingSet(), which depend on alpha and the test type as well.
+    This function performs the following operations:
+        1. Checks the stationary type of the series
+        2. Gathers an estimation of ARIMA parameters based on the determined stationary type following the method by Tran and Reed
+        3. Selects the optimal ARIMA model
+        4. Forecasts the test set for the out of sample MAE and the given horizon
+    With a stage cache every step is cached under the keys of the steps it depends on and its own parameters. The fitted ARIMA candidates are cached apart from
+    the model selection, so that a changed Ljung-Box threshold only fits the candidates which were not needed before.
+    Args:
+        dict_results (dict): A dictionary returned by decomposeTrainingSet() with the test set added under "test_set", completed in place
+        n_Seasons (int): An integer indicating the number of seasons/periods
+        n_alpha (float): A floating point value for tests invloving an alpha value
+        s_test_type (str): A string containing the stationary test type
+        n_workers (int): The number of worker processes for the ARIMA grid search, None or 1 fits the candidates one after another
+        b_warm_start (bool): A boolean for warm starting the ARIMA candidates from already fitted neighbouring orders
+        profiler (Profiler.StageProfiler): A profiler recording the steps, None switches the instrumentation off
+        b_lean (bool): A boolean for keeping the ARIMA candidates as compact ARIMAUtils.CandidateRecords
+        dict_grid_cache (dict): A dictionary reusing the grid search of equal stationary types and ARIMA parameters across calls on the same
+                                decomposition, e.g. for several alphas, None always searches
+        stage_cache (StageCache.StageCache): A cache for the output of every step, needs to be the cache of decomposeTrainingSet(). None runs every step
+        n_ljung_box_threshold (float): The Ljung-Box p-value an ARIMA candidate needs to exceed to qualify
+        n_forecast_horizon (int): The length of the forecast after the training set, None forecasts one season
+    Returns:
+        dict_results (dict): The completed dictionary
+    """
+    from sklearn.metrics import mean_absolute_error
+
+    if profiler is None:
+        profiler = profUtil.NULL_PROFILER
+    if stage_cache is None:
+        stage_cache = stageCache.NULL_STAGE_CACHE
+    if n_forecast_horizon is None:
+        n_forecast_horizon = n_Seasons
+    # kept for updateTimeSeriesAnalysis(), so that updates continue with the same settings
+    dict_results["settings"] = {"n_ljung_box_threshold": n_ljung_box_threshold, "n_forecast_horizon": n_forecast_horizon}
+
+    df_train_trans = dict_results["train_trans_set"]["df_set"]
+    opt_lambda = dict_results["train_trans_set"]["opt_lambda"]
+    stl_fitted = dict_results["stl_train"]
+    df_test = dict_results["test_set"]
+    if stage_cache is not stageCache.NULL_STAGE_CACHE and "stage_keys" not in dict_results:
+        raise ValueError("the decomposition needs to be computed with the same stage cache")
+    dict_keys = dict(dict_results.get("stage_keys", {}))
+
     # === 3. Stationary Check ==================================================================
-    b_Trending = stlUtils.getTrending(stl_fitted.trend, stl_fitted.resid, dict_results)
-    dict_stat_ind = statUtil.getStatInd(df_train_trans, n_alpha, s_test_type, b_Trending, dict_results)
+    with profiler.stage("stationarity"):
+        b_Trending, dict_keys["trend_strength"] = stage_cache.runStage("trend_strength", [dict_keys.get("stl")],
+            lambda dict_stage: stlUtils.getTrending(stl_fitted.trend, stl_fitted.resid, dict_stage), dict_results)
+        dict_stat_ind, dict_keys["stationarity"] = stage_cache.runStage("stationarity", [dict_keys.get("boxcox"), dict_keys["trend_strength"], n_alpha, s_test_type],
+            lambda dict_stage: statUtil.getStatInd(df_train_trans, n_alpha, s_test_type, b_Trending, dict_stage), dict_results)
 
     # === 4. ARIMA Params Gathering ============================================================
 
-    if dict_results['stationary_status']["stat_type"] == "trend":
-        p, d, q = corrUtil.getARIMA_Params(df_train_trans, n_Seasons*2 ,n_alpha, dict_stat_ind, dict_results,df_trend_series =stl_fitted.trend)
-    else:
-        p, d, q = corrUtil.getARIMA_Params(df_train_trans, n_Seasons*2 ,n_alpha, dict_stat_ind, dict_results)
+    with profiler.stage("arima_params"):
+        if dict_results['stationary_status']["stat_type"] == "trend":
+            func_params = lambda dict_stage: corrUtil.getARIMA_Params(df_train_trans, n_Seasons*2 ,n_alpha, dict_stat_ind, dict_stage,df_trend_series =stl_fitted.trend)
+        else:
+            func_params = lambda dict_stage: corrUtil.getARIMA_Params(df_train_trans, n_Seasons*2 ,n_alpha, dict_stat_ind, dict_stage)
+        (p, d, q), dict_keys["arima_params"] = stage_cache.runStage("arima_params", [dict_keys.get("stl"), dict_keys["stationarity"], n_Seasons, n_alpha], func_params, dict_results)
     # === 5. Get Optimal ARIMA Model ===========================================================
     #need to add one for detrend
 
-    fitted_model = arimaUtil.getOptimalModel(df_train_trans, p, d, q, dict_results)
-    dict_results["fitted_optimal_model"] = fitted_model 
+    def getOptimalModel(dict_stage):
+        # the candidates only depend on the transformed set, the trend parameter and the orders, see ARIMAUtils.fitCandidates()
+        str_key_candidates = stage_cache.getKey("candidates", [dict_keys.get("boxcox"), dict_results['stationary_status']["stat_type"]])
+        dict_fitted = None
+        if str_key_candidates is not None and not b_warm_start:
+            dict_fitted = stage_cache.load("candidates", str_key_candidates)[1] or {}
+        n_cached = len(dict_fitted) if dict_fitted is not None else 0
+
+        fitted_model = arimaUtil.getOptimalModel(df_train_trans, p, d, q, dict_stage, n_workers, b_warm_start, profiler, b_lean, n_ljung_box_threshold, dict_fitted)
+        if dict_fitted is not None and len(dict_fitted) > n_cached:
+            stage_cache.save("candidates", str_key_candidates, dict_fitted)
+        return fitted_model
+
+    with profiler.stage("grid_search"):
+        l_grid_inputs = [dict_keys["stationarity"], dict_keys["arima_params"], b_warm_start, b_lean, n_ljung_box_threshold]
+        t_grid_key = (dict_results['stationary_status']["stat_type"], p, d, q)
+        if dict_grid_cache is not None and t_grid_key in dict_grid_cache:
+            fitted_model, dict_results["models"] = dict_grid_cache[t_grid_key]
+            dict_keys["grid_search"] = stage_cache.getKey("grid_search", l_grid_inputs)
+        else:
+            fitted_model, dict_keys["grid_search"] = stage_cache.runStage("grid_search", l_grid_inputs, getOptimalModel, dict_results)
+            if dict_grid_cache is not None:
+                dict_grid_cache[t_grid_key] = (fitted_model, dict_results["models"])
+    dict_results["fitted_optimal_model"] = fitted_model
 
 
     #diagnostic with hetereoscedesticity. plot it maybe and jarque bera
@@ -143,17 +447,133 @@ def doTimeSeriesAnalysis(df_train, df_test, n_Seasons, n_alpha, s_test_type):
     # show these stats or rather save them as well?
 
 
-    a_forecast_for_mae = arimaUtil.getForecast(fitted_model, len(df_test),opt_lambda)
+    with profiler.stage("forecast"):
+        def getTestForecast(dict_stage):
+            a_forecast_for_mae = arimaUtil.getForecast(fitted_model, len(df_test),opt_lambda)
 
-    n_MAE = mean_absolute_error(df_test, a_forecast_for_mae)
-    dict_results["ARIMA"] = {
-        "summary": fitted_model.summary().as_text(),
-        "mae" : n_MAE
-    } 
+            n_MAE = mean_absolute_error(df_test, a_forecast_for_mae)
+            return {
+                "summary": fitted_model.summary().as_text(),
+                "mae" : n_MAE
+            }
+        dict_results["ARIMA"], dict_keys["forecast_test"] = stage_cache.runStage("forecast_test", [dict_keys.get("grid_search"), dict_keys.get("boxcox_lambda"), df_test],
+            getTestForecast, dict_results)
 
-    # === 7. Forecast the next Season==========================================================================
+        # === 7. Forecast the next Season==========================================================================
 
-    dict_results["forecast_next_season"] = arimaUtil.getForecast(fitted_model, n_Seasons, opt_lambda)
+        dict_results["forecast_next_season"], dict_keys["forecast"] = stage_cache.runStage("forecast", [dict_keys.get("grid_search"), dict_keys.get("boxcox_lambda"), n_forecast_horizon],
+            lambda dict_stage: arimaUtil.getForecast(fitted_model, n_forecast_horizon, opt_lambda), dict_results)
+
+    if stage_cache is not stageCache.NULL_STAGE_CACHE:
+        dict_results["stage_keys"] = dict_keys
+
+    return dict_results
+
+def updateTimeSeriesAnalysis(dict_results, df_new_observ, n_Seasons, n_alpha, s_test_type, b_refit=False, n_drift_factor=None, n_workers=None, b_warm_start=False, df_test_new=None,
+                             n_ljung_box_threshold=None, n_forecast_horizon=None):
+
+    """
+    A function for extending the results of a time series analysis with new observations instead of repeating the whole pipeline.
+    The estimated parameters of the fitted optimal model are kept and only its state is extended by the new observations, which equals a run of the Kalman filter.
+    This function performs the following operations:
+        1. Determines the test set after the new observations, the given one or the old test set without the new observations if it starts with them
+        2. Checks for drift by comparing the MAE of the current forecast on the new observations with the out of sample MAE of the model
+        3. Repeats the whole time series analysis on the extended training set and the new test set if requested or if drift was detected
+        4. Otherwise transforms the new observations with the stored Box-Cox lambda and appends them to the fitted optimal model
+        5. Updates the training sets, the out of sample MAE on the new test set and the forecast over the horizon of the analysis
+    Without a refit the results of the steps before the model selection, e.g. the STL decomposition and the stationary status, still describe
+    the old training set. Their keys are listed in dict_results["update_info"]["stale"].
+    Args:
+        dict_results (dict): A dictionary object containing information gathered during the time series analysis, updated in place
+        df_new_observ (pandas.DataFrame): A dataframe containing the new observations with the same coloumn as the training set
+        n_Seasons (int): An integer indicating the number of seasons/periods
+        n_alpha (float): A floating point value for tests invloving an alpha value
+        s_test_type (str): A string containing the stationary test type
+        b_refit (bool): A boolean for enforcing a refit of the whole time series analysis
+        n_drift_factor (float): A refit is triggered if the MAE on the new observations exceeds the out of sample MAE by this factor, None disables the drift check
+        n_workers (int): The number of worker processes for the ARIMA grid search of a refit
+        b_warm_start (bool): A boolean for warm starting the ARIMA candidates of a refit
+        df_test_new (pandas.DataFrame): A dataframe containing the test set following the new observations, None derives it from the old test set
+        n_ljung_box_threshold (float): The Ljung-Box p-value an ARIMA candidate of a refit needs to exceed, None keeps the one of the analysis
+        n_forecast_horizon (int): The length of the forecast after the extended training set, None keeps the one of the analysis
+    Returns:
+        dict_results (dict): The updated dictionary
+    """
+    from coreforecast.scalers import boxcox
+    from sklearn.metrics import mean_absolute_error
+
+    dict_settings = dict_results.get("settings", {}) # missing in results stored before the settings were kept
+    if n_ljung_box_threshold is None:
+        n_ljung_box_threshold = dict_settings.get("n_ljung_box_threshold", 0.05)
+    if n_forecast_horizon is None:
+        n_forecast_horizon = dict_settings.get("n_forecast_horizon", n_Seasons)
+
+    fitted_model = dict_results["fitted_optimal_model"]
+    opt_lambda = dict_results["train_trans_set"]["opt_lambda"]
+    df_train = dict_results["train_set"]
+
+    # continue the index of the training set, which the fitted model is based on
+    df_new_observ = pd.DataFrame(
+        np.asarray(df_new_observ, dtype=float).reshape(-1, 1),
+        index = pd.RangeIndex(len(df_train), len(df_train) + len(df_new_observ)),
+        columns = df_train.columns
+    )
+    df_train_extended = pd.concat([df_train, df_new_observ])
+
+    # === 1. Test Set after the New Observations ================================================
+    if df_test_new is None:
+        df_test_new = dict_results["test_set"]
+        a_test_start = df_test_new.to_numpy(dtype=float)[:len(df_new_observ)].ravel()
+        if len(a_test_start) == len(df_new_observ) and np.allclose(a_test_start, df_new_observ.to_numpy().ravel(), equal_nan=True):
+            df_test_new = df_test_new.iloc[len(df_new_observ):].reset_index(drop=True) # the new observations are in sample from now on
+
+    # === 2. Drift Check =======================================================================
+    n_MAE_new = None
+    if n_drift_factor is not None:
+        a_forecast_new = arimaUtil.getForecast(fitted_model, len(df_new_observ), opt_lambda)
+        n_MAE_new = mean_absolute_error(df_new_observ, a_forecast_new)
+        if dict_results["ARIMA"]["mae"] is not None and n_MAE_new > n_drift_factor * dict_results["ARIMA"]["mae"]:
+            print(f"Drift detected (MAE {n_MAE_new:.6f} on the new observations), refitting")
+            b_refit = True
+
+    # === 3. Refit ==============================================================================
+    if b_refit:
+        if len(df_test_new) == 0:
+            raise ValueError("a refit needs test observations after the new observations, pass them as df_test_new")
+        arimaUtil.invalidateForecastCache(fitted_model)
+        dict_refit_results = doTimeSeriesAnalysis(df_train_extended, df_test_new, n_Seasons, n_alpha, s_test_type, n_workers, b_warm_start=b_warm_start,
+                                                  n_ljung_box_threshold=n_ljung_box_threshold, n_forecast_horizon=n_forecast_horizon)
+        dict_results.clear()
+        dict_results.update(dict_refit_results)
+        dict_results["update_info"] = {"refit": True, "n_new_observ": len(df_new_observ), "mae_new_observ": n_MAE_new, "stale": []}
+        return dict_results
+
+    # === 4. Extend the State of the Fitted Model ===============================================
+    df_new_trans = pd.DataFrame(
+        boxcox(df_new_observ, opt_lambda),
+        index = df_new_observ.index,
+        columns = df_new_observ.columns
+    )
+    fitted_model_updated = fitted_model.append(df_new_trans, refit=False)
+    arimaUtil.invalidateForecastCache(fitted_model)
+
+    # === 5. Save Results =======================================================================
+    dict_results["train_set"] = df_train_extended
+    dict_results["train_trans_set"]["df_set"] = pd.concat([dict_results["train_trans_set"]["df_set"], df_new_trans])
+    dict_results["test_set"] = df_test_new
+    dict_results["fitted_optimal_model"] = fitted_model_updated
+    dict_results["ARIMA"] = {
+        "summary": fitted_model_updated.summary().as_text(),
+        "mae": mean_absolute_error(df_test_new, arimaUtil.getForecast(fitted_model_updated, len(df_test_new), opt_lambda)) if len(df_test_new) else None
+    }
+    dict_results["forecast_next_season"] = arimaUtil.getForecast(fitted_model_updated, n_forecast_horizon, opt_lambda)
+    dict_results["settings"] = {"n_ljung_box_threshold": n_ljung_box_threshold, "n_forecast_horizon": n_forecast_horizon}
+    dict_results["update_info"] = {
+        "refit": False,
+        "n_new_observ": len(df_new_observ),
+        "mae_new_observ": n_MAE_new,
+        "stale": [str_key for str_key in L_UPDATE_STALE_KEYS if str_key in dict_results]
+    }
 
     return dict_results
 
@@ -195,4 +615,121 @@ def simulateOutlierDetection(m_TimeSeries_Baseline, m_TimeSeries_Anomalous, df_o
     n_median_anomaly_pos = np.median(df_anomaly_fore)
     dict_results["n_median_anomaly_fore_pos"] = n_median_anomaly_pos
     dict_results["df_anomal_fore_median_pos"]  = pd.DataFrame([n_median_anomaly_pos] * len(df_observ))
-    return dict_results
\ No newline at end of file
+    return dict_results
+
+def simulateOutlierDetectionBatch(m_TimeSeries_Baseline, m_TimeSeries_Anomalous, l_observ):
+
+    """
+    A function for simulating the outlier detector on any number of scenarios at once.
+    Every scenario gets the same medians as in simulateOutlierDetection(), the anomalies are then detected in one vectorized pass.
+    This function performs the following operations:
+        1. Gets the base and anomalous forecast once for the longest scenario
+        2. Computes the forecast medians for every distinct scenario length
+        3. Detects anomalies for all scenarios at once and returns the results
+
+    Args:
+        m_TimeSeries_Baseline (dict):  A dictionary containing information from the time series analysis of the base process
+        m_TimeSeries_Anomalous (dict): A dictionary containing information from the time series analysis of the anomalous process
+        l_observ (list): A list of series, each containing the observations of one scenario
+    Returns:
+        dict_results (dict): A dictionary containing the anomaly masks, failure percentages and recommendations per scenario
+    """
+
+    a_lengths = np.array([len(df_observ) for df_observ in l_observ])
+    a_baseline_fore = np.asarray(arimaUtil.getForecast(m_TimeSeries_Baseline["fitted_optimal_model"], a_lengths.max(), m_TimeSeries_Baseline["train_trans_set"]["opt_lambda"]))
+    a_anomaly_fore = np.asarray(arimaUtil.getForecast(m_TimeSeries_Anomalous["fitted_optimal_model"], a_lengths.max(), m_TimeSeries_Anomalous["train_trans_set"]["opt_lambda"]))
+
+    # === 1. Medians over the forecast of each scenario length, shorter forecasts being prefixes of the longest one
+    dict_median_base = {n_length: np.median(a_baseline_fore[:n_length]) for n_length in np.unique(a_lengths)}
+    dict_median_anomaly = {n_length: np.median(a_anomaly_fore[:n_length]) for n_length in np.unique(a_lengths)}
+    a_median_base = np.array([dict_median_base[n_length] for n_length in a_lengths])
+    a_median_anomaly = np.array([dict_median_anomaly[n_length] for n_length in a_lengths])
+
+    # === 2. Detect the anomalies of all scenarios
+    dict_results = outDetUtil.getAnomaliesBatch(a_median_base, a_median_anomaly, l_observ)
+    dict_results["n_baseline_fore_median"] = a_median_base
+    dict_results["n_median_anomaly_fore_pos"] = a_median_anomaly
+    return dict_results
+
+def simulateOutlierDetectionMonteCarlo(m_TimeSeries_Baseline, m_TimeSeries_Anomalous, df_observ_base, df_observ_anomalous, l_ratios, n_draws=5000, n_seed=0, n_confidence=0.95):
+
+    """
+    A function for a seeded Monte Carlo simulation of the outlier detector over many random injections of anomalous observations.
+    A scenario mixes all base observations with a random subset of the anomalous ones, so that they make up the given ratio of the set.
+    The detector treats every observation on its own and its medians depend on the set length only, so the order of a set does not matter
+    and a draw is fully described by the chosen anomalous observations. The draws are rows of one index permutation matrix shared by all ratios.
+    This function performs the following operations:
+        1. Gets the base and anomalous forecast once for the longest scenario
+        2. Flags the base and the anomalous observations once per scenario length with the medians of that length
+        3. Counts the anomalies of every draw by indexing the flags with the first columns of the permutation matrix
+        4. Summarizes the failure percentages and recommendations of every ratio
+    Args:
+        m_TimeSeries_Baseline (dict): A dictionary containing information from the time series analysis of the base process
+        m_TimeSeries_Anomalous (dict): A dictionary containing information from the time series analysis of the anomalous process
+        df_observ_base (pandas.DataSeries): The base observations, e.g. the test set of the base process
+        df_observ_anomalous (pandas.DataSeries): The pool of anomalous observations, e.g. the test set of the anomalous process
+        l_ratios (list): The shares of anomalous observations within a scenario, each between 0 and 1, capped by the size of the pool
+        n_draws (int): The number of draws per ratio
+        n_seed (int): The seed of the permutations
+        n_confidence (float): The probability covered by the reported intervals
+    Returns:
+        dict_results (dict): A dictionary containing the summary per ratio, the recommendation frequencies per ratio and the failure percentage of every draw
+    """
+    a_base = np.asarray(df_observ_base, dtype=float).ravel()
+    a_pool = np.asarray(df_observ_anomalous, dtype=float).ravel()
+    n_base = len(a_base)
+    l_inject = [min(len(a_pool), int(round(n_ratio * n_base / (1 - n_ratio)))) if n_ratio < 1 else len(a_pool) for n_ratio in l_ratios]
+
+    a_baseline_fore = np.asarray(arimaUtil.getForecast(m_TimeSeries_Baseline["fitted_optimal_model"], n_base + max(l_inject), m_TimeSeries_Baseline["train_trans_set"]["opt_lambda"]))
+    a_anomaly_fore = np.asarray(arimaUtil.getForecast(m_TimeSeries_Anomalous["fitted_optimal_model"], n_base + max(l_inject), m_TimeSeries_Anomalous["train_trans_set"]["opt_lambda"]))
+
+    rng = np.random.default_rng(n_seed)
+    m_permutation = rng.permuted(np.tile(np.arange(len(a_pool)), (n_draws, 1)), axis=1) # row i: the order anomalous observations are drawn in for draw i
+
+    n_tail = (1 - n_confidence) / 2
+    m_failure_percentage = np.empty((len(l_inject), n_draws))
+    l_summary = []
+    l_frequencies = []
+    for i, n_inject in enumerate(l_inject):
+        n_length = n_base + n_inject
+        n_median_base = np.median(a_baseline_fore[:n_length])
+        n_median_anomaly = np.median(a_anomaly_fore[:n_length])
+        n_base_anomalies = (np.abs(a_base - n_median_anomaly) <= np.abs(a_base - n_median_base)).sum()
+        a_pool_anomaly = np.abs(a_pool - n_median_anomaly) <= np.abs(a_pool - n_median_base)
+
+        a_failure = (n_base_anomalies + a_pool_anomaly[m_permutation[:, :n_inject]].sum(axis=1)) / n_length
+        m_failure_percentage[i] = np.round(a_failure * 100, 6)
+
+        # the recommendation only depends on the anomaly count, of which there are at most n_length + 1 distinct ones
+        a_unique_failure, a_inverse = np.unique(a_failure, return_inverse=True)
+        a_recommendation = np.array([outDetUtil.getRecommendationText(n_failure) for n_failure in a_unique_failure])[a_inverse]
+        dict_frequency = pd.Series(a_recommendation).replace("", "None").value_counts(normalize=True).to_dict()
+
+        a_percent = m_failure_percentage[i]
+        n_mean = a_percent.mean()
+        n_std = a_percent.std(ddof=1) if n_draws > 1 else 0.0
+        n_z = statistics.NormalDist().inv_cdf(1 - n_tail)
+        l_summary.append({
+            "ratio": l_ratios[i],
+            "n_injected": n_inject,
+            "mean": n_mean,
+            "std": n_std,
+            "mean_ci_low": n_mean - n_z * n_std / np.sqrt(n_draws),
+            "mean_ci_high": n_mean + n_z * n_std / np.sqrt(n_draws),
+            "interval_low": np.quantile(a_percent, n_tail),
+            "interval_high": np.quantile(a_percent, 1 - n_tail),
+            "most_frequent_recommendation": max(dict_frequency, key=dict_frequency.get)
+        })
+        l_frequencies.append({"ratio": l_ratios[i], "n_injected": n_inject, **dict_frequency})
+
+    # === Save Results =========
+    dict_results = {
+        "summary": pd.DataFrame(l_summary),
+        "recommendation_frequency": pd.DataFrame(l_frequencies).fillna(0.0),
+        "failure_percentage": m_failure_percentage,
+        "n_draws": n_draws,
+        "n_seed": n_seed,
+        "n_confidence": n_confidence
+    }
+    # ==========================
+    return dict_results